@@ -4,6 +4,7 @@ Aktivite Log Helper - Tüm router'larda kullanılabilir
 from datetime import datetime
 import secrets
 from .data_loader import load_json, save_json
+from . import metrics, slow_log
 
 
 def log_activity(
@@ -31,11 +32,32 @@ def log_activity(
         icon: Material icon adı (snake_case, varsayılan assignment)
         extra_data: Ekstra veriler dict (opsiyonel)
     """
+    metrics.activity_queue(1)
     try:
-        activities = load_json("activities.json")
-    except:
-        activities = []
-    
+        with slow_log.activity_timer():
+            return _write_activity(user_id, user_name, action, target_type, target_id,
+                                   target_name, details, icon, extra_data)
+    finally:
+        metrics.activity_queue(-1)
+
+
+def log_activities(entries: list) -> list:
+    """
+    Birden çok aktiviteyi tek yazımla kaydet (toplu işlemler için).
+    entries: log_activity argümanlarını içeren dict listesi.
+    """
+    if not entries:
+        return []
+    metrics.activity_queue(1)
+    try:
+        with slow_log.activity_timer():
+            return _write_activities([_build_activity(**entry) for entry in entries])
+    finally:
+        metrics.activity_queue(-1)
+
+
+def _build_activity(user_id, user_name, action, target_type, target_id=None,
+                    target_name=None, details=None, icon="assignment", extra_data=None):
     activity = {
         "id": f"act_{datetime.now().strftime('%Y%m%d%H%M%S')}_{secrets.token_hex(4)}",
         "timestamp": datetime.now().isoformat(),
@@ -51,13 +73,30 @@ def log_activity(
     
     if extra_data:
         activity["extraData"] = extra_data
+    return activity
+
+
+def _write_activities(new_activities: list) -> list:
+    try:
+        activities = load_json("activities.json")
+    except:
+        activities = []
     
-    activities.insert(0, activity)
+    # En yeni en başta
+    activities[:0] = reversed(new_activities)
     
     # Son 2000 aktiviteyi tut
     activities = activities[:2000]
     
     save_json("activities.json", activities)
+    return new_activities
+
+
+def _write_activity(user_id, user_name, action, target_type, target_id,
+                    target_name, details, icon, extra_data):
+    activity = _build_activity(user_id, user_name, action, target_type, target_id,
+                               target_name, details, icon, extra_data)
+    _write_activities([activity])
     return activity
 
 
@@ -0,0 +1,168 @@
+"""
+Belge Blob Deposu - içerik adresli (SHA-256), tekilleştirilmiş dosya saklama
+Aynı içerik kaç kez (farklı iş/klasör ya da tekrar denemeyle) yüklenirse
+yüklensin diskte tek kopya tutulur: md.docs/blobs/<ilk 2 hane>/<sha256>.
+documents.json kayıtları blob'a "path" ile işaret eder; referans sayısı bu
+kayıtlardan (path indeksi) hesaplanır ve son referans silinince blob silinir.
+
+Eski md.docs/documents/<alt klasör> ağacını taşımak için:
+    python -m app.blob_store [--dry-run]
+"""
+import hashlib
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Optional
+
+from . import record_index
+from .data_loader import collection_lock, load_json, save_json
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+# DOCS_DIR ortam değişkeni ile belge kökü değiştirilebilir (varsayılan: md.docs)
+DOCS_ROOT = Path(os.getenv("DOCS_DIR") or BASE_DIR / "md.docs").resolve()
+BLOBS = "blobs"
+READ_BLOCK = 1024 * 1024
+
+DOCUMENTS_FILE = "documents.json"
+
+
+def locked():
+    """
+    documents.json koleksiyon kilidi (süreçler arası, iç içe kullanılabilir).
+    Blob ekleme + kayıt ile son referans kontrolü + silme aynı anda çalışmamalı;
+    documents.json'a yazan her işlem bu kilit altında oku-değiştir-yaz yapar.
+    """
+    return collection_lock(DOCUMENTS_FILE)
+
+
+def blob_relpath(sha256: str) -> str:
+    return f"{BLOBS}/{sha256[:2]}/{sha256}"
+
+
+def is_blob(relpath: Optional[str]) -> bool:
+    return bool(relpath) and relpath.startswith(f"{BLOBS}/")
+
+
+def new_temp_path() -> Path:
+    """Blob'la aynı dosya sisteminde geçici yol (atomik rename için)"""
+    temp_dir = DOCS_ROOT / BLOBS / ".tmp"
+    temp_dir.mkdir(parents=True, exist_ok=True)
+    return temp_dir / f"{uuid.uuid4().hex}.part"
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(READ_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def ingest(temp_path: Path, sha256: str) -> tuple:
+    """
+    Geçici dosyayı blob olarak yerleştir. İçerik zaten varsa geçici dosya silinir.
+    (göreli yol, yeni blob mu) döndürür. Çağıran `locked()` altında olmalı ki blob,
+    belge kaydı yazılmadan önce başka bir silme ile kaldırılmasın.
+    """
+    relpath = blob_relpath(sha256)
+    target = DOCS_ROOT / relpath
+    if target.exists():
+        temp_path.unlink(missing_ok=True)
+        return relpath, False
+    target.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(temp_path, target)
+    return relpath, True
+
+
+def references(relpath: str) -> int:
+    """documents.json içinde bu dosyaya işaret eden kayıt sayısı (saklanan orijinaller dahil)"""
+    return (len(record_index.lookup(DOCUMENTS_FILE, "path", relpath))
+            + len(record_index.lookup(DOCUMENTS_FILE, "originalPath", relpath)))
+
+
+def release(relpath: str) -> bool:
+    """Belge kaydı silindikten sonra çağrılır; son referanssa dosyayı sil"""
+    with locked():
+        if references(relpath) > 0:
+            return False
+        path = DOCS_ROOT / relpath
+        if not path.exists():
+            return False
+        try:
+            path.unlink()
+        except OSError:
+            return False  # Silme en iyi çaba ile yapılır
+        return True
+
+
+def migrate(dry_run: bool = False) -> dict:
+    """
+    documents.json'daki eski yol (documents/<alt klasör>/...) kayıtlarını blob
+    deposuna taşı ve aynı içerikleri tekilleştir. Önce blob'lar oluşturulur
+    (hard link / kopya), sonra documents.json yazılır, en son eski dosyalar
+    silinir; yarıda kesilirse hiçbir belge erişilemez hale gelmez.
+    """
+    with locked():
+        docs = load_json(DOCUMENTS_FILE)
+        report = {
+            "documents": len(docs), "migrated": 0, "alreadyBlobs": 0, "uniqueBlobs": 0,
+            "duplicates": 0, "bytesBefore": 0, "bytesAfter": 0, "bytesSaved": 0, "missing": [],
+        }
+        seen = {}
+        legacy_files = set()
+        changed_ids = []
+        for doc in docs:
+            relpath = doc.get("path")
+            if is_blob(relpath):
+                report["alreadyBlobs"] += 1
+                continue
+            source = DOCS_ROOT / relpath if relpath else None
+            if source is None or not source.is_file():
+                report["missing"].append(doc.get("id"))
+                continue
+            size = source.stat().st_size
+            sha256 = file_sha256(source)
+            if source not in legacy_files:
+                report["bytesBefore"] += size
+                legacy_files.add(source)
+            if sha256 in seen:
+                report["duplicates"] += 1
+            else:
+                seen[sha256] = size
+                target = DOCS_ROOT / blob_relpath(sha256)
+                if not dry_run and not target.exists():
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    try:
+                        os.link(source, target)
+                    except OSError:
+                        shutil.copy2(source, target)
+            if not dry_run:
+                doc["path"] = blob_relpath(sha256)
+                doc["sha256"] = sha256
+                changed_ids.append(doc.get("id"))
+            report["migrated"] += 1
+
+        report["uniqueBlobs"] = len(seen)
+        report["bytesAfter"] = sum(seen.values())
+        report["bytesSaved"] = report["bytesBefore"] - report["bytesAfter"]
+        if dry_run or not changed_ids:
+            return report
+
+        save_json(DOCUMENTS_FILE, docs, changed_ids)
+        for source in legacy_files:
+            try:
+                source.unlink()
+            except OSError:
+                pass
+        return report
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="md.docs belgelerini içerik adresli blob deposuna taşı")
+    parser.add_argument("--dry-run", action="store_true", help="Sadece raporla, dosyalara dokunma")
+    args = parser.parse_args()
+    print(json.dumps(migrate(dry_run=args.dry_run), ensure_ascii=False, indent=2))
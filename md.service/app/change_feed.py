@@ -0,0 +1,153 @@
+"""
+Değişiklik Akışı - save_json commit'lerinden koleksiyon/id değişiklik olayları
+SSE ve WebSocket aboneleri koleksiyon filtresi ile bu olayları alır; istemci
+sadece veri gerçekten değiştiğinde yeniden yükleme yapar. Olay numaraları süreç
+başına sıfırdan başlar; SSE id'leri "<epoch>-<numara>" biçimindedir ve başka bir
+süreçten (yeniden başlatma, başka worker) gelen Last-Event-ID "resync" alır.
+Olaylar sadece bu sürecin save listener'larından gelir: birden fazla worker
+çalışırsa her worker sadece kendi commit'lerini yayınlar. Akış kullanılan
+kurulumlar tek worker (uvicorn --workers 1) ile çalıştırılmalıdır.
+"""
+import asyncio
+import json
+import threading
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Optional
+
+from . import metrics
+from .data_loader import add_save_listener
+
+# Last-Event-ID ile yeniden bağlanan istemciler için son olaylar
+REPLAY_SIZE = 500
+# Abone başına bekleyen olay sınırı; dolarsa istemciye "resync" gönderilir
+QUEUE_SIZE = 1000
+
+_lock = threading.Lock()
+_subscribers: set = set()
+_recent: deque = deque(maxlen=REPLAY_SIZE)
+_seq = 0
+_versions: dict = {}
+# Süreç kimliği: olay numaraları sadece aynı epoch içinde karşılaştırılabilir
+EPOCH = uuid.uuid4().hex[:8]
+
+
+class Subscriber:
+    """Tek bir SSE/WebSocket bağlantısı"""
+
+    def __init__(self, collections: Optional[set]):
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self.collections = collections
+        self.overflowed = False
+
+    def matches(self, event: dict) -> bool:
+        return not self.collections or event["collection"] in self.collections
+
+    def _put(self, event: dict) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    def push(self, event: dict) -> None:
+        # save_json threadpool'dan çağrılabilir; olay döngüsüne güvenli aktar
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            unsubscribe(self)
+
+    async def next_event(self, timeout: float) -> Optional[dict]:
+        """Sıradaki olayı bekle; timeout dolarsa None (heartbeat zamanı)"""
+        if self.overflowed:
+            self.overflowed = False
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            return {"id": current_seq(), "epoch": EPOCH, "collection": "*", "ids": None, "type": "resync"}
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+def current_seq() -> int:
+    return _seq
+
+
+def collection_version(collection: str) -> int:
+    """Bu süreçte koleksiyona yapılan commit sayısı"""
+    return _versions.get(collection, 0)
+
+
+def parse_collections(value: Optional[str]) -> Optional[set]:
+    """'jobs,stockItems.json' -> {'jobs', 'stockItems'}"""
+    if not value:
+        return None
+    return {metrics.collection_name(c.strip()) for c in value.split(",") if c.strip()}
+
+
+def publish(filename: str, data, changed_ids: Optional[list]) -> None:
+    """data_loader save dinleyicisi: olayı oluştur ve abonelere dağıt"""
+    global _seq
+    collection = metrics.collection_name(filename)
+    with _lock:
+        _seq += 1
+        _versions[collection] = _versions.get(collection, 0) + 1
+        event = {
+            "id": _seq,
+            "epoch": EPOCH,
+            "type": "change",
+            "collection": collection,
+            "ids": changed_ids,
+            "version": _versions[collection],
+            "at": datetime.now().isoformat(),
+        }
+        _recent.append(event)
+        subscribers = [s for s in _subscribers if s.matches(event)]
+    for sub in subscribers:
+        sub.push(event)
+
+
+def parse_event_id(value: Optional[str]) -> Optional[tuple]:
+    """'<epoch>-<numara>' -> (epoch, numara); eski biçim sadece numara ise epoch None"""
+    if not value:
+        return None
+    epoch, _, seq = value.strip().rpartition("-")
+    if not seq.isdigit():
+        return None
+    return (epoch or None, int(seq))
+
+
+def subscribe(collections: Optional[set] = None, last_event_id: Optional[str] = None) -> Subscriber:
+    """Yeni abone oluştur; last_event_id verilirse kaçırılan olayları tekrar gönder"""
+    sub = Subscriber(collections)
+    parsed = parse_event_id(last_event_id)
+    with _lock:
+        if parsed is not None:
+            epoch, last_seq = parsed
+            missed = [e for e in _recent if e["id"] > last_seq and sub.matches(e)]
+            if epoch != EPOCH or last_seq > _seq or (_recent and _recent[0]["id"] > last_seq + 1):
+                # Başka süreçten gelen numara ya da tampon yetersiz: istemci tam yenileme yapmalı
+                sub.overflowed = True
+            else:
+                for event in missed:
+                    sub._put(event)
+        _subscribers.add(sub)
+    return sub
+
+
+def unsubscribe(sub: Subscriber) -> None:
+    with _lock:
+        _subscribers.discard(sub)
+
+
+def subscriber_count() -> int:
+    return len(_subscribers)
+
+
+def format_sse(event: dict) -> str:
+    return f"id: {event['epoch']}-{event['id']}\nevent: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+add_save_listener(publish)
@@ -0,0 +1,209 @@
+"""
+Soğuk İş Deposu - kapanmış/arşiv işler için sıkıştırılmış, salt okunur segmentler
+KAPALI statüsündeki (ARSIV olarak açılanlar dahil) ve COLD_TIER_DAYS günden uzun
+süredir hareketsiz işler jobs.json'dan md.data/jobs.cold/segment-*.json.gz
+dosyalarına taşınır. Böylece her iş yazımı ve widget taraması sadece sıcak
+(aktif) işleri görür. Her katmanlama çalışması mevcut segmentleri yenileriyle
+tek segmentte birleştirir (sıkıştırma); soğuk okumalar segment sayısıyla
+yavaşlamaz. Nokta erişimi id -> segment indeksi ile yapılır; raporlar
+all_jobs() ile sıcak + soğuk işleri birlikte okur.
+"""
+import gzip
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional
+
+from . import metrics
+from .data_loader import collection_lock, file_signature, get_data_dir, load_json, save_json
+
+JOBS_FILE = "jobs.json"
+COLD_DIR = "jobs.cold"
+INDEX_FILE = f"{COLD_DIR}/index.json"
+CLOSED_STATUSES = {"KAPALI"}
+
+_lock = threading.Lock()
+# id -> segment adı
+_index: dict = {}
+_index_signature: Optional[tuple] = None
+# segment adı -> {id: iş}; segmentler değişmez. En son kullanılan
+# COLD_SEGMENT_CACHE segment bellekte tutulur (LRU), diğerleri gerektikçe okunur.
+_segments: OrderedDict = OrderedDict()
+
+
+def min_age_days() -> int:
+    return int(os.getenv("COLD_TIER_DAYS", "90"))
+
+
+def interval_hours() -> float:
+    """Otomatik katmanlama aralığı; 0 ise kapalı"""
+    return float(os.getenv("COLD_TIER_INTERVAL_HOURS", "24"))
+
+
+def segment_cache_size() -> int:
+    return max(int(os.getenv("COLD_SEGMENT_CACHE", "8")), 1)
+
+
+def _cold_dir():
+    return get_data_dir() / COLD_DIR
+
+
+def _write_atomic(path, raw: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_suffix(path.suffix + ".tmp")
+    with temp_path.open("wb") as f:
+        f.write(raw)
+    temp_path.replace(path)
+
+
+def _last_activity(job: dict) -> str:
+    """İşin kapanış/son hareket zamanı (ISO metin)"""
+    logs = job.get("logs") or []
+    candidates = [
+        (job.get("finance") or {}).get("closedAt"),
+        logs[-1].get("at") if logs else None,
+        job.get("createdAt"),
+    ]
+    return max((c for c in candidates if c), default="")
+
+
+def is_candidate(job: dict, cutoff: str) -> bool:
+    """Soğuk depoya taşınabilir mi: kapalı ve cutoff'tan önce hareketsiz"""
+    if job.get("status") not in CLOSED_STATUSES:
+        return False
+    return _last_activity(job)[:19] < cutoff
+
+
+def _ensure_index() -> None:
+    global _index, _index_signature
+    signature = file_signature(INDEX_FILE)
+    if signature == _index_signature:
+        return
+    try:
+        index = load_json(INDEX_FILE)
+    except FileNotFoundError:
+        index = {}
+    _index, _index_signature = index, signature
+
+
+def _segment(name: str) -> dict:
+    segment = _segments.get(name)
+    if segment is not None:
+        _segments.move_to_end(name)
+        return segment
+    start = time.perf_counter()
+    raw = (_cold_dir() / name).read_bytes()
+    jobs = json.loads(gzip.decompress(raw).decode("utf-8"))
+    metrics.observe_collection(COLD_DIR, "read", len(raw), time.perf_counter() - start)
+    segment = _segments[name] = {job["id"]: job for job in jobs}
+    while len(_segments) > segment_cache_size():
+        _segments.popitem(last=False)
+    return segment
+
+
+def _with_index(read):
+    """
+    İndeksle okuma yap; başka süreç sıkıştırıp eski segmenti sildiyse indeksi
+    yeniden okuyup bir kez daha dene
+    """
+    global _index_signature
+    with _lock:
+        _ensure_index()
+        try:
+            return read()
+        except FileNotFoundError:
+            _index_signature = None
+            _ensure_index()
+            return read()
+
+
+def get(job_id: str) -> Optional[dict]:
+    """Soğuk depodaki işi getir (yoksa None)"""
+    def read():
+        name = _index.get(job_id)
+        return None if name is None else _segment(name).get(job_id)
+    return _with_index(read)
+
+
+def ids() -> set:
+    with _lock:
+        _ensure_index()
+        return set(_index)
+
+
+def count() -> int:
+    with _lock:
+        _ensure_index()
+        return len(_index)
+
+
+def _all_cold() -> list:
+    result = []
+    for name in sorted(set(_index.values())):
+        result.extend(job for job_id, job in _segment(name).items() if _index.get(job_id) == name)
+    return result
+
+
+def jobs() -> list:
+    """Tüm soğuk işler"""
+    return _with_index(_all_cold)
+
+
+def all_jobs(hot: Optional[list] = None) -> list:
+    """Sıcak + soğuk işler; aynı id iki yerde ise sıcak kayıt geçerlidir"""
+    if hot is None:
+        hot = load_json(JOBS_FILE)
+    hot_ids = {job.get("id") for job in hot}
+    return hot + [job for job in jobs() if job["id"] not in hot_ids]
+
+
+def version_files() -> list:
+    """Koşullu GET için iş listesinin bağlı olduğu dosyalar"""
+    return [JOBS_FILE, INDEX_FILE] if file_signature(INDEX_FILE) else [JOBS_FILE]
+
+
+def tier_jobs(days: Optional[int] = None, now: Optional[datetime] = None) -> list:
+    """
+    Uygun işleri soğuk depoya taşı ve jobs.json'dan çıkar; taşınan id'leri
+    döndürür. Mevcut soğuk işler ve taşınanlar tek yeni segmente yazılır, eski
+    segmentler en sonda silinir. Segment ve indeks jobs.json'dan önce yazılır:
+    yarıda kalırsa iş iki yerde birden olur (sıcak kayıt geçerli), kaybolmaz.
+    """
+    days = min_age_days() if days is None else days
+    cutoff = ((now or datetime.now()) - timedelta(days=days)).isoformat()[:19]
+    with collection_lock(JOBS_FILE):
+        try:
+            hot = load_json(JOBS_FILE)
+        except FileNotFoundError:
+            return []
+        moving = [job for job in hot if job.get("id") and is_candidate(job, cutoff)]
+        if not moving:
+            return []
+
+        moved = [job["id"] for job in moving]
+        moved_set = set(moved)
+        existing = _with_index(_all_cold)
+        with _lock:
+            old_names = set(_index.values())
+        compacted = [job for job in existing if job["id"] not in moved_set] + moving
+
+        name = f"segment-{datetime.now():%Y%m%d%H%M%S}-{uuid.uuid4().hex[:6]}.json.gz"
+        start = time.perf_counter()
+        raw = gzip.compress(json.dumps(compacted, ensure_ascii=False).encode("utf-8"))
+        _write_atomic(_cold_dir() / name, raw)
+        metrics.observe_collection(COLD_DIR, "write", len(raw), time.perf_counter() - start)
+
+        index = {job["id"]: name for job in compacted}
+        _write_atomic(get_data_dir() / INDEX_FILE, json.dumps(index, ensure_ascii=False).encode("utf-8"))
+
+        save_json(JOBS_FILE, [job for job in hot if job.get("id") not in moved_set], moved)
+        # Eski segmentler artık indekste yok
+        with _lock:
+            for old in old_names - {name}:
+                _segments.pop(old, None)
+                (_cold_dir() / old).unlink(missing_ok=True)
+    return moved
@@ -0,0 +1,106 @@
+"""
+Koşullu GET - koleksiyon sürümlerinden ETag / Last-Modified üretimi
+İstemcinin If-None-Match / If-Modified-Since değerleri güncelse 304 döner;
+bu durumda JSON dosyası okunmaz ve yanıt serileştirilmez.
+Kayıt düzeyinde ETag ("v<version>") ve If-Match ile iyimser eşzamanlılık.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Header, HTTPException, Request, Response
+
+from .data_loader import collection_version, expected_version, get_data_dir, record_version
+
+
+def compute_etag(request: Request, *filenames: str) -> Optional[str]:
+    """Koleksiyon sürümleri + sorgu parametrelerinden ETag; dosya yoksa None"""
+    versions = []
+    for filename in filenames:
+        version = collection_version(filename)
+        if version is None:
+            return None
+        versions.append(f"{filename}:{version}")
+    key = "|".join(versions) + "|" + str(request.url.query)
+    return '"' + hashlib.sha1(key.encode("utf-8")).hexdigest()[:20] + '"'
+
+
+def _last_modified(*filenames: str) -> Optional[datetime]:
+    latest = None
+    for filename in filenames:
+        try:
+            mtime = (get_data_dir() / filename).stat().st_mtime
+        except FileNotFoundError:
+            return None
+        latest = mtime if latest is None or mtime > latest else latest
+    if latest is None:
+        return None
+    return datetime.fromtimestamp(int(latest), tz=timezone.utc)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    candidates = [c.strip() for c in header.split(",")]
+    # Zayıf karşılaştırma: W/ öneki yok sayılır
+    return any(c.removeprefix("W/") == etag for c in candidates)
+
+
+def is_fresh(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """İstemcinin kopyası güncel mi (If-None-Match öncelikli, yoksa If-Modified-Since)"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            return last_modified <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def not_modified(request: Request, response: Response, *filenames: str) -> Optional[Response]:
+    """
+    ETag ve Last-Modified başlıklarını `response`a yaz; istemcinin kopyası
+    güncelse 304 Response döndür, değilse None (endpoint normal devam eder).
+    """
+    etag = compute_etag(request, *filenames)
+    if etag is None:
+        return None
+    last_modified = _last_modified(*filenames)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+
+    if is_fresh(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+def record_etag(record: dict) -> str:
+    return f'"v{record_version(record)}"'
+
+
+def parse_if_match(value: Optional[str]) -> Optional[int]:
+    """'"v3"', 'W/"v3"', '3' -> 3; başlık yok veya '*' ise None"""
+    if value is None or value.strip() == "*":
+        return None
+    token = value.split(",")[0].strip().removeprefix("W/").strip('"')
+    token = token.removeprefix("v")
+    if not token.isdigit():
+        raise HTTPException(status_code=400, detail="Geçersiz If-Match başlığı")
+    return int(token)
+
+
+async def if_match(if_match: Optional[str] = Header(None, alias="If-Match")) -> Optional[int]:
+    """
+    Router bağımlılığı: If-Match ile gelen sürümü isteğin bağlamına koy;
+    data_loader.commit_records commit anında diskteki sürümle karşılaştırır.
+    (async: bağlam değişkeni endpoint'in çalıştığı threadpool'a taşınır)
+    """
+    version = parse_if_match(if_match)
+    expected_version.set(version)
+    return version
@@ -1,8 +1,28 @@
 import json
 import os
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
 from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterable, Optional
+
+from . import metrics, slow_log
+
+try:
+  import fcntl
+except ImportError:  # Windows
+  fcntl = None
+  import msvcrt
+
+# save_json commit sonrası çağrılan dinleyiciler: fn(filename, data, changed_ids)
+_save_listeners: list = []
+
+
+def add_save_listener(listener: Callable[[str, Any, Optional[list]], None]) -> None:
+  if listener not in _save_listeners:
+    _save_listeners.append(listener)
 
 
 @lru_cache(maxsize=None)
@@ -14,37 +34,247 @@ def get_data_dir() -> Path:
   return Path(__file__).resolve().parent.parent.parent / "md.data"
 
 
+VERSION_FIELD = "version"
+
+# İstek başına If-Match ile beklenen kayıt sürümü (conditional.if_match ayarlar)
+expected_version: ContextVar[Optional[int]] = ContextVar("expected_version", default=None)
+
+_collection_locks: dict = {}
+_collection_locks_guard = threading.Lock()
+_lock_state = threading.local()
+
+
+class VersionConflict(Exception):
+  """Kayıt, okunduktan sonra başka bir istek tarafından değiştirilmiş"""
+
+  def __init__(self, filename: str, record_id: str, current: int, precondition: bool = False):
+    super().__init__(f"{filename}:{record_id} sürüm {current}")
+    self.filename = filename
+    self.record_id = record_id
+    self.current = current
+    # True: If-Match başlığı tutmadı (412); False: eşzamanlı commit (409)
+    self.precondition = precondition
+
+
+def record_version(record: Optional[dict]) -> int:
+  return int((record or {}).get(VERSION_FIELD) or 0)
+
+
+@contextmanager
+def collection_lock(filename: str):
+  """
+  Koleksiyon başına yazma kilidi: süreç içinde RLock, süreçler arası
+  md.data/.<dosya>.lock üzerinde dosya kilidi. İç içe kullanılabilir.
+  """
+  with _collection_locks_guard:
+    lock = _collection_locks.setdefault(filename, threading.RLock())
+  with lock:
+    held = getattr(_lock_state, "held", None)
+    if held is None:
+      held = _lock_state.held = {}
+    if held.get(filename):
+      held[filename] += 1
+      try:
+        yield
+      finally:
+        held[filename] -= 1
+      return
+    data_dir = get_data_dir()
+    data_dir.mkdir(parents=True, exist_ok=True)
+    with (data_dir / f".{filename}.lock").open("a+b") as lock_file:
+      if fcntl is not None:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+      else:
+        lock_file.seek(0)
+        msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+      held[filename] = 1
+      try:
+        yield
+      finally:
+        held[filename] = 0
+        if fcntl is not None:
+          fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+        else:
+          lock_file.seek(0)
+          msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def file_signature(filename: str) -> Optional[tuple]:
+  """Dosyanın (mtime_ns, size) imzası; dosya yoksa None. Önbellek tazeliği için."""
+  try:
+    st = (get_data_dir() / filename).stat()
+  except FileNotFoundError:
+    return None
+  return (st.st_mtime_ns, st.st_size)
+
+
+def collection_version(filename: str) -> Optional[str]:
+  """
+  Koleksiyonun sürüm belirteci. Her save_json atomik rename ile yeni bir dosya
+  oluşturduğundan (mtime_ns, size, inode) her commit'te değişir; süreçler
+  arası ve yeniden başlatmalarda tutarlıdır. Dosya yoksa None.
+  """
+  try:
+    st = (get_data_dir() / filename).stat()
+  except FileNotFoundError:
+    return None
+  return f"{st.st_mtime_ns:x}.{st.st_size:x}.{st.st_ino:x}"
+
+
 def load_json(filename: str) -> Any:
   data_dir = get_data_dir()
   path = data_dir / filename
   if not path.exists():
     raise FileNotFoundError(f"Data file not found: {path}")
   
+  start = time.perf_counter()
+  raw = path.read_bytes()
   # Try different encodings
   for encoding in ["utf-8", "utf-8-sig", "utf-16", "latin-1"]:
     try:
-      with path.open(encoding=encoding) as f:
-        return json.load(f)
+      data = json.loads(raw.decode(encoding))
     except (UnicodeDecodeError, json.JSONDecodeError):
       continue
+    elapsed = time.perf_counter() - start
+    metrics.observe_collection(filename, "read", len(raw), elapsed)
+    slow_log.record_io(filename, "read", len(raw), elapsed)
+    return data
   
   # If all encodings fail, raise error
   raise ValueError(f"Cannot decode JSON file: {path}")
 
 
-def save_json(filename: str, data: Any) -> None:
+def save_json(filename: str, data: Any, changed_ids: Optional[Iterable[str]] = None) -> None:
+  """
+  Koleksiyonu atomik olarak yaz. changed_ids verilirse değişen kayıtların
+  id'leri dinleyicilere iletilir; verilmezse tüm koleksiyon değişmiş sayılır.
+  """
   data_dir = get_data_dir()
   data_dir.mkdir(parents=True, exist_ok=True)
   path = data_dir / filename
-  # Atomic write: temp file + rename to prevent corruption
-  temp_path = path.with_suffix(path.suffix + '.tmp')
+  with collection_lock(filename):
+    start = time.perf_counter()
+    raw = json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+    # Atomic write: temp file + rename to prevent corruption
+    temp_path = path.with_suffix(path.suffix + '.tmp')
+    try:
+      with temp_path.open("wb") as f:
+        f.write(raw)
+      temp_path.replace(path)  # Atomic rename
+    except Exception:
+      if temp_path.exists():
+        temp_path.unlink()
+      raise
+    elapsed = time.perf_counter() - start
+    metrics.observe_collection(filename, "write", len(raw), elapsed)
+    slow_log.record_io(filename, "write", len(raw), elapsed)
+
+    # Dinleyiciler kilit altında çağrılır; indeksler commit sırasını görür
+    ids = list(changed_ids) if changed_ids is not None else None
+    for listener in list(_save_listeners):
+      try:
+        listener(filename, data, ids)
+      except Exception:
+        pass  # Dinleyici hataları yazma işlemini bozmamalı
+
+
+def _merge_records(filename: str, data: list, changed: list, expected: Optional[int], created: set) -> tuple:
+  """
+  Kilit altında çağrılır: diskteki güncel koleksiyonu okur, CAS/If-Match
+  kontrollerini yapar ve birleştirilmiş listeyi döndürür. Hiçbir şey yazmaz,
+  sürümleri artırmaz; (birleştirilmiş liste, gelen kayıtlar) döner.
+  """
+  incoming = {}
+  positions = {}
+  for pos, record in enumerate(data):
+    if record.get("id") in changed:
+      incoming[record["id"]] = record
+      positions[record["id"]] = pos
   try:
-    with temp_path.open("w", encoding="utf-8") as f:
-      json.dump(data, f, ensure_ascii=False, indent=2)
-    temp_path.replace(path)  # Atomic rename
-  except Exception:
-    if temp_path.exists():
-      temp_path.unlink()
-    raise
+    current = load_json(filename)
+  except FileNotFoundError:
+    current = []
+  index = {r.get("id"): i for i, r in enumerate(current)}
+
+  for record_id in changed:
+    on_disk = current[index[record_id]] if record_id in index else None
+    disk_version = record_version(on_disk)
+    record = incoming.get(record_id)
+    if on_disk is None:
+      # Diskte olmayan kayıt sadece created_ids'de ise yenidir; değilse çağıranın
+      # okuduğu kayıt (sürümü olsun olmasın) bu arada silinmiş/taşınmıştır
+      if record is not None and record_id not in created:
+        raise VersionConflict(filename, record_id, 0, precondition=expected is not None)
+      if record is None and expected is not None:
+        raise VersionConflict(filename, record_id, 0, precondition=True)
+      continue
+    if expected is not None and disk_version != expected:
+      raise VersionConflict(filename, record_id, disk_version, precondition=True)
+    if record is not None and record_version(record) != disk_version:
+      raise VersionConflict(filename, record_id, disk_version)
+
+  merged = list(current)
+  removed = {rid for rid in changed if rid not in incoming}
+  for record_id, record in incoming.items():
+    if record_id in index:
+      merged[index[record_id]] = record
+  # Yeni kayıtlar `data`daki konumlarına yakın eklenir (çoğunlukla başa/sona)
+  for record_id in sorted((rid for rid in incoming if rid not in index), key=positions.get):
+    merged.insert(min(positions[record_id], len(merged)), incoming[record_id])
+  if removed:
+    merged = [r for r in merged if r.get("id") not in removed]
+  return merged, incoming
+
+
+def _bump_versions(incoming: dict) -> None:
+  for record in incoming.values():
+    record[VERSION_FIELD] = record_version(record) + 1
+
+
+def commit_records(filename: str, data: list, changed_ids: Iterable[str], created_ids: Iterable[str] = ()) -> list:
+  """
+  Sadece changed_ids kayıtlarını compare-and-swap ile kaydet.
+
+  Kilit altında dosyanın güncel hali okunur; her değişen kayıdın `version`
+  alanı diskteki ile aynı olmalıdır (kayıt okunduktan sonra başkası yazmadı).
+  Diskte bulunmayan kayıt sadece created_ids'de verildiyse eklenir; aksi halde
+  (okunduktan sonra başkası silmiş ya da soğuk depoya taşımış) çakışmadır.
+  If-Match ile beklenen sürüm verildiyse o da kontrol edilir. Uyuşmazlıkta
+  VersionConflict fırlatılır ve hiçbir şey yazılmaz. Başarılı commit'te
+  sürümler bir artırılır (data içindeki kayıtlar da güncellenir); diğer
+  kayıtlar diskteki güncel halleriyle korunur. `data`da olmayan id silinir.
+  Birleştirilmiş koleksiyonu döndürür.
+  """
+  changed = list(dict.fromkeys(changed_ids))
+  # If-Match tek bir kaydı hedefler; çok kayıtlı commit'lerde sadece CAS uygulanır
+  expected = expected_version.get() if len(changed) == 1 else None
+
+  with collection_lock(filename):
+    merged, incoming = _merge_records(filename, data, changed, expected, set(created_ids))
+    _bump_versions(incoming)
+    save_json(filename, merged, changed)
+  return merged
+
 
+def commit_many(commits: list) -> list:
+  """
+  Birden çok koleksiyonu birlikte commit et:
+  [(dosya, data, changed_ids[, created_ids]), ...].
 
+  Tüm koleksiyon kilitleri (dosya adı sırasıyla) alınır ve her CAS kontrolü
+  yazmadan önce yapılır; herhangi biri çakışırsa hiçbir dosya yazılmaz.
+  If-Match, tek kayıtlıysa ilk commit'in kaydına uygulanır (isteğin hedefi).
+  Sırasıyla birleştirilmiş koleksiyonları döndürür.
+  """
+  commits = [(c[0], c[1], list(dict.fromkeys(c[2])), set(c[3] if len(c) > 3 else ())) for c in commits]
+  expected = expected_version.get() if commits and len(commits[0][2]) == 1 else None
+  with ExitStack() as stack:
+    for filename in sorted({c[0] for c in commits}):
+      stack.enter_context(collection_lock(filename))
+    prepared = [_merge_records(filename, data, changed, expected if pos == 0 else None, created)
+                for pos, (filename, data, changed, created) in enumerate(commits)]
+    for _, incoming in prepared:
+      _bump_versions(incoming)
+    for (filename, _, changed, _), (merged, _) in zip(commits, prepared):
+      save_json(filename, merged, changed)
+  return [merged for merged, _ in prepared]
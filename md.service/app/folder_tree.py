@@ -0,0 +1,229 @@
+"""
+Klasör Ağacı - folders.json + documents.json'dan türetilen bellek içi ağaç
+id -> düğüm (üst klasör, kökten yol, alt klasörler) ve klasör başına canlı belge
+sayısı / toplam boyut. Belge yükleme/silme/güncelleme commit'lerinde sadece
+değişen belgeler güncellenir; arşiv ekranı documents.json'u taramadan çizilir.
+Dosyalar dışarıdan değişirse imza kontrolü ile yeniden kurulur.
+"""
+import threading
+from typing import Optional
+
+from .data_loader import add_save_listener, file_signature, load_json
+
+FOLDERS_FILE = "folders.json"
+DOCUMENTS_FILE = "documents.json"
+# Belgeleri folderId yerine iş/tedarikçi bağlantısından toplanan sistem klasörleri
+JOBS_FOLDER = "FOLDER-ISLER"
+SUPPLIERS_FOLDER = "FOLDER-TEDARIKCILER"
+
+_lock = threading.Lock()
+# folders.json (iç içe "subfolders" yapısı)
+_folders: list = []
+# id -> düğüm; id -> ham klasör kaydı
+_nodes: dict = {}
+_raw: dict = {}
+_roots: list = []
+# klasör id -> {belge id: belge} (eskiden yeniye); belge id -> klasör id'leri
+_members: dict = {}
+_sizes: dict = {}
+_doc_folders: dict = {}
+_signatures: dict = {}
+
+
+def folder_ids_of(doc: dict) -> set:
+    """
+    Belgenin listelendiği klasörler (get_folder_documents kuralları). Sistem
+    klasörleri sadece kendi kuralıyla dolar; folderId'si sistem klasörü olan
+    belge oraya ayrıca eklenmez.
+    """
+    ids = set()
+    if doc.get("supplierId"):
+        ids.add(SUPPLIERS_FOLDER)
+    if doc.get("folderId") and doc["folderId"] not in (JOBS_FOLDER, SUPPLIERS_FOLDER):
+        ids.add(doc["folderId"])
+    if doc.get("jobId") and not doc.get("supplierId") and not doc.get("folderId"):
+        ids.add(JOBS_FOLDER)
+    return ids
+
+
+def _build_nodes(folders: list) -> None:
+    global _folders, _nodes, _raw, _roots
+    nodes, raw, roots = {}, {}, []
+
+    def visit(folder: dict, parent: Optional[dict]) -> None:
+        folder_id = folder.get("id")
+        if not folder_id:
+            return
+        node = {
+            "id": folder_id,
+            "name": folder.get("name"),
+            "parentId": parent["id"] if parent else None,
+            "path": (parent["path"] if parent else []) + [folder_id],
+            "pathNames": (parent["pathNames"] if parent else []) + [folder.get("name")],
+            "depth": parent["depth"] + 1 if parent else 0,
+            "childIds": [],
+        }
+        nodes[folder_id], raw[folder_id] = node, folder
+        if parent:
+            parent["childIds"].append(folder_id)
+        else:
+            roots.append(folder_id)
+        for sub in folder.get("subfolders") or []:
+            visit(sub, node)
+
+    for folder in folders:
+        visit(folder, None)
+    _folders, _nodes, _raw, _roots = folders, nodes, raw, roots
+
+
+def _remove_doc(doc_id: str) -> None:
+    for folder_id in _doc_folders.pop(doc_id, ()):
+        doc = _members[folder_id].pop(doc_id, None)
+        if doc is not None:
+            _sizes[folder_id] -= doc.get("size") or 0
+
+
+def _add_doc(doc: dict) -> None:
+    doc_id = doc["id"]
+    new_ids = folder_ids_of(doc)
+    for folder_id in _doc_folders.get(doc_id, set()) - new_ids:
+        removed = _members[folder_id].pop(doc_id)
+        _sizes[folder_id] -= removed.get("size") or 0
+    for folder_id in new_ids:
+        members = _members.setdefault(folder_id, {})
+        previous_size = (members.get(doc_id) or {}).get("size") or 0
+        # Güncellenen belge listedeki yerini korur, yeni belge en yeni olur
+        members[doc_id] = dict(doc)
+        _sizes[folder_id] = _sizes.get(folder_id, 0) + (doc.get("size") or 0) - previous_size
+    _doc_folders[doc_id] = new_ids
+
+
+def _build_members(docs: list) -> None:
+    global _members, _sizes, _doc_folders
+    _members, _sizes, _doc_folders = {}, {}, {}
+    # Dosyada en yeni belge başta; eskiden yeniye eklenir
+    for doc in reversed(docs):
+        if doc.get("id"):
+            _add_doc(doc)
+
+
+def _load(filename: str) -> list:
+    try:
+        data = load_json(filename)
+    except FileNotFoundError:
+        data = []
+    return data if isinstance(data, list) else []
+
+
+def _ensure_fresh() -> None:
+    for filename, build in ((FOLDERS_FILE, _build_nodes), (DOCUMENTS_FILE, _build_members)):
+        signature = file_signature(filename)
+        if filename in _signatures and _signatures[filename] == signature:
+            continue
+        build(_load(filename))
+        _signatures[filename] = signature
+
+
+def _on_save(filename: str, data, changed_ids: Optional[list]) -> None:
+    if filename not in (FOLDERS_FILE, DOCUMENTS_FILE):
+        return
+    data = data if isinstance(data, list) else []
+    with _lock:
+        if filename not in _signatures:
+            return  # Henüz kullanılmadı; ilk okumada kurulur
+        if filename == FOLDERS_FILE:
+            _build_nodes(data)
+        elif changed_ids is None:
+            _build_members(data)
+        else:
+            changed = set(changed_ids)
+            present = set()
+            for doc in reversed(data):
+                if doc.get("id") in changed:
+                    _add_doc(doc)
+                    present.add(doc["id"])
+            for doc_id in changed - present:
+                _remove_doc(doc_id)
+        _signatures[filename] = file_signature(filename)
+
+
+def _counts(folder_id: str) -> dict:
+    subtree_count, subtree_size = 0, 0
+    stack = [folder_id]
+    while stack:
+        current = stack.pop()
+        subtree_count += len(_members.get(current, {}))
+        subtree_size += _sizes.get(current, 0)
+        stack.extend(_nodes[current]["childIds"] if current in _nodes else [])
+    return {
+        "documentCount": len(_members.get(folder_id, {})),
+        "totalSize": _sizes.get(folder_id, 0),
+        "subtreeDocumentCount": subtree_count,
+        "subtreeSize": subtree_size,
+    }
+
+
+def _with_counts(folder: dict) -> dict:
+    result = {**folder, **_counts(folder["id"])}
+    if "subfolders" in folder:
+        result["subfolders"] = [_with_counts(sub) for sub in folder["subfolders"] if sub.get("id")]
+    return result
+
+
+def folders() -> list:
+    """folders.json iç içe yapısı; her klasörde belge sayısı ve boyutu"""
+    with _lock:
+        _ensure_fresh()
+        return [_with_counts(folder) for folder in _folders if folder.get("id")]
+
+
+def get(folder_id: str) -> Optional[dict]:
+    """Klasör kaydı (alt klasörse parentId ile) ve sayaçları"""
+    with _lock:
+        _ensure_fresh()
+        folder = _raw.get(folder_id)
+        if folder is None:
+            return None
+        result = _with_counts(folder)
+        parent_id = _nodes[folder_id]["parentId"]
+        if parent_id:
+            result["parentId"] = parent_id
+        return result
+
+
+def tree() -> dict:
+    """Düz ağaç: kök id'leri ve id -> düğüm (yol, alt klasörler, sayaçlar)"""
+    with _lock:
+        _ensure_fresh()
+        return {
+            "roots": list(_roots),
+            "nodes": {folder_id: {**node, "path": list(node["path"]), "pathNames": list(node["pathNames"]),
+                                  "childIds": list(node["childIds"]), **_counts(folder_id)}
+                      for folder_id, node in _nodes.items()},
+        }
+
+
+def documents(folder_id: str) -> Optional[list]:
+    """Klasörün belgeleri (en yeni önce); klasör yoksa None. Kayıtlar sığ kopyadır."""
+    with _lock:
+        _ensure_fresh()
+        if folder_id not in _nodes:
+            return None
+        return [dict(doc) for doc in reversed(_members.get(folder_id, {}).values())]
+
+
+def is_empty() -> bool:
+    """Hiç klasör yok mu (ilk kurulum)"""
+    with _lock:
+        _ensure_fresh()
+        return not _roots
+
+
+def rebuild() -> None:
+    """Depodan yeniden kur"""
+    with _lock:
+        _signatures.clear()
+        _ensure_fresh()
+
+
+add_save_listener(_on_save)
@@ -0,0 +1,184 @@
+"""
+Görsel Optimizasyonu - yüklenen ölçü/teknik/montaj fotoğraflarını küçültme
+Telefon fotoğrafları çoğu zaman birkaç MB'lık PNG/JPEG olarak gelir. Yüklemeden
+sonra arka plandaki iş havuzunda: IMAGE_MAX_DIMENSION'dan büyük görseller
+küçültülür, EXIF/metaveri atılır (yön bilgisi önce uygulanır), saydamlığı
+olmayanlar JPEG, olanlar optimize PNG olarak yeniden sıkıştırılır. Sonuç yeni
+bir blob olur; documents.json'daki path/sha256/size/mimeType güncellenir.
+IMAGE_KEEP_ORIGINAL=1 ise orijinal blob "originalPath" ile saklanır.
+
+Opsiyoneldir: IMAGE_OPTIMIZE=1 ve Pillow kurulu olmalı.
+"""
+import hashlib
+import io
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Optional
+
+from . import blob_store, record_index, thumbnails
+from .data_loader import load_json, save_json
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow opsiyonel
+    Image = None
+    ImageOps = None
+
+IMAGE_TYPES = {"image/jpeg", "image/png", "image/webp", "image/bmp", "image/tiff"}
+# Ölçü, teknik ve montaj fotoğrafları (müşteri imzası gibi hukuki belgeler hariç)
+OPTIMIZE_TYPES = {"olcu", "teknik", "montaj", "montaj_oncesi", "montaj_sonrasi", "montaj_sorun", "musteri_olcusu"}
+OPTIMIZE_PREFIXES = ("measure_", "technical_")
+JPEG_QUALITY = 85
+
+_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+# doc_id -> çalışan Future
+_pending: dict = {}
+
+
+def enabled() -> bool:
+    return Image is not None and os.getenv("IMAGE_OPTIMIZE", "0") == "1"
+
+
+def max_dimension() -> int:
+    return int(os.getenv("IMAGE_MAX_DIMENSION", "2560"))
+
+
+def keep_original() -> bool:
+    return os.getenv("IMAGE_KEEP_ORIGINAL", "0") == "1"
+
+
+def worker_count() -> int:
+    return max(1, int(os.getenv("IMAGE_OPTIMIZE_WORKERS", "1")))
+
+
+def eligible(doc: dict) -> bool:
+    """Optimize edilecek tip ve biçimde mi (daha önce optimize edilmemiş)"""
+    doc_type = doc.get("type") or ""
+    if doc_type not in OPTIMIZE_TYPES and not doc_type.startswith(OPTIMIZE_PREFIXES):
+        return False
+    return doc.get("mimeType") in IMAGE_TYPES and not doc.get("optimizedAt")
+
+
+def _has_alpha(img) -> bool:
+    return img.mode in ("RGBA", "LA", "PA") or (img.mode == "P" and "transparency" in img.info)
+
+
+def _recompress(source_path) -> tuple:
+    """(bayt, mimeType, uzantı, küçültüldü mü, (genişlik, yükseklik))"""
+    with Image.open(source_path) as original:
+        img = ImageOps.exif_transpose(original)
+        limit = max_dimension()
+        downscaled = max(img.size) > limit
+        if downscaled:
+            img.thumbnail((limit, limit), Image.LANCZOS)
+        out = io.BytesIO()
+        # Metaveri (EXIF, GPS, ICC profili vb.) yeni dosyaya kopyalanmaz
+        if _has_alpha(img):
+            img.save(out, "PNG", optimize=True)
+            return out.getvalue(), "image/png", ".png", downscaled, img.size
+        if img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        img.save(out, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+        return out.getvalue(), "image/jpeg", ".jpg", downscaled, img.size
+
+
+def _with_ext(name: Optional[str], ext: str) -> Optional[str]:
+    if not name:
+        return name
+    stem, old_ext = os.path.splitext(name)
+    if old_ext.lower() == ext or (ext == ".jpg" and old_ext.lower() == ".jpeg"):
+        return name
+    return stem + ext
+
+
+def optimize(doc_id: str) -> Optional[dict]:
+    """
+    Belgeyi optimize et ve güncellenmiş kaydı döndür. Uygun değilse, sonuç
+    orijinalden büyükse ya da belge bu arada silindiyse/değiştiyse None.
+    """
+    doc = record_index.first(blob_store.DOCUMENTS_FILE, "id", doc_id)
+    if not doc or not eligible(doc) or Image is None:
+        return None
+    source_path = blob_store.DOCS_ROOT / doc["path"]
+    data, mime_type, ext, downscaled, (width, height) = _recompress(source_path)
+    if not downscaled and len(data) >= doc.get("size", source_path.stat().st_size):
+        return None
+
+    checksum = hashlib.sha256(data).hexdigest()
+    temp_path = blob_store.new_temp_path()
+    try:
+        temp_path.write_bytes(data)
+        with blob_store.locked():
+            docs = load_json(blob_store.DOCUMENTS_FILE)
+            current = next((d for d in docs if d.get("id") == doc_id), None)
+            if current is None or current.get("path") != doc["path"]:
+                return None
+            relpath, _ = blob_store.ingest(temp_path, checksum)
+            old_path = current["path"]
+            current.update({
+                "path": relpath,
+                "sha256": checksum,
+                "size": len(data),
+                "mimeType": mime_type,
+                "filename": _with_ext(current.get("filename"), ext),
+                "originalName": _with_ext(current.get("originalName"), ext),
+                "width": width,
+                "height": height,
+                "originalSize": doc.get("size"),
+                "optimizedAt": datetime.utcnow().isoformat() + "Z",
+            })
+            if keep_original():
+                current["originalPath"] = old_path
+                current["originalSha256"] = doc.get("sha256")
+            save_json(blob_store.DOCUMENTS_FILE, docs, [doc_id])
+            if blob_store.release(old_path):
+                thumbnails.discard(doc)
+        return dict(current)
+    finally:
+        temp_path.unlink(missing_ok=True)
+
+
+def _run(doc_id: str) -> Optional[dict]:
+    try:
+        result = optimize(doc_id)
+    except Exception:
+        result = None  # Bozuk/okunamayan görsel: orijinal olduğu gibi kalır
+    doc = result or record_index.first(blob_store.DOCUMENTS_FILE, "id", doc_id)
+    if doc:
+        thumbnails.schedule(doc)
+    return result
+
+
+def schedule(doc: dict) -> bool:
+    """
+    Uygunsa belgeyi optimizasyon kuyruğuna al. Önizlemeler optimizasyondan sonra
+    üretilir; kuyruğa alındıysa True (çağıran önizleme planlamasını atlar).
+    """
+    global _executor
+    if not enabled() or not eligible(doc):
+        return False
+    with _lock:
+        if doc["id"] in _pending:
+            return True
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=worker_count(), thread_name_prefix="image-optimize")
+        future: Future = _executor.submit(_run, doc["id"])
+        _pending[doc["id"]] = future
+
+    def _done(_):
+        with _lock:
+            _pending.pop(doc["id"], None)
+
+    future.add_done_callback(_done)
+    return True
+
+
+def shutdown() -> None:
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
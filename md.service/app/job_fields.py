@@ -0,0 +1,55 @@
+"""
+İş Alanları - iş kayıtları için ortak özet projeksiyonu ve statü ikonları
+GET /jobs listesi, iş statü indeksi, dashboard ve son olaylar aynı yardımcıları
+kullanır; router dışındaki modüller de buradan içe aktarır.
+"""
+
+# Liste görünümü için hafif özet projeksiyon (roles, logs, teklif geçmişi hariç)
+SUMMARY_FIELDS = [
+    "id", "title", "customerId", "customerName", "status", "startType",
+    "createdAt", "isArchive", "offer.total", "estimatedAssembly", "cancelReason",
+]
+
+
+def get_path(obj, path: str):
+    """Noktalı yoldaki değer ve bulunup bulunmadığı"""
+    for part in path.split("."):
+        if not isinstance(obj, dict) or part not in obj:
+            return None, False
+        obj = obj[part]
+    return obj, True
+
+
+def project(job: dict, fields: list) -> dict:
+    """fields listesindeki (noktalı yol destekli) alanları içeren kopya"""
+    result: dict = {}
+    for path in fields:
+        value, found = get_path(job, path)
+        if not found:
+            continue
+        target = result
+        parts = path.split(".")
+        for part in parts[:-1]:
+            target = target.setdefault(part, {})
+        target[parts[-1]] = value
+    return result
+
+
+def get_status_icon(status):
+    icons = {
+        "OLCU_RANDEVU_BEKLIYOR": "phone",
+        "OLCU_ALINDI": "ruler",
+        "TEKNIK_CIZIM": "design",
+        "TEKLIF_HAZIRLANIYOR": "money",
+        "TEKLIF_ONAY_BEKLIYOR": "wait",
+        "ONAY_ALINDI": "check",
+        "URETIMDE": "factory",
+        "MONTAJ_BEKLIYOR": "tools",
+        "MONTAJDA": "wrench",
+        "TAMAMLANDI": "done",
+        "IPTAL": "cancel",
+        "FIYAT_SORGUSU_BEKLENIYOR": "price",
+        "FIYAT_SORGUSU_ONAY": "approved",
+        "FIYAT_SORGUSU_RED": "rejected"
+    }
+    return icons.get(status, "default")
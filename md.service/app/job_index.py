@@ -0,0 +1,172 @@
+"""
+İş Statü İndeksi - status -> iş id'leri ve canlı sayaçlar
+jobs.json her kaydedildiğinde (update_status, finance_close, inquiry_decision,
+production_status vb. tüm handler'lar _save_jobs üzerinden geçer) sadece değişen
+işler güncellenir. Pipeline sayıları O(1), statü sayfaları O(sonuç) döner.
+Soğuk depoya taşınan işlerin özetleri ayrıca tutulur (segment indeksi değişince
+yeniden okunur); entries() ve counters() onları da kapsar, statü sayfaları sadece
+sıcak işleri döner.
+"""
+import bisect
+import threading
+from collections import Counter
+from typing import Optional
+
+from . import cold_store
+from .data_loader import add_save_listener, file_signature, load_json
+from .job_fields import SUMMARY_FIELDS, project
+
+JOBS_FILE = "jobs.json"
+# Widget'ların ihtiyaç duyduğu, özet projeksiyonda olmayan alanlar
+EXTRA_FIELDS = ["measureDate", "assemblyDate"]
+
+_lock = threading.Lock()
+# id -> özet kayıt
+_entries: dict = {}
+# status -> [(createdAt, id), ...] artan sıralı
+_by_status: dict = {}
+# (startType, status, ölçü tarihi var mı) -> adet
+_counters: Counter = Counter()
+_signature: Optional[tuple] = None
+# Soğuk işler: id -> özet kayıt ve sayaçlar (cold_store.INDEX_FILE imzasına bağlı)
+_cold_entries: dict = {}
+_cold_counters: Counter = Counter()
+_cold_signature: Optional[tuple] = None
+
+
+def _summary(job: dict) -> dict:
+    return project(job, SUMMARY_FIELDS + EXTRA_FIELDS)
+
+
+def _order_key(entry: dict) -> tuple:
+    return (entry.get("createdAt") or "", entry.get("id") or "")
+
+
+def _counter_key(entry: dict) -> tuple:
+    return (entry.get("startType"), entry.get("status"), bool(entry.get("measureDate")))
+
+
+def _remove(job_id: str) -> None:
+    entry = _entries.pop(job_id, None)
+    if entry is None:
+        return
+    keys = _by_status.get(entry.get("status"))
+    if keys is not None:
+        key = _order_key(entry)
+        pos = bisect.bisect_left(keys, key)
+        if pos < len(keys) and keys[pos] == key:
+            keys.pop(pos)
+        if not keys:
+            del _by_status[entry.get("status")]
+    _counters[_counter_key(entry)] -= 1
+    if _counters[_counter_key(entry)] <= 0:
+        del _counters[_counter_key(entry)]
+
+
+def _add(job: dict) -> None:
+    entry = _summary(job)
+    _remove(entry["id"])
+    _entries[entry["id"]] = entry
+    bisect.insort(_by_status.setdefault(entry.get("status"), []), _order_key(entry))
+    _counters[_counter_key(entry)] += 1
+
+
+def _build(jobs: list) -> None:
+    global _entries, _by_status, _counters
+    _entries, _by_status, _counters = {}, {}, Counter()
+    for job in jobs:
+        if job.get("id"):
+            _add(job)
+
+
+def rebuild() -> None:
+    """Depodan (jobs.json) yeniden kur"""
+    global _signature
+    try:
+        jobs = load_json(JOBS_FILE)
+    except FileNotFoundError:
+        jobs = []
+    with _lock:
+        _build(jobs)
+        _signature = file_signature(JOBS_FILE)
+
+
+def _on_save(filename: str, data, changed_ids: Optional[list]) -> None:
+    global _signature
+    if filename != JOBS_FILE:
+        return
+    with _lock:
+        if changed_ids is None or _signature is None:
+            _build(data)
+        else:
+            changed = set(changed_ids)
+            for job_id in changed:
+                _remove(job_id)
+            for job in data:
+                if job.get("id") in changed:
+                    _add(job)
+        _signature = file_signature(JOBS_FILE)
+
+
+def _ensure_cold() -> None:
+    global _cold_entries, _cold_counters, _cold_signature
+    signature = file_signature(cold_store.INDEX_FILE)
+    if signature == _cold_signature:
+        return
+    entries = {job["id"]: _summary(job) for job in cold_store.jobs()}
+    with _lock:
+        _cold_entries = entries
+        _cold_counters = Counter(_counter_key(entry) for entry in entries.values())
+        _cold_signature = signature
+
+
+def _ensure_fresh() -> None:
+    if _signature is None or file_signature(JOBS_FILE) != _signature:
+        rebuild()
+    _ensure_cold()
+
+
+def _cold_only() -> list:
+    """Sıcakta da bulunmayan soğuk işler (taşıma yarıda kaldıysa sıcak kayıt geçerli)"""
+    if _entries.keys() & _cold_entries.keys():
+        return [entry for job_id, entry in _cold_entries.items() if job_id not in _entries]
+    return list(_cold_entries.values())
+
+
+def status_counts() -> dict:
+    """status -> sıcak iş sayısı (soğuk işler cold_store.count() ile ayrıca)"""
+    _ensure_fresh()
+    with _lock:
+        return {status: len(keys) for status, keys in _by_status.items()}
+
+
+def counters() -> dict:
+    """(startType, status, ölçü tarihi var mı) -> adet, soğuk işler dahil; widget hesapları için"""
+    _ensure_fresh()
+    with _lock:
+        result = _counters + _cold_counters
+        for job_id in _entries.keys() & _cold_entries.keys():
+            result[_counter_key(_cold_entries[job_id])] -= 1
+        return {key: count for key, count in result.items() if count > 0}
+
+
+def page(status: str, limit: int, offset: int = 0) -> tuple:
+    """Statüdeki sıcak işler, en yeni önce; (kayıtlar, toplam)"""
+    _ensure_fresh()
+    with _lock:
+        keys = _by_status.get(status, [])
+        total = len(keys)
+        end = max(total - offset, 0)
+        start = max(end - limit, 0)
+        items = [dict(_entries[job_id]) for _, job_id in reversed(keys[start:end])]
+    return items, total
+
+
+def entries() -> list:
+    """Tüm işlerin (soğuk dahil) özet kayıtları (jobs.json parse edilmeden); salt okunur"""
+    _ensure_fresh()
+    with _lock:
+        return list(_entries.values()) + _cold_only()
+
+
+add_save_listener(_on_save)
@@ -0,0 +1,179 @@
+"""
+JSON Patch (RFC 6902) - kayıtlara kısmi güncelleme
+Belge derin kopyalanmaz: sadece değişen yol üzerindeki dict/list'ler sığ
+kopyalanır (copy-on-write), geri kalan alt ağaçlar orijinal ile paylaşılır.
+Orijinal kayıt hiçbir durumda değişmez; hata olursa hiçbir işlem uygulanmaz.
+"""
+from copy import deepcopy
+from typing import Any
+
+OPERATIONS = {"add", "remove", "replace", "move", "copy", "test"}
+
+
+class PatchError(ValueError):
+    """Geçersiz patch belgesi veya uygulanamayan işlem"""
+
+
+class PatchTestFailed(PatchError):
+    """'test' işlemi eşleşmedi"""
+
+
+def parse_pointer(pointer: str) -> list:
+    """'/measure/drawings/0' -> ['measure', 'drawings', '0'] (RFC 6901 kaçışları ile)"""
+    if not isinstance(pointer, str):
+        raise PatchError("path metin olmalı")
+    if pointer == "":
+        return []
+    if not pointer.startswith("/"):
+        raise PatchError(f"Geçersiz JSON pointer: {pointer}")
+    return [part.replace("~1", "/").replace("~0", "~") for part in pointer[1:].split("/")]
+
+
+def _index(container: list, token: str, allow_end: bool = False) -> int:
+    if allow_end and token == "-":
+        return len(container)
+    if not token.isdigit() or (len(token) > 1 and token.startswith("0")):
+        raise PatchError(f"Geçersiz dizi indeksi: {token}")
+    idx = int(token)
+    limit = len(container) + (1 if allow_end else 0)
+    if idx >= limit:
+        raise PatchError(f"Dizi indeksi sınır dışında: {token}")
+    return idx
+
+
+def _child(container: Any, token: str) -> Any:
+    if isinstance(container, dict):
+        if token not in container:
+            raise PatchError(f"Yol bulunamadı: {token}")
+        return container[token]
+    if isinstance(container, list):
+        return container[_index(container, token)]
+    raise PatchError(f"Yol bulunamadı: {token}")
+
+
+def get_path(doc: Any, path: list) -> Any:
+    for token in path:
+        doc = _child(doc, token)
+    return doc
+
+
+def _shallow(value: Any) -> Any:
+    if isinstance(value, dict):
+        return dict(value)
+    if isinstance(value, list):
+        return list(value)
+    return value
+
+
+def _writable_parent(root: Any, path: list, owned: set) -> Any:
+    """
+    path[:-1] üzerindeki konteyneri döndür; yoldaki her konteyner bu patch
+    içinde henüz kopyalanmadıysa sığ kopyalanıp üst konteynere bağlanır.
+    """
+    node = root
+    for token in path[:-1]:
+        child = _child(node, token)
+        if not isinstance(child, (dict, list)):
+            raise PatchError(f"Yol bulunamadı: {token}")
+        if id(child) not in owned:
+            child = _shallow(child)
+            owned.add(id(child))
+            if isinstance(node, dict):
+                node[token] = child
+            else:
+                node[_index(node, token)] = child
+        node = child
+    return node
+
+
+def _add(root: Any, path: list, value: Any, owned: set) -> Any:
+    if not path:
+        return value
+    parent = _writable_parent(root, path, owned)
+    token = path[-1]
+    if isinstance(parent, dict):
+        parent[token] = value
+    elif isinstance(parent, list):
+        parent.insert(_index(parent, token, allow_end=True), value)
+    else:
+        raise PatchError(f"Yol bulunamadı: {token}")
+    return root
+
+
+def _remove(root: Any, path: list, owned: set) -> tuple:
+    if not path:
+        raise PatchError("Kök belge silinemez")
+    parent = _writable_parent(root, path, owned)
+    token = path[-1]
+    if isinstance(parent, dict):
+        if token not in parent:
+            raise PatchError(f"Yol bulunamadı: {token}")
+        return root, parent.pop(token)
+    if isinstance(parent, list):
+        return root, parent.pop(_index(parent, token))
+    raise PatchError(f"Yol bulunamadı: {token}")
+
+
+def apply_patch(doc: Any, operations: list) -> Any:
+    """
+    RFC 6902 işlemlerini uygula ve yeni belgeyi döndür. Geçersiz işlemde
+    PatchError, başarısız 'test' işleminde PatchTestFailed fırlatılır.
+    """
+    if not isinstance(operations, list):
+        raise PatchError("Patch belgesi bir işlem listesi olmalı")
+    root = _shallow(doc)
+    # Bu patch içinde kopyalanmış (artık bize ait) konteynerler
+    owned = {id(root)}
+    for op in operations:
+        if not isinstance(op, dict) or op.get("op") not in OPERATIONS:
+            raise PatchError(f"Geçersiz işlem: {op}")
+        kind = op["op"]
+        path = parse_pointer(op.get("path"))
+        if kind in ("add", "replace", "test") and "value" not in op:
+            raise PatchError(f"'{kind}' işlemi için value zorunlu")
+
+        if kind == "add":
+            # Değer istemciden gelir; paylaşılmaması için kopyalanır
+            root = _add(root, path, deepcopy(op["value"]), owned)
+        elif kind == "remove":
+            root, _ = _remove(root, path, owned)
+        elif kind == "replace":
+            if path:
+                # Var olmalı; alan sırası korunur
+                get_path(root, path)
+                parent = _writable_parent(root, path, owned)
+                key = path[-1] if isinstance(parent, dict) else _index(parent, path[-1])
+                parent[key] = deepcopy(op["value"])
+            else:
+                root = deepcopy(op["value"])
+        elif kind == "test":
+            if get_path(root, path) != op["value"]:
+                raise PatchTestFailed(f"Test başarısız: {op['path']}")
+        else:
+            source = parse_pointer(op.get("from"))
+            if kind == "move":
+                if path[:len(source)] == source and path != source:
+                    raise PatchError("Bir değer kendi alt yoluna taşınamaz")
+                root, value = _remove(root, source, owned)
+            else:
+                value = deepcopy(get_path(root, source))
+            root = _add(root, path, value, owned)
+    return root
+
+
+# Belgeyi değiştiren işlemler; "test" sadece okur, "copy" kaynağı değişmez
+WRITE_OPS = ("add", "remove", "replace", "move", "copy")
+
+
+def touched_fields(operations: list) -> set:
+    """İşlemlerin değiştirdiği üst seviye alanlar ('/measure/x' -> 'measure')"""
+    fields = set()
+    for op in operations:
+        if not isinstance(op, dict) or op.get("op") not in WRITE_OPS:
+            continue
+        keys = ("path", "from") if op["op"] == "move" else ("path",)
+        for key in keys:
+            if isinstance(op.get(key), str):
+                parts = parse_pointer(op[key])
+                fields.add(parts[0] if parts else "")
+    return fields
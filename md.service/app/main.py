@@ -1,11 +1,20 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from .data_loader import VersionConflict
+from .upload_limit import UploadLimitMiddleware
+from . import cold_store, folder_tree, image_optimizer, job_index, metrics, profiling, recent_events, search_index, slow_log, thumbnails
 
 from .routers import (
     activities,
     archive,
     assembly,
     auth,
+    changes,
     colors,
     customers,
     dashboard,
@@ -16,23 +25,59 @@ from .routers import (
     personnel,
     planning,
     production,
+    profiles,
     purchase,
     reports,
     roles,
+    search,
     settings,
     stock,
+    storage,
     suppliers,
     tasks,
     teams,
+    upload_sessions,
     users,
 )
 
+async def _cold_tiering_loop(interval_hours: float):
+  """Kapanmış eski işleri periyodik olarak soğuk depoya taşı"""
+  while True:
+    try:
+      await asyncio.to_thread(cold_store.tier_jobs)
+    except Exception:
+      pass  # Bir sonraki turda tekrar denenir
+    await asyncio.sleep(interval_hours * 3600)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+  # Bellek içi yapıları depodan kur
+  recent_events.rebuild()
+  job_index.rebuild()
+  search_index.rebuild()
+  folder_tree.rebuild()
+  tiering = None
+  if cold_store.interval_hours() > 0:
+    tiering = asyncio.create_task(_cold_tiering_loop(cold_store.interval_hours()))
+  yield
+  image_optimizer.shutdown()
+  thumbnails.shutdown()
+  if tiering is not None:
+    tiering.cancel()
+    with suppress(asyncio.CancelledError):
+      await tiering
+
+
 app = FastAPI(
     title="MD Service",
     description="Modüler FastAPI backend; veri kaynağı md.data klasörü.",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
+# Yükleme gövdesi ayrıştırılıp diske alınmadan önce boyut sınırı (CORS bunun dışında kalır)
+app.add_middleware(UploadLimitMiddleware, limits={"/documents/upload": documents.upload_body_limit})
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -40,6 +85,23 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.middleware("http")(profiling.profiling_middleware)
+app.middleware("http")(slow_log.slow_log_middleware)
+app.middleware("http")(metrics.metrics_middleware)
+
+
+@app.exception_handler(VersionConflict)
+async def version_conflict_handler(request, exc: VersionConflict):
+  """Kayıt başka bir istekle değişmiş: If-Match tutmadıysa 412, eşzamanlı commit ise 409"""
+  return JSONResponse(
+      status_code=412 if exc.precondition else 409,
+      content={
+          "detail": "Kayıt başka bir kullanıcı tarafından güncellendi. Lütfen yenileyip tekrar deneyin.",
+          "id": exc.record_id,
+          "currentVersion": exc.current,
+      },
+      headers={"ETag": f'"v{exc.current}"'},
+  )
 
 app.include_router(auth.router)
 app.include_router(activities.router)
@@ -60,13 +122,27 @@ app.include_router(reports.router)
 app.include_router(settings.router)
 app.include_router(colors.router)
 app.include_router(documents.router)
+app.include_router(upload_sessions.router)
 app.include_router(folders.router)
 app.include_router(production.router)
 app.include_router(assembly.router)
 app.include_router(users.router)
+app.include_router(profiles.router)
+app.include_router(storage.router)
+app.include_router(changes.router)
+app.include_router(search.router)
 
 
 @app.get("/health", tags=["meta"])
 def health():
   return {"status": "ok"}
 
+
+@app.get("/metrics", tags=["meta"], response_class=PlainTextResponse)
+def get_metrics():
+  """Prometheus text formatında operasyon metrikleri"""
+  return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
+# Profil sarmalayıcısı tüm route'lar tanımlandıktan sonra kurulmalı
+profiling.install(app)
@@ -0,0 +1,157 @@
+"""
+Operasyon Metrikleri - /metrics endpoint'i için Prometheus text formatı
+Route bazlı istek sayısı, süre histogramı ve eşzamanlı istek sayısı;
+koleksiyon bazlı okuma/yazma sayısı, byte ve süre; aktivite log kuyruğu.
+"""
+import threading
+import time
+
+from starlette.routing import Match
+
+# Histogram kovaları (saniye)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_lock = threading.Lock()
+
+# (method, route, status) -> adet
+_request_counts: dict = {}
+# (method, route) -> [kova sayıları..., toplam süre, adet]
+_request_latency: dict = {}
+# (method, route) -> o an işlenen istek sayısı
+_in_flight: dict = {}
+# (collection, op) -> [adet, byte, süre]
+_collection_ops: dict = {}
+# Aktivite log yazımı bekleyen/işlenen kayıt sayısı
+_activity_pending = 0
+_activity_written = 0
+
+
+def collection_name(filename: str) -> str:
+    """jobs.json -> jobs"""
+    return filename[:-5] if filename.endswith(".json") else filename
+
+
+def observe_request(method: str, route: str, status: int, seconds: float) -> None:
+    key = (method, route)
+    with _lock:
+        count_key = (method, route, str(status))
+        _request_counts[count_key] = _request_counts.get(count_key, 0) + 1
+        hist = _request_latency.get(key)
+        if hist is None:
+            hist = [0] * len(LATENCY_BUCKETS) + [0.0, 0]
+            _request_latency[key] = hist
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                hist[i] += 1
+        hist[-2] += seconds
+        hist[-1] += 1
+
+
+def track_in_flight(method: str, route: str, delta: int) -> None:
+    key = (method, route)
+    with _lock:
+        _in_flight[key] = _in_flight.get(key, 0) + delta
+
+
+def observe_collection(filename: str, op: str, nbytes: int, seconds: float) -> None:
+    """data_loader tarafından her load_json/save_json çağrısında çağrılır"""
+    key = (collection_name(filename), op)
+    with _lock:
+        entry = _collection_ops.get(key)
+        if entry is None:
+            entry = [0, 0, 0.0]
+            _collection_ops[key] = entry
+        entry[0] += 1
+        entry[1] += nbytes
+        entry[2] += seconds
+
+
+def activity_queue(delta: int) -> None:
+    """Aktivite log yazımı başladığında +1, bittiğinde -1"""
+    global _activity_pending, _activity_written
+    with _lock:
+        _activity_pending += delta
+        if delta < 0:
+            _activity_written += 1
+
+
+def _resolve_route(request) -> str:
+    """İsteğin eşleştiği route şablonunu bul (/jobs/{job_id} gibi)"""
+    for route in request.app.router.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return getattr(route, "path", request.url.path)
+    return "unmatched"
+
+
+async def metrics_middleware(request, call_next):
+    """Route bazlı istek metriklerini topla"""
+    method = request.method
+    route = _resolve_route(request)
+    track_in_flight(method, route, 1)
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        observe_request(method, route, status, time.perf_counter() - start)
+        track_in_flight(method, route, -1)
+
+
+def _labels(**labels) -> str:
+    parts = []
+    for key, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{key}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def render() -> str:
+    """Tüm metrikleri Prometheus text formatında döndür"""
+    lines = []
+    with _lock:
+        lines.append("# HELP md_http_requests_total Route bazlı HTTP istek sayısı")
+        lines.append("# TYPE md_http_requests_total counter")
+        for (method, route, status), count in sorted(_request_counts.items()):
+            lines.append(f"md_http_requests_total{_labels(method=method, route=route, status=status)} {count}")
+
+        lines.append("# HELP md_http_request_duration_seconds Route bazlı istek süresi")
+        lines.append("# TYPE md_http_request_duration_seconds histogram")
+        for (method, route), hist in sorted(_request_latency.items()):
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                lines.append(
+                    f"md_http_request_duration_seconds_bucket{_labels(method=method, route=route, le=bound)} {hist[i]}"
+                )
+            lines.append(
+                f"md_http_request_duration_seconds_bucket{_labels(method=method, route=route, le='+Inf')} {hist[-1]}"
+            )
+            lines.append(f"md_http_request_duration_seconds_sum{_labels(method=method, route=route)} {hist[-2]:.6f}")
+            lines.append(f"md_http_request_duration_seconds_count{_labels(method=method, route=route)} {hist[-1]}")
+
+        lines.append("# HELP md_http_requests_in_flight O an işlenen istek sayısı")
+        lines.append("# TYPE md_http_requests_in_flight gauge")
+        for (method, route), count in sorted(_in_flight.items()):
+            lines.append(f"md_http_requests_in_flight{_labels(method=method, route=route)} {count}")
+
+        for metric, idx, mtype, help_text in (
+            ("md_collection_ops_total", 0, "counter", "Koleksiyon bazlı okuma/yazma sayısı"),
+            ("md_collection_bytes_total", 1, "counter", "Koleksiyon bazlı okunan/yazılan byte"),
+            ("md_collection_duration_seconds_total", 2, "counter", "Koleksiyon bazlı okuma/yazma süresi"),
+        ):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {mtype}")
+            for (collection, op), entry in sorted(_collection_ops.items()):
+                value = f"{entry[idx]:.6f}" if idx == 2 else entry[idx]
+                lines.append(f"{metric}{_labels(collection=collection, op=op)} {value}")
+
+        lines.append("# HELP md_activity_log_queue_depth Yazılmayı bekleyen aktivite log kaydı")
+        lines.append("# TYPE md_activity_log_queue_depth gauge")
+        lines.append(f"md_activity_log_queue_depth {_activity_pending}")
+        lines.append("# HELP md_activity_log_written_total Yazılan aktivite log kaydı")
+        lines.append("# TYPE md_activity_log_written_total counter")
+        lines.append(f"md_activity_log_written_total {_activity_written}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,240 @@
+"""
+İstek Profilleme - talep üzerine veya rastgele örnekleme ile handler profili
+Admin kullanıcı X-Profile: 1 header'ı veya ?_profile=1 ile herhangi bir istekte
+profil alabilir; PROFILE_SAMPLE_RATE ile rastgele örnekleme yapılır.
+Profiller diskte sınırlı bir halka tamponda (ring buffer) tutulur ve
+flamegraph için collapsed-stack formatında dışa aktarılabilir.
+Örnekleyici handler'ı çalıştıran thread'i izler: sync handler'larda bu sadece
+o isteğin thread'idir (scope="handler"); async handler'larda event loop
+thread'idir ve aynı anda çalışan diğer istekler de örneklenir (scope="loop").
+"""
+import asyncio
+import contextvars
+import functools
+import json
+import os
+import random
+import secrets
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from fastapi.routing import APIRoute
+
+from .routers.auth import get_current_user_from_token, is_admin
+
+# Varsayılan profil dizini: md.service ile aynı seviyede md.profiles
+DEFAULT_PROFILE_DIR = Path(__file__).resolve().parent.parent.parent / "md.profiles"
+
+_active: contextvars.ContextVar = contextvars.ContextVar("md_profile_session", default=None)
+_write_lock = threading.Lock()
+
+
+def _sample_rate() -> float:
+    try:
+        return float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+    except ValueError:
+        return 0.0
+
+
+def _interval() -> float:
+    try:
+        return max(0.0005, float(os.getenv("PROFILE_INTERVAL_MS", "2")) / 1000)
+    except ValueError:
+        return 0.002
+
+
+def _max_entries() -> int:
+    try:
+        return max(1, int(os.getenv("PROFILE_MAX_ENTRIES", "50")))
+    except ValueError:
+        return 50
+
+
+def get_profile_dir() -> Path:
+    env_dir = os.getenv("PROFILE_DIR")
+    return Path(env_dir).resolve() if env_dir else DEFAULT_PROFILE_DIR
+
+
+class ProfileSession:
+    """Tek bir isteğin profil oturumu"""
+
+    def __init__(self, trigger: str, user_id: Optional[str]):
+        self.trigger = trigger
+        self.user_id = user_id
+        self.route: Optional[str] = None
+        self.scope = "handler"
+        self.stacks: dict = {}
+        self.samples = 0
+        self.interval = _interval()
+
+    def _sample_loop(self, ident: int, stop: threading.Event):
+        while not stop.wait(self.interval):
+            frame = sys._current_frames().get(ident)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{Path(code.co_filename).stem}:{code.co_name}")
+                frame = frame.f_back
+            key = ";".join(reversed(stack))
+            self.stacks[key] = self.stacks.get(key, 0) + 1
+            self.samples += 1
+
+    def start(self):
+        stop = threading.Event()
+        sampler = threading.Thread(
+            target=self._sample_loop, args=(threading.get_ident(), stop),
+            name="md-profiler", daemon=True,
+        )
+        sampler.start()
+        return stop, sampler
+
+    @staticmethod
+    def stop(handle):
+        stop, sampler = handle
+        stop.set()
+        sampler.join()
+
+
+def _wrap_endpoint(call, route_path: str):
+    """Endpoint'i, aktif profil oturumu varsa örnekleyici altında çalıştıracak şekilde sar"""
+    if asyncio.iscoroutinefunction(call):
+        @functools.wraps(call)
+        async def async_wrapper(*args, **kwargs):
+            session = _active.get()
+            if session is None:
+                return await call(*args, **kwargs)
+            session.route = route_path
+            # Event loop thread'i örneklenir: profil loop genelidir
+            session.scope = "loop"
+            handle = session.start()
+            try:
+                return await call(*args, **kwargs)
+            finally:
+                session.stop(handle)
+        return async_wrapper
+
+    @functools.wraps(call)
+    def sync_wrapper(*args, **kwargs):
+        session = _active.get()
+        if session is None:
+            return call(*args, **kwargs)
+        session.route = route_path
+        handle = session.start()
+        try:
+            return call(*args, **kwargs)
+        finally:
+            session.stop(handle)
+    return sync_wrapper
+
+
+def install(app) -> None:
+    """Tüm API route'larının endpoint çağrısını profil sarmalayıcısı ile değiştir"""
+    for route in app.routes:
+        if isinstance(route, APIRoute) and not getattr(route.dependant.call, "_md_profiled", False):
+            wrapped = _wrap_endpoint(route.dependant.call, route.path)
+            wrapped._md_profiled = True
+            route.dependant.call = wrapped
+
+
+def _should_profile(request) -> tuple:
+    flag = request.headers.get("x-profile") or request.query_params.get("_profile")
+    if flag and flag not in ("0", "false"):
+        authorization = request.headers.get("authorization")
+        if is_admin(authorization):
+            return "flag", (get_current_user_from_token(authorization) or {}).get("id")
+    rate = _sample_rate()
+    if rate > 0 and random.random() < rate:
+        user = get_current_user_from_token(request.headers.get("authorization"))
+        return "sample", user.get("id") if user else None
+    return None, None
+
+
+async def profiling_middleware(request, call_next):
+    trigger, user_id = _should_profile(request)
+    if trigger is None:
+        return await call_next(request)
+
+    session = ProfileSession(trigger, user_id)
+    token = _active.set(session)
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        _active.reset(token)
+    # Route eşleşmediyse (404 vb.) profil kaydedilmez
+    if session.route is not None:
+        duration = time.perf_counter() - start
+        response.headers["X-Profile-Id"] = save_profile(session, request, response.status_code, duration)
+    return response
+
+
+def save_profile(session: ProfileSession, request, status: int, duration: float) -> str:
+    """Profili diske yaz ve halka tamponu PROFILE_MAX_ENTRIES ile sınırla"""
+    profile_dir = get_profile_dir()
+    profile_dir.mkdir(parents=True, exist_ok=True)
+    now = datetime.now()
+    profile_id = f"PRF-{now.strftime('%Y%m%d%H%M%S%f')}-{secrets.token_hex(3)}"
+    entry = {
+        "id": profile_id,
+        "createdAt": now.isoformat(),
+        "method": request.method,
+        "path": request.url.path,
+        "route": session.route,
+        "query": dict(request.query_params),
+        "userId": session.user_id,
+        "trigger": session.trigger,
+        "scope": session.scope,
+        "status": status,
+        "durationMs": round(duration * 1000, 3),
+        "intervalMs": round(session.interval * 1000, 3),
+        "samples": session.samples,
+        "stacks": session.stacks,
+    }
+    with _write_lock:
+        (profile_dir / f"{profile_id}.json").write_text(
+            json.dumps(entry, ensure_ascii=False), encoding="utf-8"
+        )
+        files = sorted(profile_dir.glob("PRF-*.json"))
+        for old in files[:-_max_entries()]:
+            try:
+                old.unlink()
+            except OSError:
+                pass
+    return profile_id
+
+
+def list_profiles() -> list:
+    """Kayıtlı profillerin özetini (en yeni önce) döndür"""
+    profile_dir = get_profile_dir()
+    if not profile_dir.exists():
+        return []
+    result = []
+    for path in sorted(profile_dir.glob("PRF-*.json"), reverse=True):
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        entry.pop("stacks", None)
+        result.append(entry)
+    return result
+
+
+def load_profile(profile_id: str) -> Optional[dict]:
+    if not profile_id.startswith("PRF-") or "/" in profile_id or "\\" in profile_id:
+        return None
+    path = get_profile_dir() / f"{profile_id}.json"
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def to_collapsed(entry: dict) -> str:
+    """flamegraph.pl / speedscope için collapsed-stack formatı"""
+    lines = [f"{stack} {count}" for stack, count in sorted(entry.get("stacks", {}).items())]
+    return "\n".join(lines) + ("\n" if lines else "")
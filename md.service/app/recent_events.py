@@ -0,0 +1,92 @@
+"""
+Son İş Hareketleri - dashboard "recent-activities" widget'ı için sınırlı top-K yapı
+Her işin son 5 log kaydından en yenileri bellekte tutulur. jobs.json her
+kaydedildiğinde sadece değişen işlerin kayıtları güncellenir; başlangıçta ve
+dosya dışarıdan değiştiğinde depodan yeniden kurulur. Widget O(K) çalışır.
+"""
+import heapq
+import threading
+from typing import Optional
+
+from .data_loader import add_save_listener, file_signature, load_json
+from .job_fields import get_status_icon
+
+JOBS_FILE = "jobs.json"
+# İş başına dikkate alınan son log sayısı (widget'ın eski davranışı ile aynı)
+LOGS_PER_JOB = 5
+# Tutulan kayıt sayısı; widget 10 döndürür, fazlası değişen işlerin eski
+# kayıtları düştüğünde listenin dolu kalması için tampon
+CAPACITY = 100
+
+_lock = threading.Lock()
+_entries: list = []
+_signature: Optional[tuple] = None
+
+
+def _time_key(entry: dict) -> str:
+    return entry.get("time") or ""
+
+
+def _job_entries(job: dict) -> list:
+    logs = job.get("logs", []) or []
+    return [
+        {
+            "id": job["id"],
+            "type": log.get("action", "update"),
+            "title": job.get("title", ""),
+            "customer": job.get("customerName", ""),
+            "status": job.get("status", ""),
+            "time": log.get("at", ""),
+            "note": log.get("note", ""),
+            "icon": get_status_icon(job.get("status", "")),
+        }
+        for log in logs[-LOGS_PER_JOB:]
+    ]
+
+
+def _build(jobs: list) -> list:
+    return heapq.nlargest(CAPACITY, (e for job in jobs for e in _job_entries(job)), key=_time_key)
+
+
+def rebuild() -> None:
+    """Depodan (jobs.json) yeniden kur"""
+    global _entries, _signature
+    try:
+        jobs = load_json(JOBS_FILE)
+    except FileNotFoundError:
+        jobs = []
+    with _lock:
+        _entries = _build(jobs)
+        _signature = file_signature(JOBS_FILE)
+
+
+def _on_save(filename: str, data, changed_ids: Optional[list]) -> None:
+    global _entries, _signature
+    if filename != JOBS_FILE:
+        return
+    with _lock:
+        if changed_ids is None or _signature is None:
+            # Hangi işlerin değiştiği bilinmiyor: bellekteki veriden yeniden kur (parse yok)
+            _entries = _build(data)
+        else:
+            changed = set(changed_ids)
+            full = len(_entries) >= CAPACITY
+            fresh = [e for job in data if job.get("id") in changed for e in _job_entries(job)]
+            kept = (e for e in _entries if e["id"] not in changed)
+            _entries = heapq.nlargest(CAPACITY, [*kept, *fresh], key=_time_key)
+            if full and len(_entries) < CAPACITY:
+                # Silinen/soğuğa taşınan işlerin kayıtları düştü; yerlerini
+                # daha eski kayıtlar alabilir: bellekteki veriden yeniden kur
+                _entries = _build(data)
+        _signature = file_signature(JOBS_FILE)
+
+
+def top(limit: int = 10) -> list:
+    """En yeni `limit` kayıt; jobs.json dışarıdan değiştiyse önce yeniden kurulur"""
+    if _signature is None or file_signature(JOBS_FILE) != _signature:
+        rebuild()
+    with _lock:
+        return list(_entries[:limit])
+
+
+add_save_listener(_on_save)
@@ -0,0 +1,110 @@
+"""
+Kayıt İndeksleri - koleksiyonlarda alan değerine göre ikincil indeks
+lookup("documents.json", "jobId", id) gibi çağrılar koleksiyonu her istekte
+taramak yerine ilk kullanımda kurulan {değer: [kayıtlar]} haritasından cevaplanır.
+Anahtar tek alan ya da alan demeti olabilir (ör. ("productCode", "colorCode")).
+save_json commit'lerinde sadece yerinde güncellenen kayıtlar (anahtar değeri
+değişmeyen, ör. stok miktarı) indekste değiştirilir; ekleme/silme/anahtar
+değişikliğinde indeks ilk kullanımda bellekteki veriden yeniden kurulur.
+Dosya dışarıdan değişirse imza kontrolü ile yeniden okunur.
+"""
+import threading
+from typing import Optional, Union
+
+from .data_loader import add_save_listener, file_signature, load_json
+
+_lock = threading.Lock()
+# dosya -> kayıt listesi (son commit'teki veya diskteki hali)
+_records: dict = {}
+_signatures: dict = {}
+# (dosya, anahtar) -> {değer: [kayıtlar]}
+_indexes: dict = {}
+
+
+def _key_value(record: dict, key: Union[str, tuple]):
+    if isinstance(key, tuple):
+        return tuple(record.get(field) for field in key)
+    return record.get(key)
+
+
+def _ensure_loaded(filename: str) -> None:
+    signature = file_signature(filename)
+    if filename in _records and _signatures.get(filename) == signature:
+        return
+    try:
+        records = load_json(filename)
+    except FileNotFoundError:
+        records = []
+    _records[filename] = records if isinstance(records, list) else []
+    _signatures[filename] = signature
+    for index_key in [k for k in _indexes if k[0] == filename]:
+        del _indexes[index_key]
+
+
+def _index(filename: str, key: Union[str, tuple]) -> dict:
+    _ensure_loaded(filename)
+    index = _indexes.get((filename, key))
+    if index is None:
+        index = {}
+        for record in _records[filename]:
+            index.setdefault(_key_value(record, key), []).append(record)
+        _indexes[(filename, key)] = index
+    return index
+
+
+def lookup(filename: str, key: Union[str, tuple], value) -> list:
+    """
+    Anahtarı `value` olan kayıtlar (dosyadaki sırayla). Kayıtlar sığ kopyadır;
+    çağıran üst seviye alan ekleyebilir (ör. isOverdue), indeks bozulmaz.
+    """
+    with _lock:
+        return [dict(record) for record in _index(filename, key).get(value, [])]
+
+
+def first(filename: str, key: Union[str, tuple], value) -> Optional[dict]:
+    """Anahtarı `value` olan ilk kayıt (yoksa None)"""
+    with _lock:
+        matches = _index(filename, key).get(value)
+        return dict(matches[0]) if matches else None
+
+
+def _patch(index: dict, key: Union[str, tuple], before: dict, after: dict) -> bool:
+    """Değişen kayıtları indekste yerinde değiştir; mümkün değilse False"""
+    for record_id, old in before.items():
+        new = after.get(record_id)
+        # Aynı nesne commit'ten önce yerinde değiştirilmiş olabilir: eski anahtar bilinmez
+        if new is None or new is old or _key_value(old, key) != _key_value(new, key):
+            return False
+        bucket = index.get(_key_value(old, key), [])
+        for pos, record in enumerate(bucket):
+            if record is old:
+                bucket[pos] = new
+                break
+        else:
+            return False
+    return len(after) == len(before)
+
+
+def _on_save(filename: str, data, changed_ids: Optional[list]) -> None:
+    with _lock:
+        if filename not in _records:
+            return
+        previous = _records[filename]
+        _records[filename] = data if isinstance(data, list) else []
+        _signatures[filename] = file_signature(filename)
+        index_keys = [k for k in _indexes if k[0] == filename]
+        if not index_keys:
+            return
+        if changed_ids is None:
+            for index_key in index_keys:
+                del _indexes[index_key]
+            return
+        changed = set(changed_ids)
+        before = {r.get("id"): r for r in previous if r.get("id") in changed}
+        after = {r.get("id"): r for r in _records[filename] if r.get("id") in changed}
+        for index_key in index_keys:
+            if len(before) != len(changed) or not _patch(_indexes[index_key], index_key[1], before, after):
+                del _indexes[index_key]
+
+
+add_save_listener(_on_save)
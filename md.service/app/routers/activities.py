@@ -6,6 +6,7 @@ from typing import Optional
 from datetime import datetime, timedelta
 
 from ..data_loader import load_json
+from .. import record_index
 
 router = APIRouter(prefix="/activities", tags=["activities"])
 
@@ -110,9 +111,7 @@ async def get_activities_by_target(target_type: str, target_id: str, limit: int
     """
     Belirli bir hedefle ilgili aktiviteleri getir (iş, müşteri, personel vb.)
     """
-    activities = load_json("activities.json")
-    
-    filtered = [a for a in activities if a.get("targetType") == target_type and a.get("targetId") == target_id]
+    filtered = record_index.lookup("activities.json", ("targetType", "targetId"), (target_type, target_id))
     
     return {
         "items": filtered[:limit],
@@ -12,6 +12,7 @@ from pydantic import BaseModel
 from typing import Optional, List
 
 from ..data_loader import load_json, save_json
+from .. import record_index
 from ..activity_logger import log_activity, get_action_icon
 
 router = APIRouter(prefix="/assembly", tags=["assembly"])
@@ -253,9 +254,10 @@ def get_today_tasks(teamId: Optional[str] = None):
 @router.get("/tasks/by-job/{job_id}")
 def get_tasks_by_job(job_id: str):
     """Bir iş için tüm montaj görevleri"""
-    tasks = load_json("assemblyTasks.json")
-    job_tasks = [t for t in tasks if t.get("jobId") == job_id]
-    
+    return _job_tasks_summary(record_index.lookup("assemblyTasks.json", "jobId", job_id))
+
+
+def _job_tasks_summary(job_tasks: list) -> dict:
     # İş kolu bazlı grupla
     roles_map = {}
     for task in job_tasks:
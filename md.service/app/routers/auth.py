@@ -70,6 +70,12 @@ def get_current_user_from_token(authorization: Optional[str] = Header(None)) ->
     return None
 
 
+def is_admin(authorization: Optional[str]) -> bool:
+    """Oturum kullanıcısı admin mi (admin endpoint'leri için)"""
+    user = get_current_user_from_token(authorization)
+    return bool(user) and user.get("role") == "admin"
+
+
 @router.post("/login", response_model=LoginResponse)
 async def login(request: LoginRequest):
     """Kullanıcı girişi"""
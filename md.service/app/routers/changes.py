@@ -0,0 +1,67 @@
+"""
+Değişiklik Akışı API
+SSE (/changes/stream) veya WebSocket (/changes/ws) üzerinden koleksiyon
+değişiklik olayları; ?collections=jobs,stockItems ile filtrelenir.
+"""
+from fastapi import APIRouter, Header, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from typing import Optional
+
+from .. import change_feed
+
+router = APIRouter(prefix="/changes", tags=["changes"])
+
+
+@router.get("/stream")
+async def stream_changes(
+    request: Request,
+    collections: Optional[str] = Query(None, description="Virgülle ayrılmış koleksiyonlar (boş ise hepsi)"),
+    heartbeat: float = Query(15, ge=1, le=120, description="Heartbeat aralığı (saniye)"),
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+):
+    """Server-sent events ile değişiklik akışı"""
+    sub = change_feed.subscribe(change_feed.parse_collections(collections), last_event_id)
+
+    async def events():
+        try:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                event = await sub.next_event(heartbeat)
+                if event is None:
+                    yield ": heartbeat\n\n"
+                else:
+                    yield change_feed.format_sse(event)
+        finally:
+            change_feed.unsubscribe(sub)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/ws")
+async def websocket_changes(websocket: WebSocket, collections: Optional[str] = None, heartbeat: float = 15):
+    """WebSocket ile değişiklik akışı (SSE alternatifi)"""
+    sub = change_feed.subscribe(change_feed.parse_collections(collections))
+    await websocket.accept()
+    heartbeat = min(max(heartbeat, 1), 120)
+    try:
+        while True:
+            event = await sub.next_event(heartbeat)
+            await websocket.send_json(event or {"type": "heartbeat", "id": change_feed.current_seq(), "epoch": change_feed.EPOCH})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        change_feed.unsubscribe(sub)
+
+
+@router.get("/status")
+def feed_status():
+    """Akış durumu: son olay numarası, süreç epoch'u ve aktif abone sayısı"""
+    return {
+        "lastEventId": change_feed.current_seq(),
+        "epoch": change_feed.EPOCH,
+        "subscribers": change_feed.subscriber_count(),
+    }
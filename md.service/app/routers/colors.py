@@ -1,8 +1,9 @@
 import uuid
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
 from pydantic import BaseModel
 
 from ..data_loader import load_json, save_json
+from ..conditional import not_modified
 
 router = APIRouter(prefix="/colors", tags=["colors"])
 
@@ -13,7 +14,14 @@ class ColorIn(BaseModel):
 
 
 @router.get("/")
-def list_colors():
+def list_colors(request: Request, response: Response):
+  cached = not_modified(request, response, "colors.json")
+  if cached:
+    return cached
+  return _colors()
+
+
+def _colors():
   try:
     return load_json("colors.json")
   except FileNotFoundError:
@@ -25,7 +33,7 @@ def list_colors():
 
 @router.post("/", status_code=201)
 def create_color(payload: ColorIn):
-  colors = list_colors()
+  colors = _colors()
   # Check duplicates
   if any(c["code"] == payload.code for c in colors):
     raise HTTPException(status_code=400, detail="Renk kodu zaten mevcut")
@@ -42,7 +50,7 @@ def create_color(payload: ColorIn):
 
 @router.put("/{color_id}")
 def update_color(color_id: str, payload: ColorIn):
-  colors = list_colors()
+  colors = _colors()
   for idx, c in enumerate(colors):
     if c["id"] == color_id:
       colors[idx] = {
@@ -57,7 +65,7 @@ def update_color(color_id: str, payload: ColorIn):
 
 @router.delete("/{color_id}")
 def delete_color(color_id: str):
-  colors = list_colors()
+  colors = _colors()
   colors = [c for c in colors if c["id"] != color_id]
   save_json("colors.json", colors)
   return {"success": True}
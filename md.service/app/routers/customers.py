@@ -1,12 +1,13 @@
 import uuid
-from fastapi import APIRouter, HTTPException, Header
+from fastapi import APIRouter, Depends, HTTPException, Header, Request, Response
 from pydantic import BaseModel, Field
 from typing import Optional
 
-from ..data_loader import load_json, save_json
+from ..data_loader import commit_records, load_json
 from ..activity_logger import log_activity, get_action_icon
+from ..conditional import if_match, not_modified
 
-router = APIRouter(prefix="/customers", tags=["customers"])
+router = APIRouter(prefix="/customers", tags=["customers"], dependencies=[Depends(if_match)])
 
 
 def _get_user_info(authorization: Optional[str] = None) -> tuple:
@@ -32,7 +33,10 @@ class CustomerIn(BaseModel):
 
 
 @router.get("/")
-def list_customers():
+def list_customers(request: Request, response: Response):
+  cached = not_modified(request, response, "customers.json")
+  if cached:
+    return cached
   return load_json("customers.json")
 
 
@@ -69,7 +73,7 @@ def create_customer(payload: CustomerIn, authorization: Optional[str] = Header(N
       "accountCode": code
   }
   customers.append(new_item)
-  save_json("customers.json", customers)
+  commit_records("customers.json", customers, [new_id], [new_id])
   
   # Aktivite log
   log_activity(
@@ -102,7 +106,7 @@ def update_customer(customer_id: str, payload: CustomerIn, authorization: Option
           "phone2": payload.phone2,
           "address": payload.address,
       }
-      save_json("customers.json", customers)
+      commit_records("customers.json", customers, [customer_id])
       
       # Aktivite log
       log_activity(
@@ -127,7 +131,7 @@ def soft_delete_customer(customer_id: str, authorization: Optional[str] = Header
   for idx, item in enumerate(customers):
     if item.get("id") == customer_id:
       customers[idx] = {**item, "deleted": True}
-      save_json("customers.json", customers)
+      commit_records("customers.json", customers, [customer_id])
       
       # Aktivite log
       log_activity(
@@ -1,14 +1,37 @@
 """
 Dashboard Widget Verileri API
 Her widget icin ayri endpoint ile gercek zamanli veri saglar.
+/widgets/all ise istenen widget'lari tek istekte, her koleksiyonu bir kez
+yukleyerek hesaplar.
 """
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Query
 from datetime import datetime, timedelta
+from collections import Counter
 from ..data_loader import load_json
+from .. import job_index, recent_events
 
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 
 
+class _Collections:
+    """Istek basina koleksiyon onbellegi - her JSON dosyasi en fazla bir kez okunur"""
+
+    def __init__(self):
+        self._cache = {}
+
+    def load(self, filename):
+        if filename not in self._cache:
+            self._cache[filename] = load_json(filename)
+        return self._cache[filename]
+
+    def load_optional(self, filename):
+        try:
+            return self.load(filename)
+        except FileNotFoundError:
+            self._cache[filename] = []
+            return []
+
+
 def get_date_range_filter(days=30):
     end_date = datetime.now()
     start_date = end_date - timedelta(days=days)
@@ -17,14 +40,19 @@ def get_date_range_filter(days=30):
 
 @router.get("/widgets/overview")
 async def get_overview_stats():
-    jobs = load_json("jobs.json")
-    customers = load_json("customers.json")
+    return _overview(_Collections())
+
+
+def _overview(data):
+    # İşler statü indeksinden; jobs.json parse edilmez
+    jobs = job_index.entries()
+    customers = data.load("customers.json")
     
     today = datetime.now().date().isoformat()
     this_month = datetime.now().strftime("%Y-%m")
     
     active_jobs = [j for j in jobs if j.get("status") not in ["TAMAMLANDI", "IPTAL", "FIYAT_SORGUSU_RED"]]
-    month_jobs = [j for j in jobs if j.get("createdAt", "").startswith(this_month)]
+    month_jobs = [j for j in jobs if (j.get("createdAt") or "").startswith(this_month)]
     
     today_appointments = []
     for j in jobs:
@@ -48,7 +76,12 @@ async def get_overview_stats():
 @router.get("/widgets/measure-status")
 async def get_measure_status():
     """Olcu durumu ozeti"""
-    jobs = load_json("jobs.json")
+    return _measure_status(_Collections())
+
+
+def _measure_status(data):
+    # Statü indeksi sayaçları: (startType, status, ölçü tarihi var mı) -> adet
+    counters = job_index.counters()
     
     # Olcu ile alakali durumlar
     status_counts = {
@@ -58,23 +91,22 @@ async def get_measure_status():
         "teknik_cizim": 0,      # TEKNIK_CIZIM
     }
     
-    for job in jobs:
+    for (start_type, status, has_measure_date), count in counters.items():
         # Fiyat sorgulari dahil degil
-        if job.get("startType") == "MUSTERI_OLCUSU":
+        if start_type == "MUSTERI_OLCUSU":
             continue
         
-        status = job.get("status", "")
+        status = status or ""
         
         if status == "OLCU_RANDEVU_BEKLIYOR":
-            status_counts["randevu_bekliyor"] += 1
+            status_counts["randevu_bekliyor"] += count
         elif status == "OLCU_ALINDI":
-            status_counts["olcu_alindi"] += 1
+            status_counts["olcu_alindi"] += count
         elif status == "TEKNIK_CIZIM":
-            status_counts["teknik_cizim"] += 1
-        elif job.get("measureDate") and status not in ["TAMAMLANDI", "IPTAL", "KAPALI", "FIYAT_SORGUSU_RED", "FIYAT_SORGUSU_ONAY"]:
+            status_counts["teknik_cizim"] += count
+        elif has_measure_date and status not in ["TAMAMLANDI", "IPTAL", "KAPALI", "FIYAT_SORGUSU_RED", "FIYAT_SORGUSU_ONAY"]:
             # Randevu tarihi var ama henuz olcu alinmamis
-            if status not in ["OLCU_RANDEVU_BEKLIYOR", "OLCU_ALINDI", "TEKNIK_CIZIM"]:
-                status_counts["randevu_alindi"] += 1
+            status_counts["randevu_alindi"] += count
     
     return {
         "counts": status_counts,
@@ -84,17 +116,13 @@ async def get_measure_status():
 
 @router.get("/widgets/today-appointments")
 async def get_today_appointments():
-    jobs = load_json("jobs.json")
-    
-    try:
-        production_orders = load_json("productionOrders.json")
-    except FileNotFoundError:
-        production_orders = []
-    
-    try:
-        assembly_tasks = load_json("assemblyTasks.json")
-    except FileNotFoundError:
-        assembly_tasks = []
+    return _today_appointments(_Collections())
+
+
+def _today_appointments(data):
+    jobs = data.load("jobs.json")
+    production_orders = data.load_optional("productionOrders.json")
+    assembly_tasks = data.load_optional("assemblyTasks.json")
     
     today = datetime.now().date().isoformat()
     
@@ -145,10 +173,11 @@ async def get_today_appointments():
 
 @router.get("/widgets/production-status")
 async def get_production_status():
-    try:
-        production_orders = load_json("productionOrders.json")
-    except FileNotFoundError:
-        production_orders = []
+    return _production_status(_Collections())
+
+
+def _production_status(data):
+    production_orders = data.load_optional("productionOrders.json")
     
     today = datetime.now().date().isoformat()
     
@@ -187,15 +216,12 @@ async def get_production_status():
 
 @router.get("/widgets/assembly-status")
 async def get_assembly_status():
-    try:
-        assembly_tasks = load_json("assemblyTasks.json")
-    except FileNotFoundError:
-        assembly_tasks = []
-    
-    try:
-        teams = load_json("teams.json")
-    except FileNotFoundError:
-        teams = []
+    return _assembly_status(_Collections())
+
+
+def _assembly_status(data):
+    assembly_tasks = data.load_optional("assemblyTasks.json")
+    teams = data.load_optional("teams.json")
     
     today = datetime.now().date().isoformat()
     
@@ -234,10 +260,11 @@ async def get_assembly_status():
 
 @router.get("/widgets/stock-alerts")
 async def get_stock_alerts():
-    try:
-        stock_items = load_json("stockItems.json")
-    except FileNotFoundError:
-        stock_items = []
+    return _stock_alerts(_Collections())
+
+
+def _stock_alerts(data):
+    stock_items = data.load_optional("stockItems.json")
     
     critical = []
     low = []
@@ -281,10 +308,11 @@ async def get_stock_alerts():
 
 @router.get("/widgets/pending-orders")
 async def get_pending_orders():
-    try:
-        purchase_orders = load_json("purchaseOrders.json")
-    except FileNotFoundError:
-        purchase_orders = []
+    return _pending_orders(_Collections())
+
+
+def _pending_orders(data):
+    purchase_orders = data.load_optional("purchaseOrders.json")
     
     pending = []
     
@@ -307,43 +335,23 @@ async def get_pending_orders():
 
 @router.get("/widgets/recent-activities")
 async def get_recent_activities():
-    jobs = load_json("jobs.json")
-    
-    # Collect all log entries from all jobs
-    all_activities = []
-    for job in jobs:
-        logs = job.get("logs", []) or []
-        for log in logs[-5:]:  # Last 5 logs per job
-            all_activities.append({
-                "id": job["id"],
-                "type": log.get("action", "update"),
-                "title": job.get("title", ""),
-                "customer": job.get("customerName", ""),
-                "status": job.get("status", ""),
-                "time": log.get("at", ""),
-                "note": log.get("note", ""),
-                "icon": get_status_icon(job.get("status", ""))
-            })
-    
-    # Sort by time descending and get top 10
-    recent = sorted(all_activities, key=lambda x: x.get("time", ""), reverse=True)[:10]
-    
-    return {"activities": recent}
+    return _recent_activities(_Collections())
+
+
+def _recent_activities(data):
+    # Son hareketler bellekteki top-K yapıdan gelir; jobs.json taranmaz
+    return {"activities": recent_events.top(10)}
 
 
 @router.get("/widgets/weekly-summary")
 async def get_weekly_summary():
-    jobs = load_json("jobs.json")
-    
-    try:
-        assembly_tasks = load_json("assemblyTasks.json")
-    except FileNotFoundError:
-        assembly_tasks = []
-    
-    try:
-        production_orders = load_json("productionOrders.json")
-    except FileNotFoundError:
-        production_orders = []
+    return _weekly_summary(_Collections())
+
+
+def _weekly_summary(data):
+    jobs = data.load("jobs.json")
+    assembly_tasks = data.load_optional("assemblyTasks.json")
+    production_orders = data.load_optional("productionOrders.json")
     
     today = datetime.now().date()
     week_start = today - timedelta(days=today.weekday())
@@ -384,7 +392,11 @@ async def get_weekly_summary():
 
 @router.get("/widgets/financial-summary")
 async def get_financial_summary():
-    jobs = load_json("jobs.json")
+    return _financial_summary(_Collections())
+
+
+def _financial_summary(data):
+    jobs = data.load("jobs.json")
     
     today = datetime.now()
     this_month = today.strftime("%Y-%m")
@@ -424,15 +436,12 @@ async def get_financial_summary():
 
 @router.get("/widgets/tasks-summary")
 async def get_tasks_summary():
-    try:
-        tasks = load_json("tasks.json")
-    except FileNotFoundError:
-        tasks = []
-    
-    try:
-        task_assignments = load_json("task_assignments.json")
-    except FileNotFoundError:
-        task_assignments = []
+    return _tasks_summary(_Collections())
+
+
+def _tasks_summary(data):
+    tasks = data.load_optional("tasks.json")
+    task_assignments = data.load_optional("task_assignments.json")
     
     status_counts = {
         "todo": 0, "in_progress": 0,
@@ -465,18 +474,25 @@ async def get_tasks_summary():
 
 @router.get("/widgets/inquiry-stats")
 async def get_inquiry_stats():
-    jobs = load_json("jobs.json")
-    
-    inquiries = [j for j in jobs if j.get("startType") == "MUSTERI_OLCUSU"]
+    return _inquiry_stats(_Collections())
+
+
+def _inquiry_stats(data):
+    # Fiyat sorgusu işlerinin statü dağılımı (statü indeksi sayaçlarından)
+    inquiries = Counter()
+    for (start_type, status, _), count in job_index.counters().items():
+        if start_type == "MUSTERI_OLCUSU":
+            inquiries[status] += count
+    total = sum(inquiries.values())
     
-    approved = len([j for j in inquiries if j.get("status") == "FIYAT_SORGUSU_ONAY"])
-    rejected = len([j for j in inquiries if j.get("status") == "FIYAT_SORGUSU_RED"])
-    pending = len([j for j in inquiries if j.get("status") not in ["FIYAT_SORGUSU_ONAY", "FIYAT_SORGUSU_RED", "TAMAMLANDI"]])
+    approved = inquiries["FIYAT_SORGUSU_ONAY"]
+    rejected = inquiries["FIYAT_SORGUSU_RED"]
+    pending = total - approved - rejected - inquiries["TAMAMLANDI"]
     
-    conversion_rate = round((approved / len(inquiries) * 100) if len(inquiries) > 0 else 0, 1)
+    conversion_rate = round((approved / total * 100) if total > 0 else 0, 1)
     
     return {
-        "total": len(inquiries),
+        "total": total,
         "approved": approved,
         "rejected": rejected,
         "pending": pending,
@@ -484,21 +500,32 @@ async def get_inquiry_stats():
     }
 
 
-def get_status_icon(status):
-    icons = {
-        "OLCU_RANDEVU_BEKLIYOR": "phone",
-        "OLCU_ALINDI": "ruler",
-        "TEKNIK_CIZIM": "design",
-        "TEKLIF_HAZIRLANIYOR": "money",
-        "TEKLIF_ONAY_BEKLIYOR": "wait",
-        "ONAY_ALINDI": "check",
-        "URETIMDE": "factory",
-        "MONTAJ_BEKLIYOR": "tools",
-        "MONTAJDA": "wrench",
-        "TAMAMLANDI": "done",
-        "IPTAL": "cancel",
-        "FIYAT_SORGUSU_BEKLENIYOR": "price",
-        "FIYAT_SORGUSU_ONAY": "approved",
-        "FIYAT_SORGUSU_RED": "rejected"
-    }
-    return icons.get(status, "default")
+WIDGETS = {
+    "overview": _overview,
+    "measure-status": _measure_status,
+    "today-appointments": _today_appointments,
+    "production-status": _production_status,
+    "assembly-status": _assembly_status,
+    "stock-alerts": _stock_alerts,
+    "pending-orders": _pending_orders,
+    "recent-activities": _recent_activities,
+    "weekly-summary": _weekly_summary,
+    "financial-summary": _financial_summary,
+    "tasks-summary": _tasks_summary,
+    "inquiry-stats": _inquiry_stats,
+}
+
+
+@router.get("/widgets/all")
+def get_all_widgets(widgets: str | None = Query(None, description="Virgulle ayrilmis widget listesi (bos ise hepsi)")):
+    """Istenen widget'lari tek seferde hesapla; her koleksiyon bir kez yuklenir"""
+    if widgets:
+        names = [w.strip() for w in widgets.split(",") if w.strip()]
+        unknown = [w for w in names if w not in WIDGETS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Bilinmeyen widget: {', '.join(unknown)}")
+    else:
+        names = list(WIDGETS)
+    
+    data = _Collections()
+    return {name: WIDGETS[name](data) for name in names}
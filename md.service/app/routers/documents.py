@@ -1,15 +1,22 @@
+import asyncio
+import hashlib
 import os
+import re
 import uuid
-import shutil
-from datetime import datetime
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
 from pathlib import Path
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Header
-from fastapi.responses import FileResponse
+from urllib.parse import quote
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Header, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import Optional
 
 from ..data_loader import load_json, save_json
 from ..activity_logger import log_activity, get_action_icon
+from ..conditional import is_fresh, not_modified
+from .. import blob_store, image_optimizer, record_index, thumbnails
+from ..zip_stream import stream_zip, unique_name
 
 router = APIRouter(prefix="/documents", tags=["documents"])
 
@@ -25,14 +32,13 @@ def _get_user_info(authorization: Optional[str] = None) -> tuple:
         return user.get("id", "unknown"), user.get("displayName") or user.get("username", "Bilinmiyor")
     return "system", "Sistem"
 
-# Base paths
-BASE_DIR = Path(__file__).resolve().parent.parent.parent.parent
-DOCS_DIR = BASE_DIR / "md.docs" / "documents"
+# Base paths - belge kaydındaki "path" DOCS_ROOT'a göredir
+DOCS_ROOT = blob_store.DOCS_ROOT
+# Eski (blob deposu öncesi) tip klasörleri: documents/<alt klasör>/DOC-xxx_ts.ext
+DOCS_DIR = DOCS_ROOT / "documents"
 
 # Ensure directories exist
-DOCS_DIR.mkdir(parents=True, exist_ok=True)
-for subdir in ["olcu", "teknik", "sozlesme", "teklif", "diger", "servis", "montaj", "irsaliye"]:
-    (DOCS_DIR / subdir).mkdir(exist_ok=True)
+(DOCS_ROOT / blob_store.BLOBS).mkdir(parents=True, exist_ok=True)
 
 ALLOWED_TYPES = {
     # Görsel formatları
@@ -86,8 +92,11 @@ class DocumentMeta(BaseModel):
 
 
 @router.get("/")
-def list_documents(job_id: str | None = None, doc_type: str | None = None):
+def list_documents(request: Request, response: Response, job_id: str | None = None, doc_type: str | None = None):
     """List all documents, optionally filtered by jobId or type"""
+    cached = not_modified(request, response, "documents.json")
+    if cached:
+        return cached
     docs = load_json("documents.json")
     if job_id:
         docs = [d for d in docs if d.get("jobId") == job_id]
@@ -99,152 +108,280 @@ def list_documents(job_id: str | None = None, doc_type: str | None = None):
 @router.get("/{doc_id}")
 def get_document(doc_id: str):
     """Get document metadata by ID"""
-    docs = load_json("documents.json")
-    for doc in docs:
-        if doc.get("id") == doc_id:
-            return doc
-    raise HTTPException(status_code=404, detail="Döküman bulunamadı")
+    doc = record_index.first("documents.json", "id", doc_id)
+    if not doc:
+        raise HTTPException(status_code=404, detail="Döküman bulunamadı")
+    return doc
+
+
+def _file_validators(doc: dict, stat_result: os.stat_result) -> tuple:
+    """(ETag, Last-Modified); ETag içerik hash'inden üretilir (güçlü doğrulayıcı)"""
+    if doc.get("sha256"):
+        etag = f'"{doc["sha256"]}"'
+    else:
+        # Hash'i olmayan eski kayıtlar: boyut + değişiklik zamanı
+        etag = f'"{int(stat_result.st_mtime)}-{stat_result.st_size}"'
+    return etag, datetime.fromtimestamp(int(stat_result.st_mtime), tz=timezone.utc)
+
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _requested_range(request: Request, size: int, etag: str, last_modified: datetime) -> Optional[tuple]:
+    """
+    Tek aralıklı Range isteğini (başlangıç, bitiş) olarak döndür. Range yoksa,
+    If-Range eşleşmiyorsa ya da çoklu/geçersiz aralıksa (ör. bytes=500-100)
+    None (tam dosya gönderilir, RFC 9110). Sadece karşılanamayan aralıkta
+    (başlangıç >= boyut) 416 fırlatılır.
+    """
+    header = request.headers.get("range")
+    if not header:
+        return None
+    if_range = request.headers.get("if-range")
+    if if_range is not None and if_range.strip() != etag:
+        try:
+            if parsedate_to_datetime(if_range) != last_modified:
+                return None
+        except (TypeError, ValueError):
+            return None
+    match = _RANGE_RE.match(header.strip())
+    if not match or not any(match.groups()):
+        return None
+    first, last = match.groups()
+    if first and last and int(last) < int(first):
+        return None
+    if not first:
+        # Son N bayt
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size:
+        raise HTTPException(status_code=416, detail="İstenen aralık karşılanamıyor",
+                            headers={"Content-Range": f"bytes */{size}"})
+    return start, end
+
+
+class _WholeFileResponse(FileResponse):
+    """Tam dosya: Range kararı _requested_range'de verildi, Starlette'in kendi Range işlemesi atlanır"""
+
+    async def __call__(self, scope, receive, send):
+        headers = [(k, v) for k, v in scope["headers"] if k not in (b"range", b"if-range")]
+        await super().__call__({**scope, "headers": headers}, receive, send)
+
+
+def _content_disposition(filename: str) -> str:
+    """FileResponse ile aynı biçim (ASCII dışı adlar RFC 5987 ile)"""
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+
+def _iter_range(file_path: Path, start: int, end: int):
+    with open(file_path, "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(UPLOAD_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
 
 
 @router.get("/{doc_id}/download")
-def download_document(doc_id: str):
-    """Download a document file"""
-    docs = load_json("documents.json")
-    doc = None
-    for d in docs:
-        if d.get("id") == doc_id:
-            doc = d
-            break
-    
+def download_document(doc_id: str, request: Request):
+    """
+    Download a document file. ETag içerik hash'idir: If-None-Match /
+    If-Modified-Since güncelse 304 döner. Range (tek aralık, If-Range ile)
+    desteklenir; büyük PDF'lerin sadece istenen bölümleri 206 ile gönderilir.
+    """
+    doc = record_index.first("documents.json", "id", doc_id)
     if not doc:
         raise HTTPException(status_code=404, detail="Döküman bulunamadı")
     
-    file_path = BASE_DIR / "md.docs" / doc["path"]
-    if not file_path.exists():
+    file_path = DOCS_ROOT / doc["path"]
+    try:
+        stat_result = file_path.stat()
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Dosya bulunamadı")
     
-    return FileResponse(
+    etag, last_modified = _file_validators(doc, stat_result)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": format_datetime(last_modified, usegmt=True),
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "private, no-cache",
+    }
+    if is_fresh(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    
+    filename = doc.get("originalName") or doc["filename"]
+    media_type = doc.get("mimeType") or "application/octet-stream"
+    byte_range = _requested_range(request, stat_result.st_size, etag, last_modified)
+    if byte_range is not None:
+        start, end = byte_range
+        return StreamingResponse(_iter_range(file_path, start, end), status_code=206, media_type=media_type, headers={
+            **headers,
+            "Content-Range": f"bytes {start}-{end}/{stat_result.st_size}",
+            "Content-Length": str(end - start + 1),
+            "Content-Disposition": _content_disposition(filename),
+        })
+    
+    return _WholeFileResponse(
         path=str(file_path),
-        filename=doc.get("originalName", doc["filename"]),
-        media_type=doc.get("mimeType", "application/octet-stream")
+        filename=filename,
+        media_type=media_type,
+        headers=headers,
+        stat_result=stat_result,
     )
 
 
+@router.get("/{doc_id}/thumbnail")
+def get_document_thumbnail(doc_id: str, size: str = thumbnails.DEFAULT_SIZE):
+    """
+    Görsel belgeler için küçük boyutlu kopya, PDF'ler için ilk sayfa önizlemesi (JPEG).
+    size: sm (160px), md (480px), lg (1024px). İlk istekte üretilir, sonra diskten sunulur.
+    """
+    if size not in thumbnails.SIZES:
+        raise HTTPException(status_code=400, detail=f"Geçersiz boyut: {size} ({', '.join(thumbnails.SIZES)})")
+    doc = record_index.first("documents.json", "id", doc_id)
+    if not doc:
+        raise HTTPException(status_code=404, detail="Döküman bulunamadı")
+    if not thumbnails.supported(doc):
+        raise HTTPException(status_code=404, detail="Bu belge için önizleme yok")
+    if not (DOCS_ROOT / doc["path"]).exists():
+        raise HTTPException(status_code=404, detail="Dosya bulunamadı")
+    try:
+        path = thumbnails.get(doc, thumbnails.SIZES[size])
+    except Exception:
+        raise HTTPException(status_code=422, detail="Önizleme oluşturulamadı")
+    # Türev içerik hash'ine bağlı; içerik değişirse yolu da değişir
+    return FileResponse(path=str(path), media_type="image/jpeg",
+                        headers={"Cache-Control": "private, max-age=86400"})
+
+
 MAX_FILE_SIZE = 100 * 1024 * 1024  # 100MB
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB
+# Multipart sınırları ve form alanları için dosya boyutuna eklenen pay
+MULTIPART_OVERHEAD = 1024 * 1024
 
-@router.post("/upload")
-async def upload_document(
-    file: UploadFile = File(...),
-    jobId: str = Form(None),  # Opsiyonel - şirket belgeleri için
-    docType: str = Form(...),
-    description: str = Form(None),
-    folderId: str = Form(None),  # Klasör ID (şirket belgeleri için)
-    supplierId: str = Form(None),  # Tedarikçi ID (tedarikçi belgeleri için)
-    authorization: Optional[str] = Header(None)
-):
+
+def upload_body_limit() -> int:
+    """/documents/upload gövde sınırı (UploadLimitMiddleware ayrıştırmadan önce uygular)"""
+    return MAX_FILE_SIZE + MULTIPART_OVERHEAD
+
+
+class UploadTooLarge(Exception):
+    def __init__(self, size: int):
+        self.size = size
+
+
+def _too_large(size: int) -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"Dosya boyutu çok büyük. Maksimum: {MAX_FILE_SIZE / (1024*1024):.0f}MB, Yüklenen: {size / (1024*1024):.1f}MB"
+    )
+
+
+async def _stream_to_file(file: UploadFile, temp_path: Path, max_size: Optional[int] = None) -> tuple:
     """
-    Upload a document file.
-    docType: olcu, teknik, sozlesme, teklif, diger, measure_*, technical_*, arac, makine, ofis, genel
-    Max file size: 100MB
-    jobId, folderId veya supplierId'den en az biri gerekli.
+    Yüklenen dosyayı parça parça geçici dosyaya yaz; SHA-256 aynı anda hesaplanır
+    (blob adı için). Gövde sınırı ayrıştırmadan önce UploadLimitMiddleware'de,
+    dosyanın kesin boyut sınırı burada uygulanır. Hata olursa geçici dosya
+    silinir. Bellekte en fazla bir parça tutulur.
+    (boyut, sha256 hex) döndürür.
     """
-    # Dosya boyutu kontrolü (100MB)
-    contents = await file.read()
-    file_size = len(contents)
-    if file_size > MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=413, 
-            detail=f"Dosya boyutu çok büyük. Maksimum: 100MB, Yüklenen: {file_size / (1024*1024):.1f}MB"
-        )
-    # Dosyayı başa sar (okuduktan sonra)
-    await file.seek(0)
-    
+    max_size = MAX_FILE_SIZE if max_size is None else max_size
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(temp_path, "wb") as out:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_size:
+                    raise UploadTooLarge(size)
+                digest.update(chunk)
+                await asyncio.to_thread(out.write, chunk)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+    return size, digest.hexdigest()
+
+
+VALID_BASE_TYPES = [
+    "olcu", "teknik", "sozlesme", "teklif", "diger", 
+    "servis_oncesi", "servis_sonrasi", "montaj", "irsaliye",
+    # Montaj fotoğrafları
+    "montaj_oncesi", "montaj_sonrasi", "musteri_imza", "montaj_sorun",
+    # Müşteri ölçüsü (fiyat sorgusu)
+    "musteri_olcusu",
+    # Şirket belgeleri
+    "arac", "makine", "ofis", "genel",
+    # Tedarikçi belgeleri
+    "fiyat_listesi", "kalite", "tedarikci_sozlesme"
+]
+
+
+def _validate_upload(docType: str, jobId, folderId, supplierId, original_name: str, content_type: str) -> str:
+    """Yükleme parametrelerini doğrula; kaydedilecek dosya uzantısını döndür"""
     # En az bir referans gerekli
     if not jobId and not folderId and not supplierId:
         raise HTTPException(status_code=400, detail="jobId, folderId veya supplierId'den en az biri gerekli")
     
     # Validate type - ana tipler ve iş kolu bazlı tipler
-    valid_base_types = [
-        "olcu", "teknik", "sozlesme", "teklif", "diger", 
-        "servis_oncesi", "servis_sonrasi", "montaj", "irsaliye",
-        # Montaj fotoğrafları
-        "montaj_oncesi", "montaj_sonrasi", "musteri_imza", "montaj_sorun",
-        # Müşteri ölçüsü (fiyat sorgusu)
-        "musteri_olcusu",
-        # Şirket belgeleri
-        "arac", "makine", "ofis", "genel",
-        # Tedarikçi belgeleri
-        "fiyat_listesi", "kalite", "tedarikci_sozlesme"
-    ]
     is_role_based = docType.startswith("measure_") or docType.startswith("technical_")
     
-    if docType not in valid_base_types and not is_role_based:
+    if docType not in VALID_BASE_TYPES and not is_role_based:
         raise HTTPException(status_code=400, detail="Geçersiz döküman tipi")
     
     # Dosya uzantısını al
-    original_name = file.filename or "unnamed"
     file_ext = os.path.splitext(original_name)[1].lower()
     
-    # content-type veya uzantıya göre kontrol
-    content_type = file.content_type or ""
-    
     # Önce content-type'a bak
     if content_type in ALLOWED_TYPES and ALLOWED_TYPES[content_type] is not None:
-        ext = ALLOWED_TYPES[content_type]
+        return ALLOWED_TYPES[content_type]
     # content-type bilinmiyorsa uzantıya bak
-    elif file_ext in ALLOWED_EXTENSIONS:
-        ext = file_ext
-    # application/octet-stream ise uzantıya güven
-    elif content_type == "application/octet-stream" and file_ext in ALLOWED_EXTENSIONS:
-        ext = file_ext
-    else:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Desteklenmeyen dosya tipi: {content_type or 'bilinmiyor'} ({file_ext}). "
-                   f"Desteklenen formatlar: JPG, PNG, PDF, DOC, DOCX, XLS, XLSX, DWG, DXF, ZIP, RAR vb."
-        )
-    
-    # Generate unique filename
+    if file_ext in ALLOWED_EXTENSIONS:
+        return file_ext
+    raise HTTPException(
+        status_code=400,
+        detail=f"Desteklenmeyen dosya tipi: {content_type or 'bilinmiyor'} ({file_ext}). "
+               f"Desteklenen formatlar: JPG, PNG, PDF, DOC, DOCX, XLS, XLSX, DWG, DXF, ZIP, RAR vb."
+    )
+
+
+def _new_document_name(ext: str) -> tuple:
+    """Yeni belge için (doc_id, dosya adı); dosya adı indirmede kullanılan mantıksal addır"""
     doc_id = f"DOC-{str(uuid.uuid4())[:8].upper()}"
     safe_name = f"{doc_id}_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}{ext}"
-    
-    # Klasör belirleme - belge tipine göre
-    target_subdir = "diger"
-    if docType in ["olcu", "teknik", "sozlesme", "teklif", "diger", "montaj", "irsaliye"]:
-        target_subdir = docType
-    elif docType.startswith("measure_"):
-        target_subdir = "olcu"
-    elif docType.startswith("technical_"):
-        target_subdir = "teknik"
-    elif docType.startswith("servis"):
-        target_subdir = "servis"
-    # Müşteri ölçüsü (fiyat sorgusu)
-    elif docType == "musteri_olcusu":
-        target_subdir = "musteri_olcusu"
-    # Montaj fotoğrafları
-    elif docType in ["montaj_oncesi", "montaj_sonrasi", "musteri_imza", "montaj_sorun"]:
-        target_subdir = "montaj"
-    # Şirket belgeleri
-    elif docType in ["arac", "makine", "ofis", "genel"]:
-        target_subdir = f"sirket/{docType}"
-    # Tedarikçi belgeleri
-    elif docType in ["fiyat_listesi", "kalite", "tedarikci_sozlesme"]:
-        target_subdir = "tedarikciler"
-    
-    # Save file
-    target_dir = DOCS_DIR / target_subdir
-    target_dir.mkdir(parents=True, exist_ok=True)
-    target_path = target_dir / safe_name
-    
-    try:
-        with open(target_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Dosya kaydedilemedi: {str(e)}")
-    
-    # Get file size
-    file_size = target_path.stat().st_size
-    
+    return doc_id, safe_name
+
+
+def _store_document(temp_path: Path, checksum: str, doc_id, safe_name, original_name, content_type, file_size,
+                    jobId, folderId, supplierId, docType, description, authorization) -> dict:
+    """
+    Geçici dosyayı içerik adresli blob olarak yerleştir ve belgeyi kaydet. Aynı
+    içerik daha önce yüklendiyse yeni kopya yazılmaz, kayıt mevcut blob'a işaret eder.
+    """
+    with blob_store.locked():
+        relpath, _ = blob_store.ingest(temp_path, checksum)
+        doc_meta = _register_document(doc_id, safe_name, relpath, original_name, content_type, file_size, checksum,
+                                      jobId, folderId, supplierId, docType, description, authorization)
+    # Fotoğraflar arka planda optimize edilir; önizlemeler optimizasyondan sonra
+    # (ya da optimize edilmeyecekse hemen) hazırlanır
+    if not image_optimizer.schedule(doc_meta):
+        thumbnails.schedule(doc_meta)
+    return doc_meta
+
+
+def _register_document(doc_id, safe_name, relpath, original_name, content_type, file_size, checksum,
+                       jobId, folderId, supplierId, docType, description, authorization) -> dict:
+    """Kaydedilmiş dosya için documents.json kaydı ve aktivite logu oluştur"""
     # Kullanıcı bilgisi
     user_id, user_name = _get_user_info(authorization)
     
@@ -256,10 +393,11 @@ async def upload_document(
         "supplierId": supplierId,
         "type": docType,
         "filename": safe_name,
-        "originalName": file.filename,
-        "path": f"documents/{target_subdir}/{safe_name}",
+        "originalName": original_name,
+        "path": relpath,
         "mimeType": content_type,
         "size": file_size,
+        "sha256": checksum,
         "uploadedBy": user_name,
         "uploadedAt": datetime.utcnow().isoformat() + "Z",
         "description": description
@@ -268,10 +406,10 @@ async def upload_document(
     # Save to database
     docs = load_json("documents.json")
     docs.insert(0, doc_meta)
-    save_json("documents.json", docs)
+    save_json("documents.json", docs, [doc_id])
     
     # Aktivite log
-    target_name = file.filename or "Dosya"
+    target_name = original_name or "Dosya"
     if jobId:
         target_type = "job"
         target_id = jobId
@@ -299,34 +437,72 @@ async def upload_document(
     return doc_meta
 
 
+@router.post("/upload")
+async def upload_document(
+    file: UploadFile = File(...),
+    jobId: str = Form(None),  # Opsiyonel - şirket belgeleri için
+    docType: str = Form(...),
+    description: str = Form(None),
+    folderId: str = Form(None),  # Klasör ID (şirket belgeleri için)
+    supplierId: str = Form(None),  # Tedarikçi ID (tedarikçi belgeleri için)
+    authorization: Optional[str] = Header(None)
+):
+    """
+    Upload a document file.
+    docType: olcu, teknik, sozlesme, teklif, diger, measure_*, technical_*, arac, makine, ofis, genel
+    Max file size: 100MB
+    jobId, folderId veya supplierId'den en az biri gerekli.
+    Büyük dosyalar / zayıf bağlantılar için: /documents/uploads (devam ettirilebilir yükleme)
+    """
+    content_type = file.content_type or ""
+    ext = _validate_upload(docType, jobId, folderId, supplierId, file.filename or "unnamed", content_type)
+    doc_id, safe_name = _new_document_name(ext)
+    temp_path = blob_store.new_temp_path()
+    
+    # Gövde sınırı ayrıştırmadan önce (middleware), dosya sınırı (100MB) kopyalarken uygulanır
+    try:
+        file_size, checksum = await _stream_to_file(file, temp_path)
+    except UploadTooLarge as e:
+        raise _too_large(e.size)
+    except OSError as e:
+        raise HTTPException(status_code=500, detail=f"Dosya kaydedilemedi: {str(e)}")
+    
+    # Kilit, blob yerleştirme ve documents.json yazımı olay döngüsü dışında
+    try:
+        return await asyncio.to_thread(
+            _store_document, temp_path, checksum, doc_id, safe_name, file.filename, content_type, file_size,
+            jobId, folderId, supplierId, docType, description, authorization,
+        )
+    finally:
+        temp_path.unlink(missing_ok=True)
+
+
 @router.delete("/{doc_id}")
 def delete_document(doc_id: str, authorization: Optional[str] = Header(None)):
-    """Delete a document and its file"""
+    """Delete a document; dosya (blob) sadece son referans silinince kaldırılır"""
     user_id, user_name = _get_user_info(authorization)
-    docs = load_json("documents.json")
-    doc = None
-    doc_idx = -1
-    
-    for idx, d in enumerate(docs):
-        if d.get("id") == doc_id:
-            doc = d
-            doc_idx = idx
-            break
-    
-    if not doc:
-        raise HTTPException(status_code=404, detail="Döküman bulunamadı")
-    
-    # Delete file
-    file_path = BASE_DIR / "md.docs" / doc["path"]
-    if file_path.exists():
-        try:
-            file_path.unlink()
-        except Exception:
-            pass  # File deletion is best effort
-    
-    # Remove from database
-    docs.pop(doc_idx)
-    save_json("documents.json", docs)
+    # Remove from database, then release the file
+    with blob_store.locked():
+        docs = load_json("documents.json")
+        doc = None
+        doc_idx = -1
+        
+        for idx, d in enumerate(docs):
+            if d.get("id") == doc_id:
+                doc = d
+                doc_idx = idx
+                break
+        
+        if not doc:
+            raise HTTPException(status_code=404, detail="Döküman bulunamadı")
+        
+        docs.pop(doc_idx)
+        save_json("documents.json", docs, [doc_id])
+        if blob_store.release(doc["path"]):
+            thumbnails.discard(doc)
+        if doc.get("originalPath"):
+            # Optimizasyon öncesi saklanan orijinal
+            blob_store.release(doc["originalPath"])
     
     # Aktivite log
     log_activity(
@@ -346,6 +522,31 @@ def delete_document(doc_id: str, authorization: Optional[str] = Header(None)):
 @router.get("/job/{job_id}")
 def get_job_documents(job_id: str):
     """Get all documents for a specific job"""
-    docs = load_json("documents.json")
-    return [d for d in docs if d.get("jobId") == job_id]
+    return record_index.lookup("documents.json", "jobId", job_id)
+
+
+def _archive_entries(docs: list):
+    """Belgeleri ZIP içinde <docType>/<orijinal ad> düzenine yerleştir"""
+    used = set()
+    for doc in docs:
+        if not doc.get("path"):
+            continue
+        name = os.path.basename((doc.get("originalName") or doc.get("filename") or doc["id"]).replace("\\", "/"))
+        yield unique_name(f"{doc.get('type') or 'diger'}/{name}", used), DOCS_ROOT / doc["path"]
+
+
+def archive_response(docs: list, archive_name: str) -> StreamingResponse:
+    """Belgeleri diskten anında ZIP olarak akıt (arşiv boyutundan bağımsız sabit bellek)"""
+    if not docs:
+        raise HTTPException(status_code=404, detail="Arşivlenecek belge bulunamadı")
+    return StreamingResponse(
+        stream_zip(_archive_entries(docs)),
+        media_type="application/zip",
+        headers={"Content-Disposition": _content_disposition(f"{archive_name}.zip")},
+    )
+
 
+@router.get("/job/{job_id}/archive")
+def get_job_documents_archive(job_id: str):
+    """İşin tüm belgelerini tip klasörlerine ayrılmış tek ZIP olarak indir"""
+    return archive_response(record_index.lookup("documents.json", "jobId", job_id), f"{job_id}-belgeler")
@@ -8,7 +8,9 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Optional, List
 
+from .. import folder_tree
 from ..data_loader import load_json, save_json
+from .documents import archive_response
 
 router = APIRouter(prefix="/folders", tags=["folders"])
 
@@ -75,7 +77,10 @@ class FolderUpdate(BaseModel):
 
 def _ensure_default_folders():
     """Varsayılan klasörlerin varlığını kontrol et"""
-    folders = load_json("folders.json")
+    try:
+        folders = load_json("folders.json")
+    except FileNotFoundError:
+        folders = []
     
     # Eğer hiç klasör yoksa varsayılanları ekle
     if not folders:
@@ -85,29 +90,34 @@ def _ensure_default_folders():
     return folders
 
 
+def _ensure_tree() -> None:
+    """Klasör ağacı boşsa (ilk kurulum) varsayılan klasörleri oluştur"""
+    if folder_tree.is_empty():
+        _ensure_default_folders()
+
+
 @router.get("/")
 def list_folders():
-    """Tüm klasörleri listele"""
-    folders = _ensure_default_folders()
-    return folders
+    """Tüm klasörleri listele (belge sayısı ve toplam boyut ile)"""
+    _ensure_tree()
+    return folder_tree.folders()
+
+
+@router.get("/tree")
+def get_folder_tree():
+    """Düz klasör ağacı: kökler ve id -> düğüm (yol, alt klasörler, canlı sayaçlar)"""
+    _ensure_tree()
+    return folder_tree.tree()
 
 
 @router.get("/{folder_id}")
 def get_folder(folder_id: str):
     """Klasör detayını getir"""
-    folders = _ensure_default_folders()
-    
-    # Ana klasörlerde ara
-    for folder in folders:
-        if folder.get("id") == folder_id:
-            return folder
-        # Alt klasörlerde ara
-        if "subfolders" in folder:
-            for sub in folder["subfolders"]:
-                if sub.get("id") == folder_id:
-                    return {**sub, "parentId": folder["id"]}
-    
-    raise HTTPException(status_code=404, detail="Klasör bulunamadı")
+    _ensure_tree()
+    folder = folder_tree.get(folder_id)
+    if not folder:
+        raise HTTPException(status_code=404, detail="Klasör bulunamadı")
+    return folder
 
 
 @router.post("/")
@@ -213,32 +223,15 @@ def delete_folder(folder_id: str):
 
 @router.get("/{folder_id}/documents")
 def get_folder_documents(folder_id: str):
-    """Klasöre ait belgeleri getir"""
-    documents = load_json("documents.json")
-    
-    # jobs kategorisi için jobId'ye göre filtrele
-    folder = None
-    folders = _ensure_default_folders()
-    for f in folders:
-        if f.get("id") == folder_id:
-            folder = f
-            break
-        if "subfolders" in f:
-            for sub in f["subfolders"]:
-                if sub.get("id") == folder_id:
-                    folder = sub
-                    break
-    
-    if not folder:
+    """Klasöre ait belgeleri getir (klasör ağacından; documents.json taranmaz)"""
+    _ensure_tree()
+    documents = folder_tree.documents(folder_id)
+    if documents is None:
         raise HTTPException(status_code=404, detail="Klasör bulunamadı")
-    
-    # Belgeleri filtrele
-    if folder_id == "FOLDER-ISLER":
-        # İş belgeleri - jobId olanlar
-        return [d for d in documents if d.get("jobId") and not d.get("supplierId") and not d.get("folderId")]
-    elif folder_id == "FOLDER-TEDARIKCILER":
-        # Tedarikçi belgeleri
-        return [d for d in documents if d.get("supplierId")]
-    else:
-        # Diğer klasörler - folderId'ye göre
-        return [d for d in documents if d.get("folderId") == folder_id]
+    return documents
+
+
+@router.get("/{folder_id}/archive")
+def get_folder_archive(folder_id: str):
+    """Klasördeki belgeleri tip klasörlerine ayrılmış tek ZIP olarak indir"""
+    return archive_response(get_folder_documents(folder_id), folder_id)
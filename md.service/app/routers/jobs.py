@@ -1,14 +1,20 @@
+import base64
+import json
 from copy import deepcopy
-from datetime import datetime
+from datetime import datetime, timedelta
 import uuid
-from fastapi import APIRouter, HTTPException, Header
+from fastapi import APIRouter, Body, Depends, HTTPException, Header, Query, Request, Response
 from pydantic import BaseModel, Field
 from typing import Optional
 
-from ..data_loader import load_json, save_json
-from ..activity_logger import log_activity, get_action_icon
+from ..data_loader import commit_records, load_json, save_json
+from ..activity_logger import log_activities, log_activity, get_action_icon
+from ..conditional import if_match, not_modified, record_etag
+from .. import cold_store, job_index, json_patch, record_index
+from ..job_fields import SUMMARY_FIELDS, project
+from . import assembly, production
 
-router = APIRouter(prefix="/jobs", tags=["jobs"])
+router = APIRouter(prefix="/jobs", tags=["jobs"], dependencies=[Depends(if_match)])
 
 
 def _now_iso() -> str:
@@ -19,8 +25,13 @@ def _jobs():
   return load_json("jobs.json")
 
 
-def _save_jobs(data):
-  save_json("jobs.json", data)
+def _save_jobs(data, changed_ids=None, created_ids=()):
+  # id'ler biliniyorsa sürüm kontrollü commit: sadece bu işler yazılır,
+  # okunduktan sonra başkası değiştirdiyse ya da sildiyse VersionConflict (409/412)
+  if changed_ids is None:
+    save_json("jobs.json", data)
+  else:
+    commit_records("jobs.json", data, changed_ids, created_ids)
 
 
 class JobCreate(BaseModel):
@@ -127,6 +138,12 @@ def _find_job(job_id: str):
   for idx, job in enumerate(data):
     if job.get("id") == job_id:
       return data, idx, job
+  _raise_missing_job(job_id)
+
+
+def _raise_missing_job(job_id: str):
+  if cold_store.get(job_id) is not None:
+    raise HTTPException(status_code=409, detail="İş soğuk arşive taşınmış; salt okunurdur.")
   raise HTTPException(status_code=404, detail="Job not found")
 
 
@@ -154,19 +171,188 @@ def _get_user_info(authorization: Optional[str] = None) -> tuple:
   return "system", "Sistem"
 
 
+SORTABLE_FIELDS = {"createdAt", "title", "customerName", "status", "id"}
+MAX_PAGE_SIZE = 500
+
+
+def _encode_cursor(sort_value, job_id: str) -> str:
+  raw = json.dumps([sort_value, job_id], ensure_ascii=False).encode("utf-8")
+  return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple:
+  try:
+    raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+    sort_value, job_id = json.loads(raw)
+    return str(sort_value), str(job_id)
+  except (ValueError, TypeError):
+    raise HTTPException(status_code=400, detail="Geçersiz cursor")
+
+
 @router.get("/")
-def list_jobs():
-  return _jobs()
+def list_jobs(
+    request: Request,
+    response: Response,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Sayfa boyutu (verilirse sayfalı yanıt döner)"),
+    cursor: str | None = Query(None, description="Önceki sayfanın nextCursor değeri"),
+    sort: str = Query("-createdAt", description="Sıralama alanı; azalan için '-' öneki"),
+    status: str | None = Query(None, description="Virgülle ayrılmış statüler"),
+    customerId: str | None = None,
+    startType: str | None = None,
+    dateFrom: str | None = Query(None, description="createdAt >= (ISO tarih)"),
+    dateTo: str | None = Query(None, description="createdAt <= (ISO tarih)"),
+    fields: str | None = Query(None, description="Virgülle ayrılmış alanlar (noktalı yol destekli), '*' tüm alanlar"),
+    tier: str = Query("all", pattern="^(all|hot|cold)$", description="hot: aktif işler, cold: soğuk arşiv, all: ikisi"),
+):
+  """
+  İş listesi. Parametresiz çağrı tüm işleri (tam kayıt) döndürür.
+  limit/cursor verildiğinde sayfalı yanıt döner ve varsayılan projeksiyon
+  SUMMARY_FIELDS olur; fields=* ile tam kayıt istenebilir.
+  """
+  cached = not_modified(request, response, *cold_store.version_files())
+  if cached:
+    return cached
+
+  def source():
+    if tier == "hot":
+      return _jobs()
+    if tier == "cold":
+      return cold_store.jobs()
+    return cold_store.all_jobs(_jobs())
+
+  paged = limit is not None or cursor is not None
+  filtered = any(v is not None for v in (status, customerId, startType, dateFrom, dateTo))
+  if not paged and not filtered and fields is None and sort == "-createdAt":
+    return source()
+
+  descending = sort.startswith("-")
+  sort_field = sort.lstrip("-+")
+  if sort_field not in SORTABLE_FIELDS:
+    raise HTTPException(status_code=400, detail=f"Geçersiz sıralama alanı: {sort_field}")
+
+  jobs = source()
+  if status:
+    statuses = {s.strip() for s in status.split(",") if s.strip()}
+    jobs = [j for j in jobs if j.get("status") in statuses]
+  if customerId:
+    jobs = [j for j in jobs if j.get("customerId") == customerId]
+  if startType:
+    jobs = [j for j in jobs if j.get("startType") == startType]
+  if dateFrom:
+    jobs = [j for j in jobs if (j.get("createdAt") or "") >= dateFrom]
+  if dateTo:
+    jobs = [j for j in jobs if (j.get("createdAt") or "")[:len(dateTo)] <= dateTo]
+
+  def sort_key(job):
+    return (str(job.get(sort_field) or ""), str(job.get("id") or ""))
+
+  jobs.sort(key=sort_key, reverse=descending)
+  total = len(jobs)
+
+  if cursor:
+    position = _decode_cursor(cursor)
+    if descending:
+      jobs = [j for j in jobs if sort_key(j) < position]
+    else:
+      jobs = [j for j in jobs if sort_key(j) > position]
+
+  page_size = limit or MAX_PAGE_SIZE
+  next_cursor = None
+  if paged and len(jobs) > page_size:
+    next_cursor = _encode_cursor(*sort_key(jobs[page_size - 1]))
+  if paged:
+    jobs = jobs[:page_size]
+
+  if fields == "*":
+    projection = None
+  elif fields:
+    projection = [f.strip() for f in fields.split(",") if f.strip()]
+  else:
+    projection = SUMMARY_FIELDS if paged else None
+  if projection:
+    if "id" not in projection:
+      projection = ["id", *projection]
+    jobs = [project(j, projection) for j in jobs]
+
+  if not paged:
+    return jobs
+  return {"items": jobs, "total": total, "limit": page_size, "nextCursor": next_cursor}
+
+
+@router.get("/pipeline")
+def get_pipeline():
+  """Statü bazlı sıcak iş sayıları (statü indeksinden, jobs.json taranmaz) ve soğuk arşivdeki iş sayısı"""
+  counts = job_index.status_counts()
+  return {"counts": counts, "total": sum(counts.values()), "cold": cold_store.count()}
+
+
+@router.get("/pipeline/{status}")
+def get_pipeline_status(
+    status: str,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+):
+  """Statüdeki işlerin özet kayıtları, en yeni önce"""
+  items, total = job_index.page(status, limit, offset)
+  return {"items": items, "total": total, "limit": limit, "offset": offset}
 
 
 @router.get("/{job_id}")
-def get_job(job_id: str):
+def get_job(job_id: str, response: Response):
   for job in _jobs():
     if job.get("id") == job_id:
+      response.headers["ETag"] = record_etag(job)
       return job
+  job = cold_store.get(job_id)
+  if job is not None:
+    return job
   raise HTTPException(status_code=404, detail="Job not found")
 
 
+BUNDLE_SECTIONS = ["job", "documents", "production", "assembly", "reservations", "activities"]
+BUNDLE_ACTIVITY_LIMIT = 20
+
+
+@router.get("/{job_id}/bundle")
+def get_job_bundle(
+    job_id: str,
+    include: str | None = Query(None, description=f"Virgülle ayrılmış bölümler ({','.join(BUNDLE_SECTIONS)}); boş ise hepsi"),
+):
+  """
+  İş detay ekranı için tek istek: iş + dokümanlar, üretim siparişleri, montaj
+  görevleri, stok rezervasyonları ve aktiviteler. Her bölüm kendi endpoint'i
+  ile aynı biçimde döner; kayıtlar jobId indeksinden okunur (tarama yok).
+  """
+  sections = BUNDLE_SECTIONS
+  if include:
+    sections = [s.strip() for s in include.split(",") if s.strip()]
+    unknown = set(sections) - set(BUNDLE_SECTIONS)
+    if unknown:
+      raise HTTPException(status_code=400, detail=f"Bilinmeyen bölüm: {', '.join(sorted(unknown))}")
+
+  job = record_index.first("jobs.json", "id", job_id) or cold_store.get(job_id)
+  if job is None:
+    raise HTTPException(status_code=404, detail="Job not found")
+
+  bundle = {"id": job_id}
+  if "job" in sections:
+    bundle["job"] = job
+  if "documents" in sections:
+    bundle["documents"] = record_index.lookup("documents.json", "jobId", job_id)
+  if "production" in sections:
+    bundle["production"] = production._job_orders_summary(
+        record_index.lookup("productionOrders.json", "jobId", job_id))
+  if "assembly" in sections:
+    bundle["assembly"] = assembly._job_tasks_summary(
+        record_index.lookup("assemblyTasks.json", "jobId", job_id))
+  if "reservations" in sections:
+    bundle["reservations"] = record_index.lookup("reservations.json", "jobId", job_id)
+  if "activities" in sections:
+    activities = record_index.lookup("activities.json", ("targetType", "targetId"), ("job", job_id))
+    bundle["activities"] = {"items": activities[:BUNDLE_ACTIVITY_LIMIT], "total": len(activities)}
+  return bundle
+
+
 @router.post("/", status_code=201)
 def create_job(payload: JobCreate, authorization: Optional[str] = Header(None)):
   user_id, user_name = _get_user_info(authorization)
@@ -212,7 +398,7 @@ def create_job(payload: JobCreate, authorization: Optional[str] = Header(None)):
     }
     _log(job, "archive_created", f"Arşiv kaydı oluşturuldu - Tutar: {payload.archiveTotalAmount}", user_id, user_name)
     data.insert(0, job)
-    _save_jobs(data)
+    _save_jobs(data, [new_id], [new_id])
     
     # Aktivite log
     log_activity(user_id, user_name, "job_create", "job", new_id, 
@@ -257,7 +443,7 @@ def create_job(payload: JobCreate, authorization: Optional[str] = Header(None)):
   }
   _log(job, "created", f"startType={payload.startType}", user_id, user_name)
   data.insert(0, job)
-  _save_jobs(data)
+  _save_jobs(data, [new_id], [new_id])
   
   # Aktivite log
   start_type_labels = {"OLCU": "Ölçü", "MUSTERI_OLCUSU": "Müşteri Ölçüsü", "SERVIS": "Servis"}
@@ -312,7 +498,7 @@ def update_measure(job_id: str, payload: MeasureUpdate, authorization: Optional[
     _log(job, "measure.updated", None, user_id, user_name)
   
   data[idx] = job
-  _save_jobs(data)
+  _save_jobs(data, [job_id])
   return job
 
 
@@ -352,7 +538,7 @@ def report_measure_issue(job_id: str, payload: MeasureIssue):
   _log(job, "measure.issue.reported", f"Sorun: {payload.issueType} - {payload.description[:50]}")
   
   data[idx] = job
-  _save_jobs(data)
+  _save_jobs(data, [job_id])
   return job
 
 
@@ -377,7 +563,7 @@ def resolve_measure_issue(job_id: str, issue_id: str):
   _log(job, "measure.issue.resolved", f"Sorun çözüldü: {issue_id}")
   
   data[idx] = job
-  _save_jobs(data)
+  _save_jobs(data, [job_id])
   return job
 
 
@@ -392,7 +578,7 @@ def update_offer(job_id: str, payload: OfferUpdate, authorization: Optional[str]
   job["status"] = payload.status or "TEKLIF_TASLAK"
   _log(job, "offer.updated", None, user_id, user_name)
   data[idx] = job
-  _save_jobs(data)
+  _save_jobs(data, [job_id])
   
   # Aktivite log
   log_activity(user_id, user_name, "job_offer_update", "job", job_id, 
@@ -400,6 +586,44 @@ def update_offer(job_id: str, payload: OfferUpdate, authorization: Optional[str]
   return job
 
 
+# PATCH ile değiştirilemeyen alanlar: kimlik, denetim kaydı, sürüm ve statü
+# (statü geçişleri kuralları olan /status, /inquiry-decision vb. ile yapılır)
+PATCH_PROTECTED_FIELDS = {"", "id", "logs", "status", "createdAt", "version"}
+
+
+@router.patch("/{job_id}")
+def patch_job(
+    job_id: str,
+    response: Response,
+    operations: list = Body(..., description="RFC 6902 JSON Patch işlem listesi"),
+    authorization: Optional[str] = Header(None),
+):
+  """Kısmi güncelleme (JSON Patch) - sadece değişen yol kopyalanır, iş derin kopyalanmaz"""
+  user_id, user_name = _get_user_info(authorization)
+  data, idx, job = _find_job(job_id)
+  try:
+    fields = json_patch.touched_fields(operations)
+    protected = fields & PATCH_PROTECTED_FIELDS
+    if protected:
+      raise HTTPException(status_code=400, detail=f"Bu alanlar PATCH ile değiştirilemez: {', '.join(sorted(protected)) or '/'}")
+    patched = json_patch.apply_patch(job, operations)
+  except json_patch.PatchTestFailed as e:
+    raise HTTPException(status_code=409, detail=str(e))
+  except json_patch.PatchError as e:
+    raise HTTPException(status_code=422, detail=str(e))
+
+  # logs listesi orijinal kayıtla paylaşılıyor; eklemeden önce kopyala
+  patched["logs"] = list(patched.get("logs") or [])
+  _log(patched, "job.patched", ", ".join(sorted(fields)), user_id, user_name)
+  data[idx] = patched
+  _save_jobs(data, [job_id])
+  response.headers["ETag"] = record_etag(patched)
+
+  log_activity(user_id, user_name, "job_update", "job", job_id,
+               patched.get("title", job_id), f"İş güncellendi: {', '.join(sorted(fields))}", get_action_icon("update"))
+  return patched
+
+
 @router.post("/{job_id}/approval/start")
 def start_approval(job_id: str, payload: ApprovalStart):
   data, idx, job = _find_job(job_id)
@@ -416,7 +640,7 @@ def start_approval(job_id: str, payload: ApprovalStart):
   job["status"] = "ANLASMA_TAMAMLANDI"
   _log(job, "approval.started")
   data[idx] = job
-  _save_jobs(data)
+  _save_jobs(data, [job_id])
   return job
 
 
@@ -436,7 +660,7 @@ def update_payment(job_id: str, payload: PaymentUpdate):
   job["approval"]["paymentPlan"] = payload.paymentPlan
   _log(job, "payment.updated")
   data[idx] = job
-  _save_jobs(data)
+  _save_jobs(data, [job_id])
   return job
 
 
@@ -464,7 +688,7 @@ def update_stock(job_id: str, payload: StockStatus):
     job["status"] = "URETIME_HAZIR" if payload.ready else "SONRA_URETILECEK"
     _log(job, "stock.updated", f"ready={payload.ready}, items={len(payload.items or [])}, estimatedDate={payload.estimatedDate}")
   data[idx] = job
-  _save_jobs(data)
+  _save_jobs(data, [job_id])
   return job
 
 
@@ -490,7 +714,7 @@ def production_status(job_id: str, payload: ProductionStatus):
     _log(job, "production.updated", payload.status)
   
   data[idx] = job
-  _save_jobs(data)
+  _save_jobs(data, [job_id])
   return job
 
 
@@ -504,7 +728,13 @@ def update_estimated_assembly(job_id: str, payload: EstimatedAssemblyUpdate):
   """Montaj terminini güncelle (müşteriye söylenilen tarih)"""
   data, idx, job = _find_job(job_id)
   job = deepcopy(job)
-  
+  _apply_estimated_assembly(job, payload)
+  data[idx] = job
+  _save_jobs(data, [job_id])
+  return job
+
+
+def _apply_estimated_assembly(job: dict, payload: EstimatedAssemblyUpdate):
   # Önceki termini history'ye kaydet
   prev = job.get("estimatedAssembly", {})
   if prev.get("date"):
@@ -522,9 +752,6 @@ def update_estimated_assembly(job_id: str, payload: EstimatedAssemblyUpdate):
     "setAt": _now_iso(),
   }
   _log(job, "estimatedAssembly.updated", payload.date)
-  data[idx] = job
-  _save_jobs(data)
-  return job
 
 
 @router.put("/{job_id}/assembly/schedule")
@@ -536,7 +763,7 @@ def assembly_schedule(job_id: str, payload: AssemblySchedule):
   job["status"] = "MONTAJ_TERMIN"
   _log(job, "assembly.scheduled")
   data[idx] = job
-  _save_jobs(data)
+  _save_jobs(data, [job_id])
   return job
 
 
@@ -556,7 +783,7 @@ def assembly_complete(job_id: str, payload: AssemblyComplete):
   job["status"] = "MUHASEBE_BEKLIYOR"
   _log(job, "assembly.complete", f"team={payload.team}")
   data[idx] = job
-  _save_jobs(data)
+  _save_jobs(data, [job_id])
   return job
 
 
@@ -566,13 +793,25 @@ def update_status(job_id: str, payload: StatusUpdate, authorization: Optional[st
   user_id, user_name = _get_user_info(authorization)
   data, idx, job = _find_job(job_id)
   job = deepcopy(job)
+  activity = _apply_status_update(job, payload, user_id, user_name)
+  data[idx] = job
+  _save_jobs(data, [job_id])
+  log_activity(**activity)
+  return job
+
+
+CANCEL_STATUSES = ["IPTAL", "ANLASILAMADI", "VAZGECILDI"]
+
+
+def _apply_status_update(job: dict, payload: StatusUpdate, user_id: str, user_name: str) -> dict:
+  """Statü geçişini (doğrulama dahil) işe uygula; aktivite kaydı argümanlarını döndür"""
+  job_id = job.get("id")
   job_title = job.get("title", job_id)
   
   old_status = job.get("status", "")
   
   # İptal durumunda cancelReason zorunlu
-  cancel_statuses = ["IPTAL", "ANLASILAMADI", "VAZGECILDI"]
-  if payload.status in cancel_statuses:
+  if payload.status in CANCEL_STATUSES:
     if not payload.cancelReason:
       raise HTTPException(status_code=400, detail="İptal nedeni zorunludur.")
     
@@ -597,17 +836,83 @@ def update_status(job_id: str, payload: StatusUpdate, authorization: Optional[st
     job["rejection"] = payload.rejection
   
   _log(job, "status.updated", f"{old_status} -> {payload.status}", user_id, user_name)
-  data[idx] = job
-  _save_jobs(data)
   
   # Aktivite log - iptal durumu için özel mesaj
-  if payload.status in cancel_statuses:
-    log_activity(user_id, user_name, "job_cancel", "job", job_id, 
-                 job_title, f"İş iptal edildi: {payload.cancelReason}", get_action_icon("job_cancel"))
+  if payload.status in CANCEL_STATUSES:
+    action, details = "job_cancel", f"İş iptal edildi: {payload.cancelReason}"
   else:
-    log_activity(user_id, user_name, "job_status_change", "job", job_id, 
-                 job_title, f"Durum değişti: {old_status} → {payload.status}", get_action_icon("job_status_change"))
-  return job
+    action, details = "job_status_change", f"Durum değişti: {old_status} → {payload.status}"
+  return {
+      "user_id": user_id, "user_name": user_name, "action": action, "target_type": "job",
+      "target_id": job_id, "target_name": job_title, "details": details, "icon": get_action_icon(action),
+  }
+
+
+class BulkJobOperation(BaseModel):
+  jobId: str
+  # Her işlem için bunlardan tam olarak biri verilmeli
+  status: StatusUpdate | None = None
+  estimatedAssembly: EstimatedAssemblyUpdate | None = None
+  shiftEstimatedAssemblyDays: int | None = None  # Mevcut termini N gün kaydır
+
+
+class BulkJobRequest(BaseModel):
+  operations: list[BulkJobOperation] = Field(..., min_length=1, max_length=MAX_PAGE_SIZE)
+
+
+def _shift_estimated_assembly(job: dict, days: int) -> EstimatedAssemblyUpdate:
+  current = (job.get("estimatedAssembly") or {}).get("date")
+  if not current:
+    raise HTTPException(status_code=400, detail="İşin montaj termini yok, kaydırılamaz.")
+  try:
+    shifted = datetime.fromisoformat(current[:10]) + timedelta(days=days)
+  except ValueError:
+    raise HTTPException(status_code=400, detail=f"Geçersiz montaj termini: {current}")
+  note = (job.get("estimatedAssembly") or {}).get("note")
+  return EstimatedAssemblyUpdate(date=shifted.date().isoformat() + current[10:], note=note)
+
+
+@router.post("/bulk")
+def bulk_update(payload: BulkJobRequest, authorization: Optional[str] = Header(None)):
+  """
+  Toplu iş işlemleri (statü değişikliği, toplu iptal, montaj termini kaydırma).
+  Tüm işlemler tek işlemde uygulanır: biri bile geçersizse hiçbir şey yazılmaz
+  ve hatalar işlem sırasıyla döner. jobs.json ve activities.json birer kez yazılır.
+  """
+  user_id, user_name = _get_user_info(authorization)
+  data = _jobs()
+  positions = {job.get("id"): idx for idx, job in enumerate(data)}
+  updated = {}
+  activities = []
+  errors = []
+
+  for number, op in enumerate(payload.operations):
+    try:
+      given = [v is not None for v in (op.status, op.estimatedAssembly, op.shiftEstimatedAssemblyDays)]
+      if sum(given) != 1:
+        raise HTTPException(status_code=400, detail="Her işlem için tek bir güncelleme verilmeli.")
+      if op.jobId not in positions:
+        _raise_missing_job(op.jobId)
+      # Aynı işe birden fazla işlem sırayla uygulanır
+      job = updated.get(op.jobId) or deepcopy(data[positions[op.jobId]])
+      if op.status is not None:
+        activities.append(_apply_status_update(job, op.status, user_id, user_name))
+      elif op.estimatedAssembly is not None:
+        _apply_estimated_assembly(job, op.estimatedAssembly)
+      else:
+        _apply_estimated_assembly(job, _shift_estimated_assembly(job, op.shiftEstimatedAssemblyDays))
+      updated[op.jobId] = job
+    except HTTPException as e:
+      errors.append({"index": number, "jobId": op.jobId, "status": e.status_code, "detail": e.detail})
+
+  if errors:
+    raise HTTPException(status_code=400, detail={"message": "Toplu işlem uygulanmadı.", "errors": errors})
+
+  for job_id, job in updated.items():
+    data[positions[job_id]] = job
+  _save_jobs(data, list(updated))
+  log_activities(activities)
+  return {"updated": len(updated), "jobs": list(updated.values())}
 
 
 @router.put("/{job_id}/finance/close")
@@ -660,7 +965,7 @@ def finance_close(job_id: str, payload: FinanceClose, authorization: Optional[st
   job["status"] = "KAPALI"
   _log(job, "finance.closed", f"balance={balance}", user_id, user_name)
   data[idx] = job
-  _save_jobs(data)
+  _save_jobs(data, [job_id])
   
   # Aktivite log
   log_activity(user_id, user_name, "job_complete", "job", job_id, 
@@ -711,6 +1016,6 @@ def inquiry_decision(job_id: str, payload: InquiryDecision, authorization: Optio
                  job_title, f"Fiyat sorgusu reddedildi - Sebep: {payload.cancelReason}", get_action_icon("reject"))
   
   data[idx] = job
-  _save_jobs(data)
+  _save_jobs(data, [job_id])
   return job
 
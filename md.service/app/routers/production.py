@@ -13,6 +13,7 @@ from pydantic import BaseModel
 from typing import Optional
 
 from ..data_loader import load_json, save_json
+from .. import record_index
 from ..activity_logger import log_activity, get_action_icon
 
 router = APIRouter(prefix="/production", tags=["production"])
@@ -229,9 +230,10 @@ def get_summary():
 @router.get("/by-job/{job_id}")
 def get_orders_by_job(job_id: str):
     """Bir iş için tüm siparişleri getir"""
-    orders = load_json("productionOrders.json")
-    job_orders = [o for o in orders if o.get("jobId") == job_id]
-    
+    return _job_orders_summary(record_index.lookup("productionOrders.json", "jobId", job_id))
+
+
+def _job_orders_summary(job_orders: list) -> dict:
     # Her sipariş için güncel durum
     for order in job_orders:
         order["isOverdue"] = _is_overdue(order)
@@ -0,0 +1,49 @@
+"""
+Profil Kayıtları API (sadece admin)
+Talep üzerine veya örnekleme ile alınan istek profillerini listele / dışa aktar
+scope="loop" olan profiller async handler'lardandır ve event loop'taki tüm
+işleri içerir; scope="handler" profiller sadece isteğin kendi thread'idir.
+"""
+from fastapi import APIRouter, HTTPException, Header
+from fastapi.responses import PlainTextResponse
+from typing import Optional
+
+from .. import profiling
+from .auth import is_admin
+
+router = APIRouter(prefix="/admin/profiles", tags=["admin"])
+
+
+def _require_admin(authorization: Optional[str]):
+    if not is_admin(authorization):
+        raise HTTPException(status_code=403, detail="Bu işlem için admin yetkisi gerekli")
+
+
+@router.get("")
+def list_profiles(authorization: Optional[str] = Header(None)):
+    """Kayıtlı profilleri listele (en yeni önce); scope loop genel profilleri ayırır"""
+    _require_admin(authorization)
+    return profiling.list_profiles()
+
+
+@router.get("/{profile_id}")
+def get_profile(profile_id: str, authorization: Optional[str] = Header(None)):
+    """Profil detayı (stack örnekleri dahil)"""
+    _require_admin(authorization)
+    entry = profiling.load_profile(profile_id)
+    if not entry:
+        raise HTTPException(status_code=404, detail="Profil bulunamadı")
+    return entry
+
+
+@router.get("/{profile_id}/collapsed", response_class=PlainTextResponse)
+def export_collapsed(profile_id: str, authorization: Optional[str] = Header(None)):
+    """Flamegraph için collapsed-stack formatında dışa aktar"""
+    _require_admin(authorization)
+    entry = profiling.load_profile(profile_id)
+    if not entry:
+        raise HTTPException(status_code=404, detail="Profil bulunamadı")
+    return PlainTextResponse(
+        profiling.to_collapsed(entry),
+        headers={"Content-Disposition": f'attachment; filename="{profile_id}.folded"'},
+    )
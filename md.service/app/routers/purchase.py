@@ -4,8 +4,9 @@ from fastapi import APIRouter, HTTPException, Query, Header
 from pydantic import BaseModel
 from typing import Optional
 
-from ..data_loader import load_json, save_json
+from ..data_loader import commit_records, load_json, save_json
 from ..activity_logger import log_activity, get_action_icon
+from .stock import STOCK_FILE, find_by_code
 
 router = APIRouter(prefix="/purchase", tags=["purchase"])
 
@@ -244,7 +245,6 @@ def receive_delivery(order_id: str, payload: PODelivery, authorization: Optional
     """Kısmi veya tam teslimat kaydet"""
     user_id, user_name = _get_user_info(authorization)
     orders = load_json("purchaseOrders.json")
-    stock_items = load_json("stockItems.json")
     stock_movements = load_json("stockMovements.json")
     
     for idx, order in enumerate(orders):
@@ -262,43 +262,47 @@ def receive_delivery(order_id: str, payload: PODelivery, authorization: Optional
             }
             
             all_complete = True
+            # (ürün kodu, renk kodu) -> sipariş kalemi / güncellenen stok kalemi
+            order_items = {}
+            for poi in order.get("items", []):
+                order_items.setdefault((poi.get("productCode"), poi.get("colorCode")), poi)
+            touched = {}
             
             for recv_item in payload.items:
                 prod_code = recv_item.get("productCode")
                 color_code = recv_item.get("colorCode")
                 qty = recv_item.get("quantity", 0)
+                code = (prod_code, color_code)
                 
                 # Sipariş kalemini bul ve güncelle
-                for poi in order.get("items", []):
-                    if poi.get("productCode") == prod_code and poi.get("colorCode") == color_code:
-                        poi["receivedQty"] = (poi.get("receivedQty") or 0) + qty
-                        
-                        if poi["receivedQty"] < poi["quantity"]:
-                            all_complete = False
-                        break
+                poi = order_items.get(code)
+                if poi is not None:
+                    poi["receivedQty"] = (poi.get("receivedQty") or 0) + qty
+                    
+                    if poi["receivedQty"] < poi["quantity"]:
+                        all_complete = False
                 
                 # Stoku güncelle
-                for sidx, si in enumerate(stock_items):
-                    if si.get("productCode") == prod_code and si.get("colorCode") == color_code:
-                        si["onHand"] = (si.get("onHand") or 0) + qty
-                        si["lastUpdated"] = _today()
-                        stock_items[sidx] = si
-                        
-                        # Hareket kaydı
-                        stock_movements.insert(0, {
-                            "id": f"MOV-{str(uuid.uuid4())[:8].upper()}",
-                            "date": _today(),
-                            "item": si.get("name"),
-                            "itemId": si.get("id"),
-                            "productCode": prod_code,
-                            "colorCode": color_code,
-                            "change": qty,
-                            "type": "stockIn",
-                            "reason": f"Sipariş teslimi - {order_id}",
-                            "operator": payload.receivedBy or "Sistem",
-                            "reference": order_id
-                        })
-                        break
+                si = touched.get(code) or find_by_code(prod_code, color_code)
+                if si:
+                    si["onHand"] = (si.get("onHand") or 0) + qty
+                    si["lastUpdated"] = _today()
+                    touched[code] = si
+                    
+                    # Hareket kaydı
+                    stock_movements.insert(0, {
+                        "id": f"MOV-{str(uuid.uuid4())[:8].upper()}",
+                        "date": _today(),
+                        "item": si.get("name"),
+                        "itemId": si.get("id"),
+                        "productCode": prod_code,
+                        "colorCode": color_code,
+                        "change": qty,
+                        "type": "stockIn",
+                        "reason": f"Sipariş teslimi - {order_id}",
+                        "operator": payload.receivedBy or "Sistem",
+                        "reference": order_id
+                    })
             
             # Tüm kalemler tamamlandı mı kontrol et
             for poi in order.get("items", []):
@@ -315,8 +319,10 @@ def receive_delivery(order_id: str, payload: PODelivery, authorization: Optional
                 order["status"] = "partial"
             
             orders[idx] = order
+            # Stok önce: eşzamanlı değişiklik (409) diğer dosyalar yazılmadan çıkar
+            if touched:
+                commit_records(STOCK_FILE, list(touched.values()), [si["id"] for si in touched.values()])
             save_json("purchaseOrders.json", orders)
-            save_json("stockItems.json", stock_items)
             save_json("stockMovements.json", stock_movements)
             
             # Aktivite log
@@ -3,6 +3,7 @@ from datetime import datetime, timedelta
 from collections import defaultdict
 
 from ..data_loader import load_json
+from .. import cold_store
 
 router = APIRouter(prefix="/reports", tags=["reports"])
 
@@ -38,7 +39,7 @@ def list_reports():
 def production_report(start_date: str = None, end_date: str = None):
     """Üretim Raporu - Üretim süreleri, iç/dış üretim analizi"""
     orders = load_json("productionOrders.json")
-    jobs = load_json("jobs.json")
+    jobs = cold_store.all_jobs()
     settings = load_json("settings.json")
     
     # Tarih filtresi
@@ -115,7 +116,7 @@ def production_report(start_date: str = None, end_date: str = None):
 def assembly_report(start_date: str = None, end_date: str = None):
     """Montaj Raporu - Ekip performansı, sorunlar"""
     tasks = load_json("assemblyTasks.json")
-    jobs = load_json("jobs.json")
+    jobs = cold_store.all_jobs()
     teams = load_json("teams.json")
     personnel = load_json("personnel.json")
     settings = load_json("settings.json")
@@ -260,7 +261,7 @@ def delays_report(start_date: str = None, end_date: str = None):
     """Gecikme Raporu - Gecikme nedenleri ve sorumlular"""
     orders = load_json("productionOrders.json")
     tasks = load_json("assemblyTasks.json")
-    jobs = load_json("jobs.json")
+    jobs = cold_store.all_jobs()
     personnel = load_json("personnel.json")
     settings = load_json("settings.json")
     
@@ -374,7 +375,7 @@ def delays_report(start_date: str = None, end_date: str = None):
 @router.get("/finance")
 def finance_report(start_date: str = None, end_date: str = None):
     """Finansal Rapor - Ciro, tahsilat, ödeme durumu"""
-    jobs = load_json("jobs.json")
+    jobs = cold_store.all_jobs()
     payments = load_json("payments.json")
     invoices = load_json("invoices.json")
     
@@ -527,7 +528,7 @@ def finance_report(start_date: str = None, end_date: str = None):
 @router.get("/issues")
 def issues_report(start_date: str = None, end_date: str = None):
     """Sorun Analizi - Tüm sorun tipleri"""
-    jobs = load_json("jobs.json")
+    jobs = cold_store.all_jobs()
     tasks = load_json("assemblyTasks.json")
     orders = load_json("productionOrders.json")
     settings = load_json("settings.json")
@@ -650,7 +651,7 @@ def issues_report(start_date: str = None, end_date: str = None):
 @router.get("/performance")
 def performance_report(start_date: str = None, end_date: str = None):
     """Genel Performans Özeti"""
-    jobs = load_json("jobs.json")
+    jobs = cold_store.all_jobs()
     orders = load_json("productionOrders.json")
     tasks = load_json("assemblyTasks.json")
     
@@ -1070,7 +1071,7 @@ def supplier_detail_report(supplier_id: str, start_date: str = None, end_date: s
 @router.get("/customers-analysis")
 def customers_analysis_report(start_date: str = None, end_date: str = None):
     """Müşteri Analizi - Segment dahil"""
-    jobs = load_json("jobs.json")
+    jobs = cold_store.all_jobs()
     customers = load_json("customers.json")
     
     # Tarih filtresi
@@ -1209,7 +1210,7 @@ def customers_analysis_report(start_date: str = None, end_date: str = None):
 @router.get("/cancellations")
 def cancellations_report(start_date: str = None, end_date: str = None):
     """İptal/Red Analizi"""
-    jobs = load_json("jobs.json")
+    jobs = cold_store.all_jobs()
     settings = load_json("settings.json")
     
     # Tarih filtresi
@@ -1279,7 +1280,7 @@ def cancellations_report(start_date: str = None, end_date: str = None):
 @router.get("/period-comparison")
 def period_comparison_report(period1_start: str, period1_end: str, period2_start: str, period2_end: str):
     """Dönemsel Karşılaştırma - İki dönem arası karşılaştırma"""
-    jobs = load_json("jobs.json")
+    jobs = cold_store.all_jobs()
     orders = load_json("productionOrders.json")
     
     def get_period_stats(jobs_list, orders_list, start, end):
@@ -1556,7 +1557,7 @@ def personnel_performance_report(start_date: str = None, end_date: str = None):
 @router.get("/process-time")
 def process_time_report(start_date: str = None, end_date: str = None):
     """Süreç/Zaman Analizi - Aşamalar arası süre"""
-    jobs = load_json("jobs.json")
+    jobs = cold_store.all_jobs()
     
     # Tarih filtresi
     if start_date:
@@ -1807,7 +1808,7 @@ def personnel_detail_report(person_id: str, start_date: str = None, end_date: st
 def customer_detail_report(customer_id: str, start_date: str = None, end_date: str = None):
     """Müşteri Detay Raporu"""
     customers = load_json("customers.json")
-    jobs = load_json("jobs.json")
+    jobs = cold_store.all_jobs()
     
     # Müşteriyi bul
     customer = next((c for c in customers if c.get("id") == customer_id), None)
@@ -1905,7 +1906,7 @@ def customer_detail_report(customer_id: str, start_date: str = None, end_date: s
 @router.get("/inquiry-conversion")
 def inquiry_conversion_report(start_date: str = None, end_date: str = None):
     """Fiyat Sorgusu (Müşteri Ölçüsü) Dönüşüm Raporu"""
-    jobs = load_json("jobs.json")
+    jobs = cold_store.all_jobs()
     settings = load_json("settings.json")
     
     # Sadece müşteri ölçüsü işleri
@@ -1,11 +1,12 @@
 import uuid
 from datetime import datetime
-from fastapi import APIRouter, HTTPException, Header
+from fastapi import APIRouter, HTTPException, Header, Request, Response
 from pydantic import BaseModel, Field
 from typing import List, Optional
 
 from ..data_loader import load_json, save_json
 from ..activity_logger import log_activity, get_action_icon
+from ..conditional import not_modified
 
 router = APIRouter(prefix="/roles", tags=["roles"])
 
@@ -30,7 +31,10 @@ class RoleIn(BaseModel):
 
 
 @router.get("/")
-def list_roles(aktifMi: bool = None):
+def list_roles(request: Request, response: Response, aktifMi: bool = None):
+  cached = not_modified(request, response, "roles.json")
+  if cached:
+    return cached
   roles = load_json("roles.json")
   if aktifMi is not None:
     roles = [r for r in roles if r.get("aktifMi") == aktifMi]
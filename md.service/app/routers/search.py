@@ -0,0 +1,30 @@
+"""
+Genel Arama API
+İşler, müşteriler, dokümanlar ve stok kalemlerinde Türkçe duyarlı önek araması
+(typeahead); bellek içi ters indeksten cevaplanır.
+"""
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+
+from .. import search_index
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+COLLECTIONS = {source[0] for source in search_index.SOURCES.values()}
+
+
+@router.get("")
+def search(
+    q: str = Query(..., min_length=1, description="Arama metni (her kelime önek olarak eşleşir)"),
+    collections: Optional[str] = Query(None, description="jobs,customers,documents,stock (boş ise hepsi)"),
+    limit: int = Query(20, ge=1, le=100),
+):
+    """Genel arama - skor sırasına göre en iyi sonuçlar"""
+    wanted = None
+    if collections:
+        wanted = {c.strip() for c in collections.split(",") if c.strip()}
+        unknown = wanted - COLLECTIONS
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Bilinmeyen koleksiyon: {', '.join(sorted(unknown))}")
+    items, total = search_index.search(q, wanted, limit)
+    return {"query": q, "items": items, "total": total}
@@ -6,11 +6,12 @@ Sistem ayarları ve iş kolu yapılandırması yönetimi.
 
 import uuid
 from datetime import datetime
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
 from pydantic import BaseModel
 from typing import Optional, List
 
 from ..data_loader import load_json, save_json
+from ..conditional import not_modified
 
 router = APIRouter(prefix="/settings", tags=["settings"])
 
@@ -89,8 +90,11 @@ def _get_settings():
 # ========== General Settings ==========
 
 @router.get("/")
-def list_settings():
+def list_settings(request: Request, response: Response):
     """Tüm ayarları getir"""
+    cached = not_modified(request, response, "settings.json")
+    if cached:
+        return cached
     return _get_settings()
 
 
@@ -1,13 +1,25 @@
 import uuid
 from datetime import datetime
-from fastapi import APIRouter, HTTPException, Query, Header
+from fastapi import APIRouter, Depends, HTTPException, Query, Header, Request, Response
 from pydantic import BaseModel
 from typing import Optional
 
-from ..data_loader import load_json, save_json
+from ..data_loader import commit_many, commit_records, load_json
+from ..search_index import fold
 from ..activity_logger import log_activity, get_action_icon
+from ..conditional import if_match, not_modified
+from .. import record_index
 
-router = APIRouter(prefix="/stock", tags=["stock"])
+router = APIRouter(prefix="/stock", tags=["stock"], dependencies=[Depends(if_match)])
+
+STOCK_FILE = "stockItems.json"
+# Ürün kodu + renk kodu bileşik indeksi (record_index üzerinde, commit'lerde güncel)
+CODE_KEY = ("productCode", "colorCode")
+
+
+def find_by_code(product_code: str, color_code: str) -> Optional[dict]:
+    """Ürün kodu + renk kodu ile stok kalemi (sığ kopya, yoksa None)"""
+    return record_index.first(STOCK_FILE, CODE_KEY, (product_code, color_code))
 
 
 def _get_user_info(authorization: Optional[str] = None) -> tuple:
@@ -71,12 +83,17 @@ class BulkReservation(BaseModel):
 
 @router.get("/items")
 def list_items(
+    request: Request,
+    response: Response,
     productCode: str | None = None,
     colorCode: str | None = None,
     supplierId: str | None = None,
     critical_only: bool = False
 ):
     """Stok kalemlerini listele, opsiyonel filtrelerle"""
+    cached = not_modified(request, response, "stockItems.json")
+    if cached:
+        return cached
     items = load_json("stockItems.json")
     
     if productCode:
@@ -101,11 +118,12 @@ def search_items(
     items = load_json("stockItems.json")
     
     if q:
-        q_lower = q.lower()
+        # Türkçe katlama: "carisma" -> "CARİSMA KAPI" eşleşir (str.lower İ'yi bozar)
+        q_fold = fold(q)
         items = [i for i in items if 
-                 q_lower in i.get("productCode", "").lower() or
-                 q_lower in i.get("name", "").lower() or
-                 q_lower in i.get("colorName", "").lower()]
+                 q_fold in fold(i.get("productCode", "")) or
+                 q_fold in fold(i.get("name", "")) or
+                 q_fold in fold(i.get("colorName", ""))]
     
     if productCode:
         items = [i for i in items if i.get("productCode", "").startswith(productCode)]
@@ -136,25 +154,23 @@ def get_item(item_id: str):
 @router.get("/items/by-code/{product_code}/{color_code}")
 def get_item_by_code(product_code: str, color_code: str):
     """Ürün kodu ve renk kodu ile stok kalemini getir"""
-    items = load_json("stockItems.json")
-    for item in items:
-        if item.get("productCode") == product_code and item.get("colorCode") == color_code:
-            item["available"] = (item.get("onHand", 0) or 0) - (item.get("reserved", 0) or 0)
-            item["isCritical"] = item["available"] <= (item.get("critical", 0) or 0)
-            return item
-    raise HTTPException(status_code=404, detail="Stok kalemi bulunamadı")
+    item = find_by_code(product_code, color_code)
+    if not item:
+        raise HTTPException(status_code=404, detail="Stok kalemi bulunamadı")
+    item["available"] = (item.get("onHand", 0) or 0) - (item.get("reserved", 0) or 0)
+    item["isCritical"] = item["available"] <= (item.get("critical", 0) or 0)
+    return item
 
 
 @router.post("/items", status_code=201)
 def create_item(payload: StockItemIn, authorization: Optional[str] = Header(None)):
     """Yeni stok kalemi oluştur"""
     user_id, user_name = _get_user_info(authorization)
-    items = load_json("stockItems.json")
     
     # Aynı ürün kodu + renk kodu kontrolü
-    for item in items:
-        if item.get("productCode") == payload.productCode and item.get("colorCode") == payload.colorCode:
-            raise HTTPException(status_code=400, detail="Bu ürün kodu ve renk kodu kombinasyonu zaten mevcut")
+    if find_by_code(payload.productCode, payload.colorCode):
+        raise HTTPException(status_code=400, detail="Bu ürün kodu ve renk kodu kombinasyonu zaten mevcut")
+    items = load_json("stockItems.json")
     
     new_id = f"STK-{str(uuid.uuid4())[:8].upper()}"
     new_item = {
@@ -164,7 +180,7 @@ def create_item(payload: StockItemIn, authorization: Optional[str] = Header(None
     }
     
     items.insert(0, new_item)
-    save_json("stockItems.json", items)
+    commit_records("stockItems.json", items, [new_id], [new_id])
     
     # Aktivite log
     log_activity(
@@ -191,7 +207,7 @@ def update_item(item_id: str, payload: StockItemUpdate):
             updated = {**item, **update_data}
             updated["lastUpdated"] = datetime.utcnow().isoformat()[:10]
             items[idx] = updated
-            save_json("stockItems.json", items)
+            commit_records("stockItems.json", items, [item_id])
             return updated
     raise HTTPException(status_code=404, detail="Stok kalemi bulunamadı")
 
@@ -201,7 +217,7 @@ def delete_item(item_id: str):
     """Stok kalemini sil"""
     items = load_json("stockItems.json")
     items = [i for i in items if i.get("id") != item_id]
-    save_json("stockItems.json", items)
+    commit_records("stockItems.json", items, [item_id])
     return {"success": True, "id": item_id}
 
 
@@ -290,8 +306,12 @@ def create_movement(payload: MovementIn, authorization: Optional[str] = Header(N
     
     movements.insert(0, movement)
     
-    save_json("stockItems.json", items)
-    save_json("stockMovements.json", movements)
+    # Sürüm kontrollü commit: kalem okunduktan sonra değiştiyse 409, hiçbir şey yazılmaz
+    # (kalem ve hareket birlikte; hareketsiz miktar değişikliği kalmaz)
+    commit_many([
+        ("stockItems.json", items, [payload.itemId]),
+        ("stockMovements.json", movements, [movement["id"]], [movement["id"]]),
+    ])
     
     # Aktivite log
     type_labels = {"stockIn": "Stok Girişi", "stockOut": "Stok Çıkışı", "reserve": "Rezervasyon", "release": "Rezervasyon İptal", "consume": "Tüketim"}
@@ -319,19 +339,19 @@ def bulk_reserve(payload: BulkReservation):
     
     results = []
     errors = []
+    changed_items, new_movements, changed_reservations, new_reservations = [], [], [], []
+    positions = {item.get("id"): idx for idx, item in enumerate(items)}
     
     for line in payload.items:
         item_id = line.get("itemId")
         qty = line.get("qty", 0)
+        if not item_id and line.get("productCode"):
+            # Kalem id yerine ürün kodu + renk kodu ile de verilebilir
+            by_code = find_by_code(line.get("productCode"), line.get("colorCode"))
+            item_id = by_code["id"] if by_code else None
         
-        # Find item
-        target = None
-        target_idx = -1
-        for idx, item in enumerate(items):
-            if item.get("id") == item_id:
-                target = item
-                target_idx = idx
-                break
+        target_idx = positions.get(item_id, -1) if item_id else -1
+        target = items[target_idx] if target_idx >= 0 else None
         
         if not target:
             errors.append({"itemId": item_id, "error": "Stok kalemi bulunamadı"})
@@ -376,6 +396,7 @@ def bulk_reserve(payload: BulkReservation):
                         affected_amount -= reduce_by
                         if rsv["qty"] <= 0:
                             rsv["status"] = "İptal"
+                        changed_reservations.append(rsv.get("id"))
                         affected_reservations.append({
                             "reservationId": rsv.get("id"),
                             "jobId": rsv.get("jobId"),
@@ -403,8 +424,11 @@ def bulk_reserve(payload: BulkReservation):
             reason = f"Rezerve edildi - {payload.jobId}"
             
             # Rezervasyon kaydı
+            reservation_id = f"RSV-{str(uuid.uuid4())[:8].upper()}"
+            changed_reservations.append(reservation_id)
+            new_reservations.append(reservation_id)
             reservations.insert(0, {
-                "id": f"RSV-{str(uuid.uuid4())[:8].upper()}",
+                "id": reservation_id,
                 "jobId": payload.jobId,
                 "itemId": item_id,
                 "productCode": target.get("productCode"),
@@ -418,10 +442,13 @@ def bulk_reserve(payload: BulkReservation):
         
         target["lastUpdated"] = datetime.utcnow().isoformat()[:10]
         items[target_idx] = target
+        changed_items.append(item_id)
         
         # Movement record
+        movement_id = f"MOV-{str(uuid.uuid4())[:8].upper()}"
+        new_movements.append(movement_id)
         movements.insert(0, {
-            "id": f"MOV-{str(uuid.uuid4())[:8].upper()}",
+            "id": movement_id,
             "date": datetime.utcnow().isoformat()[:10],
             "item": target.get("name"),
             "itemId": item_id,
@@ -446,9 +473,13 @@ def bulk_reserve(payload: BulkReservation):
             result_item["affectedReservations"] = affected_reservations
         results.append(result_item)
     
-    save_json("stockItems.json", items)
-    save_json("stockMovements.json", movements)
-    save_json("reservations.json", reservations)
+    if changed_items:
+        # Üç koleksiyon birlikte: herhangi bir çakışmada hiçbiri yazılmaz
+        commit_many([
+            ("stockItems.json", items, changed_items),
+            ("stockMovements.json", movements, new_movements, new_movements),
+            ("reservations.json", reservations, changed_reservations, new_reservations),
+        ])
     
     return {
         "success": len(errors) == 0,
@@ -461,10 +492,10 @@ def bulk_reserve(payload: BulkReservation):
 @router.get("/reservations")
 def list_reservations(jobId: str | None = None, status: str | None = None):
     """Rezervasyonları listele"""
-    reservations = load_json("reservations.json")
-    
     if jobId:
-        reservations = [r for r in reservations if r.get("jobId") == jobId]
+        reservations = record_index.lookup("reservations.json", "jobId", jobId)
+    else:
+        reservations = load_json("reservations.json")
     if status:
         reservations = [r for r in reservations if r.get("status") == status]
     
@@ -490,11 +521,13 @@ def release_reservation(reservation_id: str):
         raise HTTPException(status_code=404, detail="Rezervasyon bulunamadı")
     
     # Find item and release
+    released_item = None
     for idx, item in enumerate(items):
         if item.get("id") == target_res.get("itemId"):
             item["reserved"] = max(0, (item.get("reserved") or 0) - target_res.get("qty", 0))
             item["lastUpdated"] = datetime.utcnow().isoformat()[:10]
             items[idx] = item
+            released_item = item
             
             # Movement record
             movements.insert(0, {
@@ -517,9 +550,13 @@ def release_reservation(reservation_id: str):
     target_res["releasedAt"] = datetime.utcnow().isoformat()
     reservations[target_idx] = target_res
     
-    save_json("stockItems.json", items)
-    save_json("stockMovements.json", movements)
-    save_json("reservations.json", reservations)
+    commits = [("reservations.json", reservations, [reservation_id])]
+    if released_item is not None:
+        commits += [
+            ("stockItems.json", items, [released_item["id"]]),
+            ("stockMovements.json", movements, [movements[0]["id"]], [movements[0]["id"]]),
+        ]
+    commit_many(commits)
     
     return {"success": True, "reservation": target_res}
 
@@ -543,24 +580,20 @@ def get_critical_items():
 @router.get("/availability-check")
 def check_availability(items: str):
     """Birden fazla ürün için stok yeterliliği kontrolü
-    items format: itemId:qty,itemId:qty,...
+    items format: itemId:qty,itemId:qty,... (itemId yerine urunKodu/renkKodu da olur)
     """
-    stock_items = load_json("stockItems.json")
-    
     results = []
     total_shortage = False
     
     for item_str in items.split(","):
         if ":" not in item_str:
             continue
-        item_id, qty_str = item_str.split(":")
+        item_id, qty_str = item_str.rsplit(":", 1)
         qty = float(qty_str)
         
-        target = None
-        for si in stock_items:
-            if si.get("id") == item_id:
-                target = si
-                break
+        target = record_index.first(STOCK_FILE, "id", item_id)
+        if not target and "/" in item_id:
+            target = find_by_code(*item_id.split("/", 1))
         
         if not target:
             results.append({
@@ -578,7 +611,7 @@ def check_availability(items: str):
             total_shortage = True
         
         results.append({
-            "itemId": item_id,
+            "itemId": target.get("id"),
             "name": target.get("name"),
             "productCode": target.get("productCode"),
             "colorCode": target.get("colorCode"),
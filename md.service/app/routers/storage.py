@@ -0,0 +1,31 @@
+"""
+Belge Deposu Yönetimi API (sadece admin)
+md.docs kullanım raporu, sahipsiz/eksik dosyalar ve karantina
+"""
+from fastapi import APIRouter, HTTPException, Header
+from fastapi.concurrency import run_in_threadpool
+from typing import Optional
+
+from .. import storage_audit
+from .auth import is_admin
+
+router = APIRouter(prefix="/admin/storage", tags=["admin"])
+
+
+def _require_admin(authorization: Optional[str]):
+    if not is_admin(authorization):
+        raise HTTPException(status_code=403, detail="Bu işlem için admin yetkisi gerekli")
+
+
+@router.get("")
+async def get_storage_report(full: bool = False, authorization: Optional[str] = Header(None)):
+    """Kullanım özeti (iş/müşteri/belge tipi), sahipsiz dosyalar ve dosyası olmayan kayıtlar"""
+    _require_admin(authorization)
+    return await run_in_threadpool(storage_audit.report, full)
+
+
+@router.post("/gc")
+async def collect_orphans(full: bool = False, authorization: Optional[str] = Header(None)):
+    """Sahipsiz dosyaları .quarantine altına taşı (silinmez; elle geri alınabilir)"""
+    _require_admin(authorization)
+    return await run_in_threadpool(storage_audit.run, full, True)
@@ -6,6 +6,7 @@ from typing import Optional
 
 from ..data_loader import load_json, save_json
 from ..activity_logger import log_activity, get_action_icon
+from .. import record_index
 
 router = APIRouter(prefix="/suppliers", tags=["suppliers"])
 
@@ -340,8 +341,7 @@ def get_supplier_balance(supplier_id: str):
 @router.get("/{supplier_id}/products")
 def get_supplier_products(supplier_id: str):
     """Bu tedarikçiden alınan ürünleri listele"""
-    stock_items = load_json("stockItems.json")
-    return [item for item in stock_items if item.get("supplierId") == supplier_id]
+    return record_index.lookup("stockItems.json", "supplierId", supplier_id)
 
 
 @router.get("/{supplier_id}/orders")
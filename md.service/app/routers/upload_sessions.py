@@ -0,0 +1,233 @@
+"""
+Devam Ettirilebilir Belge Yükleme API
+Zayıf mobil bağlantılarda büyük ölçü fotoğrafı/sözleşme yüklemeleri için:
+1. POST /documents/uploads                  -> oturum (uploadId, chunkSize)
+2. PUT  /documents/uploads/{id}/chunks/{n}  -> n. parça (gövde: ham bayt, n=0'dan başlar)
+3. GET  /documents/uploads/{id}             -> alınan parçalar ve kesintisiz offset
+4. POST /documents/uploads/{id}/complete    -> /documents/upload ile aynı belge kaydı
+Bağlantı koparsa istemci 3. adımla kaldığı yeri öğrenir, sadece eksik parçaları
+gönderir. UPLOAD_SESSION_TTL_HOURS boyunca hareketsiz oturumlar silinir.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Request
+from pydantic import BaseModel, Field
+
+from . import documents
+from .. import blob_store
+
+router = APIRouter(prefix="/documents/uploads", tags=["documents"])
+
+SESSIONS_DIR = documents.DOCS_ROOT / ".uploads"
+CHUNK_SIZE = 4 * 1024 * 1024  # 4MB
+_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+# Aynı oturumun iki kez tamamlanmasını engeller
+_completing: set = set()
+_completing_lock = threading.Lock()
+
+
+def session_ttl_hours() -> float:
+    return float(os.getenv("UPLOAD_SESSION_TTL_HOURS", "24"))
+
+
+class UploadSessionIn(BaseModel):
+    fileName: str = Field(..., min_length=1)
+    size: int = Field(..., gt=0)
+    mimeType: str = ""
+    docType: str
+    jobId: str | None = None
+    folderId: str | None = None
+    supplierId: str | None = None
+    description: str | None = None
+    sha256: str | None = None  # Verilirse tamamlama sırasında doğrulanır
+
+
+def _session_dir(upload_id: str) -> Path:
+    if not _ID_RE.match(upload_id):
+        raise HTTPException(status_code=404, detail="Yükleme oturumu bulunamadı")
+    return SESSIONS_DIR / upload_id
+
+
+def _load_session(upload_id: str) -> tuple:
+    session_dir = _session_dir(upload_id)
+    try:
+        session = json.loads((session_dir / "session.json").read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Yükleme oturumu bulunamadı")
+    return session, session_dir
+
+
+def _chunk_count(session: dict) -> int:
+    return -(-session["size"] // session["chunkSize"])
+
+
+def _chunk_path(session_dir: Path, index: int) -> Path:
+    return session_dir / f"chunk-{index:06d}"
+
+
+def _received(session_dir: Path) -> list:
+    return sorted(int(p.name[6:]) for p in session_dir.glob("chunk-*"))
+
+
+def _status(session: dict, session_dir: Path) -> dict:
+    received = _received(session_dir)
+    # Baştan itibaren kesintisiz alınan bayt sayısı (istemci buradan devam eder)
+    contiguous = 0
+    while contiguous in received:
+        contiguous += 1
+    return {
+        "uploadId": session["id"],
+        "fileName": session["fileName"],
+        "size": session["size"],
+        "chunkSize": session["chunkSize"],
+        "totalChunks": _chunk_count(session),
+        "receivedChunks": received,
+        "offset": min(contiguous * session["chunkSize"], session["size"]),
+        "complete": len(received) == _chunk_count(session),
+        "createdAt": session["createdAt"],
+    }
+
+
+def gc_sessions(now: Optional[float] = None) -> int:
+    """Son hareketi TTL'den eski oturumları sil; silinen oturum sayısını döndür"""
+    if not SESSIONS_DIR.exists():
+        return 0
+    cutoff = (now or time.time()) - session_ttl_hours() * 3600
+    removed = 0
+    for session_dir in SESSIONS_DIR.iterdir():
+        if not session_dir.is_dir() or session_dir.name in _completing:
+            continue
+        try:
+            last = max((p.stat().st_mtime for p in session_dir.iterdir()), default=session_dir.stat().st_mtime)
+        except FileNotFoundError:
+            continue
+        if last < cutoff:
+            shutil.rmtree(session_dir, ignore_errors=True)
+            removed += 1
+    return removed
+
+
+@router.post("", status_code=201)
+def create_upload_session(payload: UploadSessionIn):
+    """Yükleme oturumu aç; belge parametreleri /documents/upload ile aynı kurallarla doğrulanır"""
+    gc_sessions()
+    ext = documents._validate_upload(payload.docType, payload.jobId, payload.folderId,
+                                     payload.supplierId, payload.fileName, payload.mimeType)
+    if payload.size > documents.MAX_FILE_SIZE:
+        raise documents._too_large(payload.size)
+
+    upload_id = uuid.uuid4().hex
+    session = {
+        "id": upload_id,
+        **payload.model_dump(),
+        "ext": ext,
+        "chunkSize": CHUNK_SIZE,
+        "createdAt": datetime.utcnow().isoformat() + "Z",
+    }
+    session_dir = _session_dir(upload_id)
+    session_dir.mkdir(parents=True)
+    (session_dir / "session.json").write_text(json.dumps(session, ensure_ascii=False), encoding="utf-8")
+    return _status(session, session_dir)
+
+
+@router.get("/{upload_id}")
+def get_upload_session(upload_id: str):
+    """Alınan parçalar ve devam edilecek offset"""
+    session, session_dir = _load_session(upload_id)
+    return _status(session, session_dir)
+
+
+@router.put("/{upload_id}/chunks/{index}")
+async def put_chunk(upload_id: str, index: int, request: Request):
+    """
+    Tek parça yükle. Son parça hariç her parça tam chunkSize bayttır. Aynı
+    parçanın tekrar gönderilmesi güvenlidir (üzerine yazılır).
+    """
+    session, session_dir = _load_session(upload_id)
+    total = _chunk_count(session)
+    if index < 0 or index >= total:
+        raise HTTPException(status_code=400, detail=f"Geçersiz parça numarası: {index} (0-{total - 1})")
+    expected = min(session["chunkSize"], session["size"] - index * session["chunkSize"])
+
+    target = _chunk_path(session_dir, index)
+    temp_path = session_dir / f".{target.name}.{uuid.uuid4().hex[:8]}.part"
+    size = 0
+    pending = bytearray()
+    try:
+        with open(temp_path, "wb") as out:
+            # Disk yazımı olay döngüsünü bloklamasın: UPLOAD_CHUNK_SIZE'lık bloklar thread'de yazılır
+            async for data in request.stream():
+                size += len(data)
+                if size > expected:
+                    break
+                pending += data
+                if len(pending) >= documents.UPLOAD_CHUNK_SIZE:
+                    await asyncio.to_thread(out.write, bytes(pending))
+                    pending.clear()
+            if pending and size <= expected:
+                await asyncio.to_thread(out.write, bytes(pending))
+        if size != expected:
+            raise HTTPException(status_code=400, detail=f"Parça boyutu {expected} bayt olmalı, gelen: {size}")
+        os.replace(temp_path, target)
+    finally:
+        temp_path.unlink(missing_ok=True)
+    return _status(session, session_dir)
+
+
+@router.post("/{upload_id}/complete")
+def complete_upload(upload_id: str, authorization: Optional[str] = Header(None)):
+    """Parçaları birleştir, belgeyi kaydet ve oturumu kapat (senkron: threadpool'da çalışır)"""
+    session, session_dir = _load_session(upload_id)
+    with _completing_lock:
+        if upload_id in _completing:
+            raise HTTPException(status_code=409, detail="Yükleme zaten tamamlanıyor")
+        _completing.add(upload_id)
+    try:
+        missing = sorted(set(range(_chunk_count(session))) - set(_received(session_dir)))
+        if missing:
+            raise HTTPException(status_code=409, detail={"message": "Eksik parçalar var", "missingChunks": missing})
+
+        doc_id, safe_name = documents._new_document_name(session["ext"])
+        temp_path = blob_store.new_temp_path()
+        digest = hashlib.sha256()
+        try:
+            with open(temp_path, "wb") as out:
+                for index in range(_chunk_count(session)):
+                    with open(_chunk_path(session_dir, index), "rb") as chunk:
+                        for block in iter(lambda: chunk.read(documents.UPLOAD_CHUNK_SIZE), b""):
+                            digest.update(block)
+                            out.write(block)
+            checksum = digest.hexdigest()
+            if session.get("sha256") and session["sha256"].lower() != checksum:
+                raise HTTPException(status_code=400, detail="Dosya sağlama toplamı (sha256) uyuşmuyor")
+            doc_meta = documents._store_document(
+                temp_path, checksum, doc_id, safe_name, session["fileName"], session["mimeType"], session["size"],
+                session["jobId"], session["folderId"], session["supplierId"], session["docType"],
+                session["description"], authorization,
+            )
+        finally:
+            temp_path.unlink(missing_ok=True)
+        shutil.rmtree(session_dir, ignore_errors=True)
+        return doc_meta
+    finally:
+        with _completing_lock:
+            _completing.discard(upload_id)
+
+
+@router.delete("/{upload_id}")
+def abort_upload(upload_id: str):
+    """Oturumu iptal et ve alınan parçaları sil"""
+    _, session_dir = _load_session(upload_id)
+    shutil.rmtree(session_dir, ignore_errors=True)
+    return {"success": True, "uploadId": upload_id}
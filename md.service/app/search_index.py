@@ -0,0 +1,241 @@
+"""
+Genel Arama İndeksi - işler, müşteriler, dokümanlar ve stok için ters indeks
+Metinler Türkçe kurallarıyla katlanır (İ/I/ı -> i, ş -> s, ğ -> g ...), böylece
+"ISIK", "ışık" ve "Işık" aynı terimi verir. Terimler sıralı bir listede tutulur;
+önek araması bisect ile yapılır, tarama yoktur. save_json dinleyicisi sadece
+aranan alanları değişen kayıtları yeniden indeksler. Soğuk depoya taşınan işler
+ayrı bir kaynak olarak (segment indeksi değişince) indekslenir ve "jobs"
+koleksiyonunda aranır.
+"""
+import bisect
+import re
+import threading
+import unicodedata
+from typing import Optional
+
+from . import cold_store
+from .data_loader import add_save_listener, file_signature, load_json
+
+# dosya -> (koleksiyon adı, [(alan, ağırlık), ...], başlık alanı, alt başlık alanı)
+SOURCES = {
+    "jobs.json": ("jobs", [("title", 3), ("customerName", 2), ("id", 1)], "title", "customerName"),
+    "customers.json": ("customers", [("name", 3), ("phone", 2), ("phone2", 2), ("accountCode", 1)], "name", "phone"),
+    "documents.json": ("documents", [("originalName", 3), ("description", 1)], "originalName", "description"),
+    "stockItems.json": ("stock", [("productCode", 3), ("name", 3), ("colorName", 1)], "name", "productCode"),
+}
+# Soğuk işler: kayıtlar cold_store'dan okunur, tazelik segment indeksinin imzasıyla izlenir
+COLD_SOURCE = cold_store.INDEX_FILE
+SOURCES[COLD_SOURCE] = SOURCES["jobs.json"]
+# Alan eşleşmesi tam terim ise önek eşleşmesine göre katsayı
+EXACT_BONUS = 2
+
+_FOLD = str.maketrans({
+    "İ": "i", "I": "i", "ı": "i",
+    "Ş": "s", "ş": "s", "Ğ": "g", "ğ": "g",
+    "Ç": "c", "ç": "c", "Ö": "o", "ö": "o", "Ü": "u", "ü": "u",
+})
+_TOKEN_RE = re.compile(r"\w+")
+_DIGITS_RE = re.compile(r"\D+")
+
+_lock = threading.Lock()
+# terim -> {(kaynak dosya, id), ...}
+_postings: dict = {}
+# sıralı terim listesi (önek araması için)
+_terms: list = []
+# (kaynak dosya, id) -> {"collection", "terms": {terim: ağırlık}, "title", "subtitle", "fingerprint"}
+_docs: dict = {}
+_signatures: dict = {}
+
+
+def fold(text) -> str:
+    """Türkçe büyük/küçük harf ve aksan duyarsız biçim"""
+    text = str(text or "").translate(_FOLD).lower()
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize(text) -> list:
+    return _TOKEN_RE.findall(fold(text))
+
+
+def _record_terms(record: dict, fields: list) -> dict:
+    terms = {}
+    for field, weight in fields:
+        value = record.get(field)
+        if not value:
+            continue
+        tokens = tokenize(value)
+        if field.startswith("phone"):
+            # "0532 123 45 67" -> "05321234567" ile de bulunabilsin
+            digits = _DIGITS_RE.sub("", str(value))
+            if digits:
+                tokens.append(digits)
+        for token in tokens:
+            terms[token] = max(terms.get(token, 0), weight)
+    return terms
+
+
+def _indexable(filename: str, record: dict) -> bool:
+    return bool(record.get("id")) and not (filename == "customers.json" and record.get("deleted"))
+
+
+def _remove(key: tuple, bulk: bool = False) -> None:
+    doc = _docs.pop(key, None)
+    if doc is None:
+        return
+    for term in doc["terms"]:
+        keys = _postings.get(term)
+        if keys is None:
+            continue
+        keys.discard(key)
+        if not keys:
+            del _postings[term]
+            if bulk:
+                continue
+            pos = bisect.bisect_left(_terms, term)
+            if pos < len(_terms) and _terms[pos] == term:
+                _terms.pop(pos)
+
+
+def _index(filename: str, record: dict, bulk: bool = False) -> None:
+    """Kaydı indeksle; bulk ise sıralı terim listesi güncellenmez (_sync sonunda bir kez sıralanır)"""
+    collection, fields, title_field, subtitle_field = SOURCES[filename]
+    key = (filename, record["id"])
+    fingerprint = tuple(record.get(field) for field, _ in fields)
+    existing = _docs.get(key)
+    if existing is not None and existing["fingerprint"] == fingerprint:
+        return
+    _remove(key, bulk)
+    terms = _record_terms(record, fields)
+    _docs[key] = {
+        "collection": collection,
+        "terms": terms,
+        "title": record.get(title_field) or "",
+        "subtitle": record.get(subtitle_field) or "",
+        "fingerprint": fingerprint,
+    }
+    for term in terms:
+        keys = _postings.get(term)
+        if keys is None:
+            _postings[term] = keys = set()
+            if not bulk:
+                bisect.insort(_terms, term)
+        keys.add(key)
+
+
+def _sync(filename: str, records: list, changed_ids: Optional[list] = None) -> None:
+    """Bellekteki kayıtlarla indeksi eşitle; changed_ids yoksa tüm kayıtlar karşılaştırılır"""
+    if changed_ids is None:
+        wanted = {r.get("id") for r in records if _indexable(filename, r)}
+        stale = [key for key in _docs if key[0] == filename and key[1] not in wanted]
+        candidates = records
+    else:
+        changed = set(changed_ids)
+        stale = [(filename, record_id) for record_id in changed]
+        candidates = [r for r in records if r.get("id") in changed]
+    # Tam eşitlemede terimler tek tek insort edilmez (O(n²)); sonda bir kez sıralanır
+    bulk = changed_ids is None
+    for key in stale:
+        _remove(key, bulk)
+    for record in candidates:
+        if _indexable(filename, record):
+            _index(filename, record, bulk)
+    if bulk:
+        _terms[:] = sorted(_postings)
+
+
+def _load(filename: str) -> list:
+    if filename == COLD_SOURCE:
+        return cold_store.jobs()
+    try:
+        return load_json(filename)
+    except FileNotFoundError:
+        return []
+
+
+def _rebuild(filename: str) -> None:
+    records = _load(filename)
+    with _lock:
+        _sync(filename, records)
+        _signatures[filename] = file_signature(filename)
+
+
+def rebuild() -> None:
+    """Tüm kaynakları depodan yeniden kur"""
+    for filename in SOURCES:
+        _rebuild(filename)
+
+
+def _on_save(filename: str, data, changed_ids: Optional[list]) -> None:
+    if filename not in SOURCES:
+        return
+    with _lock:
+        if filename not in _signatures:
+            changed_ids = None
+        _sync(filename, data, changed_ids)
+        _signatures[filename] = file_signature(filename)
+
+
+def _ensure_fresh(filenames) -> None:
+    for filename in filenames:
+        if filename not in _signatures or file_signature(filename) != _signatures[filename]:
+            _rebuild(filename)
+
+
+def _expand(prefix: str) -> list:
+    """Öneki taşıyan tüm terimler (sıralı listede bisect aralığı)"""
+    start = bisect.bisect_left(_terms, prefix)
+    end = bisect.bisect_left(_terms, prefix + "\uffff")
+    return _terms[start:end]
+
+
+def search(query: str, collections: Optional[set] = None, limit: int = 20) -> tuple:
+    """
+    Her sorgu terimi bir önek olarak eşleşmeli (VE). Skor: eşleşen alanın
+    ağırlığı, terim tam eşleşiyorsa EXACT_BONUS katı. (sonuçlar, toplam) döner.
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return [], 0
+    filenames = [f for f, source in SOURCES.items() if not collections or source[0] in collections]
+    _ensure_fresh(filenames)
+    wanted = set(filenames)
+
+    with _lock:
+        matches = None
+        for token in dict.fromkeys(tokens):
+            keys = set()
+            for term in _expand(token):
+                keys.update(k for k in _postings[term] if k[0] in wanted)
+            matches = keys if matches is None else matches & keys
+            if not matches:
+                return [], 0
+        # Taşıma yarıda kaldıysa iş iki kaynakta olabilir; sıcak kayıt geçerli
+        matches = {k for k in matches if k[0] != COLD_SOURCE or ("jobs.json", k[1]) not in _docs}
+
+        scored = []
+        for key in matches:
+            doc = _docs[key]
+            score = 0
+            for token in tokens:
+                score += max(
+                    weight * (EXACT_BONUS if term == token else 1)
+                    for term, weight in doc["terms"].items() if term.startswith(token)
+                )
+            scored.append((-score, len(doc["title"]), key, doc))
+
+    scored.sort(key=lambda s: s[:3])
+    items = [
+        {
+            "collection": doc["collection"],
+            "id": key[1],
+            "title": doc["title"],
+            "subtitle": doc["subtitle"],
+            "score": -neg_score,
+        }
+        for neg_score, _, key, doc in scored[:limit]
+    ]
+    return items, len(scored)
+
+
+add_save_listener(_on_save)
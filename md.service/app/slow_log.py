@@ -0,0 +1,141 @@
+"""
+Yavaş İstek Logu - SLOW_REQUEST_MS eşiğini aşan istekler için JSONL kayıt
+Her kayıt route, parametreler, kullanıcı, toplam süre, koleksiyon bazlı
+load_json/save_json süreleri (byte boyutu ile) ve log_activity süresini içerir.
+"""
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from . import metrics
+
+# Varsayılan log dosyası: md.service ile aynı seviyede md.logs/slow_requests.jsonl
+DEFAULT_LOG_PATH = Path(__file__).resolve().parent.parent.parent / "md.logs" / "slow_requests.jsonl"
+
+_current: contextvars.ContextVar = contextvars.ContextVar("md_request_trace", default=None)
+_write_lock = threading.Lock()
+
+
+def _threshold_ms() -> float:
+    try:
+        return float(os.getenv("SLOW_REQUEST_MS", "500"))
+    except ValueError:
+        return 500.0
+
+
+def _max_bytes() -> int:
+    try:
+        return int(os.getenv("SLOW_LOG_MAX_BYTES", str(20 * 1024 * 1024)))
+    except ValueError:
+        return 20 * 1024 * 1024
+
+
+def get_log_path() -> Path:
+    env_path = os.getenv("SLOW_LOG_PATH")
+    return Path(env_path).resolve() if env_path else DEFAULT_LOG_PATH
+
+
+class RequestTrace:
+    """Bir isteğin I/O ve aktivite log sürelerini biriktirir"""
+
+    def __init__(self):
+        self.io: list = []
+        self.io_seconds = 0.0
+        self.activity_seconds = 0.0
+        self.in_activity = False
+
+
+def record_io(filename: str, op: str, nbytes: int, seconds: float) -> None:
+    """data_loader tarafından çağrılır; aktif istek yoksa hiçbir şey yapmaz"""
+    trace = _current.get()
+    if trace is None:
+        return
+    entry = {
+        "collection": metrics.collection_name(filename),
+        "op": op,
+        "bytes": nbytes,
+        "ms": round(seconds * 1000, 3),
+    }
+    if trace.in_activity:
+        # log_activity içindeki I/O aktivite süresine dahil
+        entry["activityLog"] = True
+    else:
+        trace.io_seconds += seconds
+    trace.io.append(entry)
+
+
+@contextmanager
+def activity_timer():
+    """log_activity süresini aktif isteğin trace'ine ekler"""
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    trace.in_activity = True
+    try:
+        yield
+    finally:
+        trace.in_activity = False
+        trace.activity_seconds += time.perf_counter() - start
+
+
+def _user_id(request) -> Optional[str]:
+    authorization = request.headers.get("authorization")
+    if authorization:
+        from .routers.auth import active_sessions
+        token = authorization[7:] if authorization.startswith("Bearer ") else authorization
+        session = active_sessions.get(token)
+        if session:
+            return session.get("user", {}).get("id")
+    return request.headers.get("x-user-id")
+
+
+def _write(entry: dict) -> None:
+    path = get_log_path()
+    line = json.dumps(entry, ensure_ascii=False) + "\n"
+    with _write_lock:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Tek yedekli basit rotasyon
+        if path.exists() and path.stat().st_size + len(line) > _max_bytes():
+            path.replace(path.with_name(path.name + ".1"))
+        with path.open("a", encoding="utf-8") as f:
+            f.write(line)
+
+
+async def slow_log_middleware(request, call_next):
+    trace = RequestTrace()
+    token = _current.set(trace)
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        _current.reset(token)
+    total = time.perf_counter() - start
+    if total * 1000 < _threshold_ms():
+        return response
+
+    route = request.scope.get("route")
+    params = dict(request.query_params)
+    params.update(request.scope.get("path_params") or {})
+    _write({
+        "at": datetime.now().isoformat(),
+        "method": request.method,
+        "route": getattr(route, "path", None),
+        "path": request.url.path,
+        "params": params,
+        "userId": _user_id(request),
+        "status": response.status_code,
+        "totalMs": round(total * 1000, 3),
+        "ioMs": round(trace.io_seconds * 1000, 3),
+        "activityLogMs": round(trace.activity_seconds * 1000, 3),
+        "computeMs": round(max(0.0, total - trace.io_seconds - trace.activity_seconds) * 1000, 3),
+        "io": trace.io,
+    })
+    return response
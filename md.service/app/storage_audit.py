@@ -0,0 +1,250 @@
+"""
+Belge Deposu Denetimi - md.docs kullanım özeti ve sahipsiz dosya temizliği
+md.docs paralel taranır ve documents.json ile karşılaştırılır:
+- sahipsiz dosyalar (hiçbir kayda ait olmayan blob/eski dosya, artık blob'u
+  olmayan önizlemeler, yarım kalmış geçici dosyalar),
+- dosyası diskte olmayan kayıtlar,
+- iş, müşteri ve belge tipi bazında kullanım; tekilleştirme kazancı.
+
+Tarama artımlıdır: her klasörün mtime'ı ve içeriği .audit/scan_state.json'da
+tutulur, mtime'ı değişmeyen klasör yeniden listelenmez (blob'lar değişmez,
+klasör mtime'ı sadece dosya eklenip silinince değişir). Sahipsiz dosyalar
+istenirse .quarantine/<zaman>/ altına taşınır (silinmez).
+
+Gece çalıştırmak için:
+    python -m app.storage_audit [--full] [--quarantine]
+"""
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Optional
+
+from . import blob_store, cold_store, thumbnails
+from .data_loader import load_json
+
+STATE_DIR = ".audit"
+STATE_FILE = f"{STATE_DIR}/scan_state.json"
+QUARANTINE_DIR = ".quarantine"
+# Kökte taranmayan klasörler (yükleme oturumları kendi TTL'i ile temizlenir)
+SKIP_DIRS = {STATE_DIR, QUARANTINE_DIR, ".uploads"}
+
+
+def worker_count() -> int:
+    return max(1, int(os.getenv("STORAGE_SCAN_WORKERS", "4")))
+
+
+def orphan_grace_seconds() -> float:
+    """Bu süreden yeni dosyalar sahipsiz sayılmaz (devam eden yüklemeler)"""
+    return float(os.getenv("ORPHAN_GRACE_HOURS", "24")) * 3600
+
+
+def _join(rel: str, name: str) -> str:
+    return f"{rel}/{name}" if rel else name
+
+
+def _load_state() -> dict:
+    try:
+        return json.loads((blob_store.DOCS_ROOT / STATE_FILE).read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _save_state(state: dict) -> None:
+    path = blob_store.DOCS_ROOT / STATE_FILE
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_suffix(".tmp")
+    temp_path.write_text(json.dumps(state, ensure_ascii=False), encoding="utf-8")
+    temp_path.replace(path)
+
+
+def _scan_dir(rel: str, cached: dict) -> tuple:
+    """(göreli klasör, {mtime, files, subdirs}, önbellekten mi); klasör yoksa giriş None"""
+    path = blob_store.DOCS_ROOT / rel
+    try:
+        mtime = path.stat().st_mtime_ns
+        entry = cached.get(rel)
+        if entry and entry.get("mtime") == mtime:
+            return rel, entry, True
+        files, subdirs = {}, []
+        with os.scandir(path) as entries:
+            for item in entries:
+                if item.is_dir(follow_symlinks=False):
+                    if not (rel == "" and item.name in SKIP_DIRS):
+                        subdirs.append(item.name)
+                elif item.is_file(follow_symlinks=False):
+                    stat_result = item.stat(follow_symlinks=False)
+                    files[item.name] = [stat_result.st_size, stat_result.st_mtime]
+    except FileNotFoundError:
+        return rel, None, False
+    return rel, {"mtime": mtime, "files": files, "subdirs": subdirs}, False
+
+
+def scan(full: bool = False) -> tuple:
+    """
+    md.docs'u paralel tara. ({göreli yol: (boyut, mtime)}, istatistik) döndürür.
+    full=True önbelleği yok sayar.
+    """
+    cached = {} if full else _load_state().get("dirs", {})
+    dirs = {}
+    reused = 0
+    with ThreadPoolExecutor(max_workers=worker_count(), thread_name_prefix="storage-scan") as pool:
+        pending = {pool.submit(_scan_dir, "", cached)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                rel, entry, from_cache = future.result()
+                if entry is None:
+                    continue
+                dirs[rel] = entry
+                reused += from_cache
+                for name in entry["subdirs"]:
+                    pending.add(pool.submit(_scan_dir, _join(rel, name), cached))
+    _save_state({"scannedAt": datetime.utcnow().isoformat() + "Z", "dirs": dirs})
+
+    files = {
+        _join(rel, name): (size, mtime)
+        for rel, entry in dirs.items()
+        for name, (size, mtime) in entry["files"].items()
+    }
+    return files, {"directories": len(dirs), "directoriesReused": reused}
+
+
+def _referenced(docs: list) -> tuple:
+    """(kayıtların işaret ettiği dosyalar, önizleme önbellek anahtarları)"""
+    paths = set()
+    keys = set()
+    for doc in docs:
+        for field in ("path", "originalPath"):
+            if doc.get(field):
+                paths.add(doc[field])
+        if doc.get("id"):
+            keys.add(doc.get("sha256") or doc["id"])
+    return paths, keys
+
+
+def _is_referenced(relpath: str, paths: set, keys: set) -> bool:
+    if relpath in paths:
+        return True
+    if relpath.startswith(f"{thumbnails.DERIVATIVES}/"):
+        # derivatives/<k[:2]>/<anahtar>-<px>.jpg
+        return os.path.basename(relpath).rsplit("-", 1)[0] in keys
+    return False
+
+
+def _kind(relpath: str) -> str:
+    if relpath.startswith(f"{blob_store.BLOBS}/.tmp/") or relpath.endswith(".part"):
+        return "temp"
+    if relpath.startswith(f"{thumbnails.DERIVATIVES}/"):
+        return "derivative"
+    if blob_store.is_blob(relpath):
+        return "blob"
+    return "legacy"
+
+
+def _add_usage(bucket: dict, key, size: int, **extra) -> None:
+    entry = bucket.setdefault(key or "-", {"count": 0, "bytes": 0, **extra})
+    entry["count"] += 1
+    entry["bytes"] += size
+
+
+def _usage(docs: list, files: dict, paths: set) -> dict:
+    customers = {job.get("id"): job for job in cold_store.all_jobs()}
+    by_type, by_job, by_customer = {}, {}, {}
+    logical = 0
+    for doc in docs:
+        size = files[doc["path"]][0] if doc.get("path") in files else doc.get("size") or 0
+        logical += size
+        _add_usage(by_type, doc.get("type"), size)
+        if doc.get("jobId"):
+            job = customers.get(doc["jobId"]) or {}
+            _add_usage(by_job, doc["jobId"], size)
+            _add_usage(by_customer, job.get("customerId"), size, name=job.get("customerName"))
+    physical = sum(files[path][0] for path in paths if path in files)
+    return {
+        "logicalBytes": logical,
+        "physicalBytes": physical,
+        "dedupSavedBytes": logical - physical,
+        "byDocType": by_type,
+        "byJob": by_job,
+        "byCustomer": by_customer,
+    }
+
+
+def report(full: bool = False, now: Optional[float] = None) -> dict:
+    """Tara ve documents.json ile karşılaştır; dosyalara dokunmaz"""
+    start = time.perf_counter()
+    files, stats = scan(full)
+    docs = load_json(blob_store.DOCUMENTS_FILE)
+    paths, keys = _referenced(docs)
+    cutoff = (now or time.time()) - orphan_grace_seconds()
+
+    orphans = []
+    recent = 0
+    for relpath, (size, mtime) in sorted(files.items()):
+        if _is_referenced(relpath, paths, keys):
+            continue
+        if mtime > cutoff:
+            recent += 1
+            continue
+        orphans.append({"path": relpath, "size": size, "kind": _kind(relpath),
+                        "modifiedAt": datetime.utcfromtimestamp(mtime).isoformat() + "Z"})
+
+    missing = [{"id": doc.get("id"), "path": doc.get("path")} for doc in docs
+               if doc.get("path") and doc["path"] not in files]
+    return {
+        "scannedAt": datetime.utcnow().isoformat() + "Z",
+        **stats,
+        "files": len(files),
+        "bytesOnDisk": sum(size for size, _ in files.values()),
+        "documents": len(docs),
+        "orphans": orphans,
+        "orphanBytes": sum(o["size"] for o in orphans),
+        "recentUnreferenced": recent,
+        "missing": missing,
+        "usage": _usage(docs, files, paths),
+        "durationMs": round((time.perf_counter() - start) * 1000, 1),
+    }
+
+
+def quarantine(orphans: list) -> list:
+    """
+    Sahipsiz dosyaları .quarantine/<zaman>/ altına taşı. documents.json kilidi
+    altında referanslar yeniden kontrol edilir (tarama sırasında eklenen
+    kayıtların dosyası taşınmaz). Taşınan göreli yolları döndürür.
+    """
+    target_root = blob_store.DOCS_ROOT / QUARANTINE_DIR / datetime.now().strftime("%Y%m%d%H%M%S")
+    moved = []
+    with blob_store.locked():
+        paths, keys = _referenced(load_json(blob_store.DOCUMENTS_FILE))
+        for orphan in orphans:
+            relpath = orphan["path"]
+            source = blob_store.DOCS_ROOT / relpath
+            if _is_referenced(relpath, paths, keys) or not source.is_file():
+                continue
+            target = target_root / relpath
+            target.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                os.replace(source, target)
+            except OSError:
+                continue
+            moved.append(relpath)
+    return moved
+
+
+def run(full: bool = False, quarantine_orphans: bool = False) -> dict:
+    result = report(full)
+    if quarantine_orphans:
+        result["quarantined"] = quarantine(result["orphans"])
+    return result
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="md.docs kullanım raporu ve sahipsiz dosya denetimi")
+    parser.add_argument("--full", action="store_true", help="Artımlı önbelleği yok say, her klasörü listele")
+    parser.add_argument("--quarantine", action="store_true", help="Sahipsiz dosyaları .quarantine altına taşı")
+    args = parser.parse_args()
+    print(json.dumps(run(full=args.full, quarantine_orphans=args.quarantine), ensure_ascii=False, indent=2))
@@ -0,0 +1,159 @@
+"""
+Belge Önizlemeleri - görseller için küçük boyutlu kopyalar, PDF'ler için ilk sayfa
+Ölçü/sözleşme/montaj fotoğraf listeleri orijinal dosya yerine bunları yükler.
+Türevler içerik hash'i ile md.docs/derivatives/<sha[:2]>/<sha>-<px>.jpg altında
+önbelleğe alınır (aynı blob'u paylaşan belgeler aynı önizlemeyi kullanır).
+Yüklemede arka plandaki iş havuzunda üretilir; henüz yoksa ilk istekte üretilir.
+
+Görseller için Pillow, PDF için pdftoppm (poppler) gerekir; ikisi de opsiyoneldir,
+yoksa ilgili tip için önizleme üretilmez.
+"""
+import os
+import shutil
+import subprocess
+import threading
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from . import blob_store
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow opsiyonel
+    Image = None
+    ImageOps = None
+
+DERIVATIVES = "derivatives"
+SIZES = {"sm": 160, "md": 480, "lg": 1024}
+DEFAULT_SIZE = "sm"
+IMAGE_TYPES = {"image/jpeg", "image/png", "image/gif", "image/webp", "image/bmp", "image/tiff"}
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp", ".bmp", ".tiff"}
+JPEG_QUALITY = 80
+PDF_TIMEOUT_SECONDS = 30
+
+_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+# (önbellek anahtarı, px) -> üretimdeki Future; aynı türev iki kez üretilmez
+_pending: dict = {}
+
+
+def worker_count() -> int:
+    return max(1, int(os.getenv("THUMBNAIL_WORKERS", "2")))
+
+
+def _pdf_renderer() -> Optional[str]:
+    return shutil.which("pdftoppm")
+
+
+def _kind(doc: dict) -> Optional[str]:
+    """'image', 'pdf' veya None (önizlenemez / yerelde işleyici yok)"""
+    mime = doc.get("mimeType") or ""
+    ext = os.path.splitext(doc.get("filename") or doc.get("originalName") or "")[1].lower()
+    if mime in IMAGE_TYPES or ext in IMAGE_EXTENSIONS:
+        return "image" if Image is not None else None
+    if mime == "application/pdf" or ext == ".pdf":
+        return "pdf" if _pdf_renderer() else None
+    return None
+
+
+def supported(doc: dict) -> bool:
+    return _kind(doc) is not None
+
+
+def _cache_key(doc: dict) -> str:
+    return doc.get("sha256") or doc["id"]
+
+
+def derivative_path(doc: dict, px: int) -> Path:
+    key = _cache_key(doc)
+    return blob_store.DOCS_ROOT / DERIVATIVES / key[:2] / f"{key}-{px}.jpg"
+
+
+def _render_image(source: Path, target: Path, px: int) -> None:
+    with Image.open(source) as img:
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail((px, px))
+        if img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        img.save(target, "JPEG", quality=JPEG_QUALITY, optimize=True)
+
+
+def _render_pdf(source: Path, target: Path, px: int) -> None:
+    # pdftoppm çıktı adına uzantıyı kendisi ekler
+    stem = target.with_suffix("")
+    subprocess.run(
+        [_pdf_renderer(), "-jpeg", "-f", "1", "-l", "1", "-singlefile", "-scale-to", str(px), str(source), str(stem)],
+        check=True, capture_output=True, timeout=PDF_TIMEOUT_SECONDS,
+    )
+
+
+def _generate(doc: dict, px: int) -> Path:
+    target = derivative_path(doc, px)
+    if target.exists():
+        return target
+    source = blob_store.DOCS_ROOT / doc["path"]
+    target.parent.mkdir(parents=True, exist_ok=True)
+    temp = target.with_name(f".{uuid.uuid4().hex[:8]}-{target.name}")
+    try:
+        if _kind(doc) == "image":
+            _render_image(source, temp, px)
+        else:
+            _render_pdf(source, temp, px)
+        os.replace(temp, target)
+    finally:
+        temp.unlink(missing_ok=True)
+    return target
+
+
+def _submit(doc: dict, px: int) -> Future:
+    global _executor
+    key = (_cache_key(doc), px)
+    with _lock:
+        future = _pending.get(key)
+        if future is not None:
+            return future
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=worker_count(), thread_name_prefix="thumbnail")
+        future = _pending[key] = _executor.submit(_generate, doc, px)
+
+    def _done(_):
+        with _lock:
+            _pending.pop(key, None)
+
+    future.add_done_callback(_done)
+    return future
+
+
+def schedule(doc: dict) -> None:
+    """Yüklemeden sonra tüm boyutları arka planda üret (önizlenemezse bir şey yapmaz)"""
+    if not supported(doc):
+        return
+    for px in SIZES.values():
+        if not derivative_path(doc, px).exists():
+            _submit(doc, px)
+
+
+def get(doc: dict, px: int) -> Optional[Path]:
+    """Önbellekteki türevi döndür, yoksa üretip bekle; önizlenemezse None"""
+    if not supported(doc):
+        return None
+    target = derivative_path(doc, px)
+    if target.exists():
+        return target
+    return _submit(doc, px).result()
+
+
+def discard(doc: dict) -> None:
+    """Belgenin (blob'unun) tüm türevlerini sil"""
+    for px in SIZES.values():
+        derivative_path(doc, px).unlink(missing_ok=True)
+
+
+def shutdown() -> None:
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,55 @@
+"""
+Yükleme Gövde Sınırı - multipart gövdesi ayrıştırılmadan önce boyut kontrolü
+Starlette form ayrıştırıcısı dosyayı handler çalışmadan önce geçici dosyaya
+tamamen yazar; sınır handler içinde uygulanırsa çok GB'lık bir gövde önce
+diske alınır. Bu ASGI middleware'i belirli yollarda Content-Length sınırı
+aşıyorsa gövdeyi hiç okumadan 413 döner, başlık yoksa (chunked) gelen baytları
+sayar ve sınır aşıldığı anda akışı 413 ile keser.
+"""
+import json
+
+from fastapi import HTTPException
+
+
+def _too_large(limit: int) -> dict:
+    return {"detail": f"İstek gövdesi çok büyük. Maksimum: {limit / (1024 * 1024):.0f}MB"}
+
+
+class UploadLimitMiddleware:
+    """limits: yol -> sınırı (bayt) döndüren fonksiyon (sınır çalışma anında okunur)"""
+
+    def __init__(self, app, limits: dict):
+        self.app = app
+        self.limits: dict = limits
+
+    async def __call__(self, scope, receive, send):
+        get_limit = self.limits.get(scope.get("path")) if scope["type"] == "http" else None
+        if get_limit is None or scope.get("method") != "POST":
+            await self.app(scope, receive, send)
+            return
+        limit = get_limit()
+
+        headers = dict(scope.get("headers") or [])
+        length = headers.get(b"content-length")
+        if length is not None and length.isdigit() and int(length) > limit:
+            body = json.dumps(_too_large(limit), ensure_ascii=False).encode("utf-8")
+            await send({"type": "http.response.start", "status": 413, "headers": [
+                (b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()),
+                (b"connection", b"close"),
+            ]})
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Form ayrıştırması sırasında fırlar; FastAPI HTTPException'ı olduğu gibi iletir
+                    raise HTTPException(status_code=413, detail=_too_large(limit)["detail"])
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -0,0 +1,87 @@
+"""
+Akışlı ZIP - diskteki dosyalardan anında, sabit bellekle ZIP üretimi
+ZipFile konumlanamayan (seek edilemeyen) bir çıktıya yazar; her dosya parça
+parça okunur ve üretilen baytlar hemen istemciye gönderilir. Arşiv boyutundan
+bağımsız olarak bellekte en fazla bir parça tutulur. Zaten sıkıştırılmış
+biçimler (JPEG, PNG, PDF, Office, ZIP...) yeniden sıkıştırılmadan (STORED) eklenir.
+"""
+import os
+import zipfile
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator
+
+READ_CHUNK_SIZE = 1024 * 1024  # 1MB
+# Yeniden sıkıştırmanın kazandırmadığı biçimler
+STORED_EXTENSIONS = {
+    ".jpg", ".jpeg", ".png", ".gif", ".webp", ".pdf", ".docx", ".xlsx", ".pptx",
+    ".zip", ".rar", ".7z",
+}
+ZIP_EPOCH = datetime(1980, 1, 1)
+
+
+class _Sink:
+    """ZipFile için sadece yazılabilir çıktı; biriken baytlar drain() ile alınır"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def compress_type(name: str) -> int:
+    ext = os.path.splitext(name)[1].lower()
+    return zipfile.ZIP_STORED if ext in STORED_EXTENSIONS else zipfile.ZIP_DEFLATED
+
+
+def unique_name(name: str, used: set) -> str:
+    """Arşivde aynı ad ikinci kez geçerse 'ad (2).ext' biçiminde ayır"""
+    candidate = name
+    stem, ext = os.path.splitext(name)
+    n = 2
+    while candidate.lower() in used:
+        candidate = f"{stem} ({n}){ext}"
+        n += 1
+    used.add(candidate.lower())
+    return candidate
+
+
+def stream_zip(entries: Iterable[tuple]) -> Iterator[bytes]:
+    """
+    (arşivdeki ad, dosya yolu) çiftlerinden ZIP akışı üret. Okunamayan
+    dosyalar atlanır. StreamingResponse içinde iş parçacığı havuzunda tüketilir.
+    """
+    sink = _Sink()
+    with zipfile.ZipFile(sink, mode="w", allowZip64=True) as archive:
+        for arcname, path in entries:
+            path = Path(path)
+            try:
+                stat_result = path.stat()
+                source = open(path, "rb")
+            except OSError:
+                continue
+            modified = max(datetime.fromtimestamp(stat_result.st_mtime), ZIP_EPOCH)
+            info = zipfile.ZipInfo(arcname, date_time=modified.timetuple()[:6])
+            info.compress_type = compress_type(arcname)
+            info.file_size = stat_result.st_size
+            with source, archive.open(info, mode="w", force_zip64=stat_result.st_size >= zipfile.ZIP64_LIMIT) as dest:
+                for chunk in iter(lambda: source.read(READ_CHUNK_SIZE), b""):
+                    dest.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            data = sink.drain()
+            if data:
+                yield data
+    # Merkezi dizin (ZipFile kapanırken yazılır)
+    yield sink.drain()
@@ -14,8 +14,10 @@ from fastapi.testclient import TestClient
 TEST_DATA_DIR = Path(tempfile.mkdtemp(prefix="md_test_"))
 REPO_ROOT = Path(__file__).resolve().parent.parent.parent
 SOURCE_DATA = REPO_ROOT / "md.data"
+# documents router resolves DOCS_DIR at import time (test modules may import it early)
+os.environ["DOCS_DIR"] = str(TEST_DATA_DIR / "_docs")
 
-# Required JSON files for tasks/auth tests
+# Required JSON files for tasks/auth/dashboard tests
 REQUIRED_FILES = [
     "tasks.json",
     "task_assignments.json",
@@ -24,6 +26,16 @@ REQUIRED_FILES = [
     "teams.json",
     "roles.json",
     "activities.json",
+    "jobs.json",
+    "customers.json",
+    "productionOrders.json",
+    "assemblyTasks.json",
+    "stockItems.json",
+    "stockMovements.json",
+    "reservations.json",
+    "purchaseOrders.json",
+    "documents.json",
+    "folders.json",
 ]
 
 
@@ -67,6 +79,10 @@ def test_data_dir():
 def app_client(test_data_dir):
     """FastAPI TestClient with test DATA_DIR."""
     os.environ["DATA_DIR"] = test_data_dir
+    os.environ["PROFILE_DIR"] = str(Path(test_data_dir) / "_profiles")
+    os.environ["SLOW_LOG_PATH"] = str(Path(test_data_dir) / "_logs" / "slow_requests.jsonl")
+    # Cold tiering is triggered explicitly by the tests that need it
+    os.environ["COLD_TIER_INTERVAL_HOURS"] = "0"
     # Clear data_loader cache so it picks up DATA_DIR
     from app.data_loader import get_data_dir
     get_data_dir.cache_clear()
@@ -0,0 +1,65 @@
+"""
+Change feed tests: save_json commits are published to subscribers.
+"""
+import asyncio
+
+
+def test_save_json_publishes_change_event(client):
+    """A subscriber with a collection filter receives only matching commits."""
+    from app import change_feed
+    from app.data_loader import load_json, save_json
+
+    async def scenario():
+        sub = change_feed.subscribe({"tasks"})
+        try:
+            tasks = load_json("tasks.json")
+            # save_json normally runs in the threadpool
+            await asyncio.to_thread(save_json, "teams.json", load_json("teams.json"))
+            await asyncio.to_thread(save_json, "tasks.json", tasks, ["T-1"])
+            return await sub.next_event(2)
+        finally:
+            change_feed.unsubscribe(sub)
+
+    event = asyncio.run(scenario())
+    assert event["type"] == "change"
+    assert event["collection"] == "tasks"
+    assert event["ids"] == ["T-1"]
+    assert event["version"] >= 1
+
+
+def test_websocket_receives_task_events(client):
+    """Creating a task over HTTP pushes a change event to a WebSocket subscriber."""
+    with client.websocket_connect("/changes/ws?collections=tasks&heartbeat=5") as ws:
+        r = client.post("/tasks/", json={"baslik": "Akış testi", "aciklama": "", "oncelik": "low", "durum": "todo"})
+        assert r.status_code == 201
+        event = ws.receive_json()
+        assert event["type"] == "change"
+        assert event["collection"] == "tasks"
+
+
+def test_last_event_id_from_another_process_gets_resync(client):
+    """Ids from this process replay missed events; ids from another epoch force a resync."""
+    from app import change_feed
+    from app.data_loader import load_json, save_json
+
+    async def scenario(last_event_id):
+        sub = change_feed.subscribe({"teams"}, last_event_id)
+        try:
+            return await sub.next_event(2)
+        finally:
+            change_feed.unsubscribe(sub)
+
+    before = change_feed.current_seq()
+    save_json("teams.json", load_json("teams.json"))
+    replayed = asyncio.run(scenario(f"{change_feed.EPOCH}-{before}"))
+    assert replayed["type"] == "change" and replayed["id"] == before + 1
+
+    for stale in (f"bootold-{before}", str(before), f"{change_feed.EPOCH}-{before + 10_000}"):
+        assert asyncio.run(scenario(stale))["type"] == "resync"
+
+
+def test_feed_status(client):
+    r = client.get("/changes/status")
+    assert r.status_code == 200
+    assert "lastEventId" in r.json()
+    assert r.json()["epoch"]
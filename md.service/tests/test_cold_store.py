@@ -0,0 +1,86 @@
+"""
+Cold tier tests: closed jobs move to compressed segments and stay readable.
+"""
+from datetime import datetime, timedelta
+
+from app import cold_store
+from app.data_loader import get_data_dir, load_json
+
+
+def test_closed_jobs_move_to_cold_segment_and_stay_readable(client):
+    r = client.post("/jobs/", json={
+        "customerId": "CUST-COLD", "customerName": "Arşiv Müşteri",
+        "title": "Soğuk arşiv işi", "startType": "ARSIV",
+    })
+    assert r.status_code == 201
+    archived = r.json()
+    active = client.post("/jobs/", json={
+        "customerId": "CUST-COLD", "customerName": "Arşiv Müşteri",
+        "title": "Aktif iş", "startType": "OLCU",
+    }).json()
+
+    moved = cold_store.tier_jobs(days=0, now=datetime.now() + timedelta(minutes=1))
+    assert archived["id"] in moved
+    assert active["id"] not in moved
+
+    hot_ids = {j["id"] for j in load_json("jobs.json")}
+    assert archived["id"] not in hot_ids and active["id"] in hot_ids
+    assert list((get_data_dir() / cold_store.COLD_DIR).glob("segment-*.json.gz"))
+
+    # Point lookups and the full list still see the cold job
+    assert client.get(f"/jobs/{archived['id']}").json()["title"] == "Soğuk arşiv işi"
+    all_ids = {j["id"] for j in client.get("/jobs/").json()}
+    assert {archived["id"], active["id"]} <= all_ids
+    hot = client.get("/jobs/", params={"tier": "hot", "customerId": "CUST-COLD", "limit": 10}).json()
+    assert [j["id"] for j in hot["items"]] == [active["id"]]
+    assert client.get("/jobs/pipeline").json()["cold"] >= 1
+
+    # Search and dashboard counts still include archived jobs
+    found = client.get("/search", params={"q": "Soğuk arşiv işi"}).json()
+    assert archived["id"] in [item["id"] for item in found["items"] if item["collection"] == "jobs"]
+    jobs = client.get("/jobs/").json()
+    active_count = len([j for j in jobs if j.get("status") not in ["TAMAMLANDI", "IPTAL", "FIYAT_SORGUSU_RED"]])
+    assert client.get("/dashboard/widgets/overview").json()["activeJobs"] == active_count
+
+    # Cold jobs are read-only
+    r = client.put(f"/jobs/{archived['id']}/status", json={"status": "TEKNIK_CIZIM"})
+    assert r.status_code == 409
+
+
+def test_recent_jobs_are_not_tiered(client):
+    job = client.post("/jobs/", json={
+        "customerId": "CUST-COLD", "customerName": "Arşiv Müşteri",
+        "title": "Yeni arşiv işi", "startType": "ARSIV",
+    }).json()
+    assert job["id"] not in cold_store.tier_jobs(days=30)
+    assert job["id"] in {j["id"] for j in load_json("jobs.json")}
+
+
+def test_segment_cache_is_bounded(client, monkeypatch):
+    monkeypatch.setenv("COLD_SEGMENT_CACHE", "1")
+    for title in ("Segment A", "Segment B"):
+        client.post("/jobs/", json={
+            "customerId": "CUST-COLD", "customerName": "Arşiv Müşteri", "title": title, "startType": "ARSIV",
+        })
+        cold_store.tier_jobs(days=0, now=datetime.now() + timedelta(minutes=1))
+    titles = {job["title"] for job in cold_store.jobs()}
+    assert {"Segment A", "Segment B"} <= titles
+    assert len(cold_store._segments) == 1
+
+
+def test_tiering_compacts_into_one_segment(client, monkeypatch):
+    for title in ("Sıkıştırma A", "Sıkıştırma B", "Sıkıştırma C"):
+        client.post("/jobs/", json={
+            "customerId": "CUST-COLD", "customerName": "Arşiv Müşteri", "title": title, "startType": "ARSIV",
+        })
+        cold_store.tier_jobs(days=0, now=datetime.now() + timedelta(minutes=1))
+    assert len(list((get_data_dir() / cold_store.COLD_DIR).glob("segment-*.json.gz"))) == 1
+
+    # Cold reads hit the single cached segment instead of decompressing again
+    cold_store.jobs()
+    calls = []
+    real = cold_store.gzip.decompress
+    monkeypatch.setattr(cold_store.gzip, "decompress", lambda raw: calls.append(raw) or real(raw))
+    titles = {job["title"] for job in cold_store.jobs()}
+    assert {"Sıkıştırma A", "Sıkıştırma B", "Sıkıştırma C"} <= titles
+    assert calls == []
@@ -0,0 +1,110 @@
+"""
+Optimistic concurrency tests: record versions, If-Match and CAS commits.
+"""
+import pytest
+
+from app.data_loader import VersionConflict, commit_many, commit_records, load_json
+
+
+def _create_job(client, title):
+    r = client.post("/jobs/", json={
+        "customerId": "CUST-CAS", "customerName": "Test Müşteri",
+        "title": title, "startType": "OLCU",
+    })
+    assert r.status_code == 201
+    return r.json()
+
+
+def test_if_match_rejects_stale_version(client):
+    job = _create_job(client, "If-Match testi")
+    r = client.get(f"/jobs/{job['id']}")
+    etag = r.headers["ETag"]
+    assert etag == f'"v{job["version"]}"'
+
+    ops = [{"op": "replace", "path": "/title", "value": "Birinci"}]
+    r = client.patch(f"/jobs/{job['id']}", json=ops, headers={"If-Match": etag})
+    assert r.status_code == 200
+    assert r.json()["version"] == job["version"] + 1
+    assert r.headers["ETag"] != etag
+
+    ops = [{"op": "replace", "path": "/title", "value": "İkinci"}]
+    r = client.patch(f"/jobs/{job['id']}", json=ops, headers={"If-Match": etag})
+    assert r.status_code == 412
+    assert r.json()["currentVersion"] == job["version"] + 1
+    assert client.get(f"/jobs/{job['id']}").json()["title"] == "Birinci"
+
+
+def test_commit_detects_lost_update_on_same_record(client):
+    job = _create_job(client, "CAS testi")
+    first, second = load_json("jobs.json"), load_json("jobs.json")
+
+    next(j for j in first if j["id"] == job["id"])["title"] = "A"
+    commit_records("jobs.json", first, [job["id"]])
+
+    next(j for j in second if j["id"] == job["id"])["title"] = "B"
+    with pytest.raises(VersionConflict):
+        commit_records("jobs.json", second, [job["id"]])
+    assert next(j for j in load_json("jobs.json") if j["id"] == job["id"])["title"] == "A"
+
+
+def test_commit_keeps_concurrent_updates_to_other_records(client):
+    a, b = _create_job(client, "Paralel A"), _create_job(client, "Paralel B")
+    first, second = load_json("jobs.json"), load_json("jobs.json")
+
+    next(j for j in first if j["id"] == a["id"])["title"] = "A yeni"
+    next(j for j in second if j["id"] == b["id"])["title"] = "B yeni"
+    commit_records("jobs.json", first, [a["id"]])
+    commit_records("jobs.json", second, [b["id"]])
+
+    titles = {j["id"]: j["title"] for j in load_json("jobs.json")}
+    assert titles[a["id"]] == "A yeni"
+    assert titles[b["id"]] == "B yeni"
+
+
+def test_customer_update_honours_if_match(client):
+    customer = client.post("/customers/", json={"name": "Sürüm Müşteri"}).json()
+    assert customer["version"] == 1
+    stale = {"If-Match": '"v0"'}
+    r = client.put(f"/customers/{customer['id']}", json={"name": "Yeni Ad"}, headers=stale)
+    assert r.status_code == 412
+    r = client.put(f"/customers/{customer['id']}", json={"name": "Yeni Ad"}, headers={"If-Match": '"v1"'})
+    assert r.status_code == 200 and r.json()["version"] == 2
+
+
+def test_commit_does_not_resurrect_deleted_record(client):
+    job = _create_job(client, "Silinecek iş")
+    stale = load_json("jobs.json")
+    commit_records("jobs.json", [j for j in load_json("jobs.json") if j["id"] != job["id"]], [job["id"]])
+
+    next(j for j in stale if j["id"] == job["id"])["title"] = "Geri geldi"
+    with pytest.raises(VersionConflict):
+        commit_records("jobs.json", stale, [job["id"]])
+    assert job["id"] not in {j["id"] for j in load_json("jobs.json")}
+
+
+def test_commit_does_not_resurrect_unversioned_seed_record(client):
+    seed = next(c for c in load_json("customers.json") if "version" not in c)
+    stale = load_json("customers.json")
+    commit_records("customers.json", [c for c in load_json("customers.json") if c["id"] != seed["id"]], [seed["id"]])
+    try:
+        next(c for c in stale if c["id"] == seed["id"])["notes"] = "Geri geldi"
+        with pytest.raises(VersionConflict):
+            commit_records("customers.json", stale, [seed["id"]])
+        assert seed["id"] not in {c["id"] for c in load_json("customers.json")}
+    finally:
+        commit_records("customers.json", [seed], [seed["id"]], created_ids=[seed["id"]])
+
+
+def test_commit_many_writes_nothing_when_any_check_fails(client):
+    b = _create_job(client, "Toplu B")
+    fresh, stale = load_json("jobs.json"), load_json("jobs.json")
+    next(j for j in fresh if j["id"] == b["id"])["title"] = "B önce"
+    commit_records("jobs.json", fresh, [b["id"]])
+
+    customers = load_json("customers.json")
+    customers[0]["notes"] = "yazılmamalı"
+    next(j for j in stale if j["id"] == b["id"])["title"] = "B eski"
+    with pytest.raises(VersionConflict):
+        commit_many([("customers.json", customers, [customers[0]["id"]]), ("jobs.json", stale, [b["id"]])])
+    assert load_json("customers.json")[0].get("notes") != "yazılmamalı"
+    assert next(j for j in load_json("jobs.json") if j["id"] == b["id"])["title"] == "B önce"
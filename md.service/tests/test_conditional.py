@@ -0,0 +1,37 @@
+"""
+Conditional GET tests: ETag / If-None-Match / If-Modified-Since on list endpoints.
+"""
+
+
+def test_list_returns_validators_and_304(client):
+    r = client.get("/customers/")
+    assert r.status_code == 200
+    etag = r.headers.get("etag")
+    assert etag and r.headers.get("last-modified")
+
+    r2 = client.get("/customers/", headers={"If-None-Match": etag})
+    assert r2.status_code == 304
+    assert r2.content == b""
+    assert r2.headers.get("etag") == etag
+
+    r3 = client.get("/customers/", headers={"If-Modified-Since": r.headers["last-modified"]})
+    assert r3.status_code == 304
+
+
+def test_etag_changes_after_write(client):
+    etag = client.get("/customers/").headers["etag"]
+    r = client.post("/customers/", json={"name": "ETag Test Müşterisi"})
+    assert r.status_code == 201
+
+    r2 = client.get("/customers/", headers={"If-None-Match": etag})
+    assert r2.status_code == 200
+    assert r2.headers["etag"] != etag
+    assert any(c.get("name") == "ETag Test Müşterisi" for c in r2.json())
+
+
+def test_etag_depends_on_query(client):
+    all_roles = client.get("/roles/").headers["etag"]
+    active_roles = client.get("/roles/", params={"aktifMi": True})
+    assert active_roles.headers["etag"] != all_roles
+    r = client.get("/roles/", params={"aktifMi": True}, headers={"If-None-Match": all_roles})
+    assert r.status_code == 200
@@ -0,0 +1,92 @@
+"""
+Dashboard widget tests: batched /widgets/all endpoint.
+"""
+
+
+def test_widgets_all_matches_individual_endpoints(client):
+    """Batched response equals the single-widget endpoints."""
+    r = client.get("/dashboard/widgets/all", params={"widgets": "overview,tasks-summary,inquiry-stats"})
+    assert r.status_code == 200
+    data = r.json()
+    assert set(data) == {"overview", "tasks-summary", "inquiry-stats"}
+    assert data["overview"] == client.get("/dashboard/widgets/overview").json()
+    assert data["tasks-summary"] == client.get("/dashboard/widgets/tasks-summary").json()
+    assert data["inquiry-stats"] == client.get("/dashboard/widgets/inquiry-stats").json()
+
+
+def test_widgets_all_loads_each_collection_once(client, monkeypatch):
+    """Every collection is parsed at most once for the whole batch."""
+    from app.routers import dashboard
+
+    calls = []
+    real_load = dashboard.load_json
+
+    def counting_load(filename):
+        calls.append(filename)
+        return real_load(filename)
+
+    monkeypatch.setattr(dashboard, "load_json", counting_load)
+    r = client.get("/dashboard/widgets/all")
+    assert r.status_code == 200
+    assert set(r.json()) == set(dashboard.WIDGETS)
+    assert calls.count("jobs.json") == 1
+    assert len(calls) == len(set(calls))
+
+
+def test_widgets_all_rejects_unknown_widget(client):
+    r = client.get("/dashboard/widgets/all", params={"widgets": "overview,nope"})
+    assert r.status_code == 400
+
+
+def _recent_by_scan(jobs, limit=10):
+    entries = []
+    for job in jobs:
+        for log in (job.get("logs") or [])[-5:]:
+            entries.append((log.get("at", ""), job["id"], log.get("action", "update")))
+    return sorted(entries, reverse=True)[:limit]
+
+
+def test_recent_activities_tracks_new_job_logs(client):
+    """New job logs show up in the widget without a full rescan, matching a brute-force scan."""
+    r = client.post("/jobs/", json={
+        "customerId": "CUST-TEST", "customerName": "Test Müşteri",
+        "title": "Son hareket testi", "startType": "OLCU",
+    })
+    assert r.status_code == 201
+    job_id = r.json()["id"]
+    r = client.put(f"/jobs/{job_id}/status", json={"status": "OLCU_ALINDI"})
+    assert r.status_code == 200
+
+    activities = client.get("/dashboard/widgets/recent-activities").json()["activities"]
+    assert activities[0]["id"] == job_id
+    assert activities[0]["type"] == "status.updated"
+    assert activities[0]["status"] == "OLCU_ALINDI"
+
+    from app.data_loader import load_json
+    expected = _recent_by_scan(load_json("jobs.json"))
+    assert [(a["time"], a["id"], a["type"]) for a in activities] == expected
+
+
+def test_recent_activities_refill_after_jobs_leave(client, monkeypatch):
+    """Deleting the newest jobs does not shrink the widget below its capacity."""
+    from app import recent_events
+    from app.data_loader import commit_records, load_json
+
+    monkeypatch.setattr(recent_events, "CAPACITY", 3)
+    created = [
+        client.post("/jobs/", json={
+            "customerId": "CUST-TEST", "customerName": "Test Müşteri",
+            "title": f"Silinecek hareket {n}", "startType": "OLCU",
+        }).json()["id"]
+        for n in range(2)
+    ]
+    recent_events.rebuild()
+    assert {a["id"] for a in recent_events.top(3)} & set(created)
+
+    commit_records("jobs.json", [j for j in load_json("jobs.json") if j["id"] not in created], created)
+    activities = recent_events.top(3)
+    assert len(activities) == 3
+    expected = _recent_by_scan(load_json("jobs.json"), limit=3)
+    assert [(a["time"], a["id"], a["type"]) for a in activities] == expected
+    monkeypatch.undo()
+    recent_events.rebuild()
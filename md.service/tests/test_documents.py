@@ -0,0 +1,320 @@
+"""
+Documents API tests: streaming upload, checksum, size limit, resumable sessions,
+content-addressed blob storage, thumbnails, image optimization, archives.
+"""
+import hashlib
+import io
+import os
+import random
+import time
+import zipfile
+
+import pytest
+
+from app import blob_store, image_optimizer, thumbnails
+from app.data_loader import load_json, save_json
+from app.routers import documents, upload_sessions
+
+
+def _upload(client, content, name="olcu.png", content_type="image/png", doc_type="olcu", job_id="JOB-DOCTEST"):
+    return client.post(
+        "/documents/upload",
+        files={"file": (name, content, content_type)},
+        data={"jobId": job_id, "docType": doc_type},
+    )
+
+
+def test_upload_streams_file_and_records_checksum(client):
+    content = b"\x89PNG" + bytes(range(256)) * 9000  # spans several upload chunks
+    r = _upload(client, content)
+    assert r.status_code == 200
+    doc = r.json()
+    assert doc["size"] == len(content)
+    assert doc["sha256"] == hashlib.sha256(content).hexdigest()
+
+    stored = documents.DOCS_ROOT / doc["path"]
+    assert stored.read_bytes() == content
+    assert not list(stored.parent.glob(".*.part"))
+    assert client.get(f"/documents/{doc['id']}/download").content == content
+
+
+def test_upload_over_limit_is_rejected_without_leftovers(client, monkeypatch):
+    monkeypatch.setattr(documents, "MAX_FILE_SIZE", 1000)
+    before = set(documents.DOCS_ROOT.rglob("*"))
+    r = _upload(client, b"x" * 5000, name="buyuk.txt", content_type="text/plain", doc_type="diger")
+    assert r.status_code == 413
+    assert set(documents.DOCS_ROOT.rglob("*")) == before
+
+
+def test_oversized_upload_body_is_rejected_before_parsing(client, monkeypatch):
+    monkeypatch.setattr(documents, "MAX_FILE_SIZE", 1000)
+    monkeypatch.setattr(documents, "MULTIPART_OVERHEAD", 500)
+
+    async def never_called(*args, **kwargs):
+        raise AssertionError("handler ran for an oversized body")
+
+    monkeypatch.setattr(documents, "_stream_to_file", never_called)
+    r = _upload(client, b"x" * 5000, name="buyuk.txt", content_type="text/plain", doc_type="diger")
+    assert r.status_code == 413
+
+    # Without Content-Length (chunked) the body is cut off as soon as it passes the limit
+    def chunks():
+        yield b"--b\r\nContent-Disposition: form-data; name=\"docType\"\r\n\r\ndiger\r\n"
+        for _ in range(10):
+            yield b"x" * 1000
+
+    r = client.post("/documents/upload", content=chunks(),
+                    headers={"Content-Type": "multipart/form-data; boundary=b"})
+    assert r.status_code == 413
+
+
+def _open_session(client, content, **extra):
+    body = {"fileName": "sozlesme.pdf", "size": len(content), "mimeType": "application/pdf",
+            "docType": "sozlesme", "jobId": "JOB-DOCTEST", **extra}
+    r = client.post("/documents/uploads", json=body)
+    assert r.status_code == 201
+    return r.json()
+
+
+def test_resumable_upload_survives_missing_chunks(client, monkeypatch):
+    monkeypatch.setattr(upload_sessions, "CHUNK_SIZE", 1000)
+    content = bytes(range(256)) * 10  # 2560 bytes -> 3 chunks
+    session = _open_session(client, content, sha256=hashlib.sha256(content).hexdigest())
+    upload_id = session["uploadId"]
+    assert session["totalChunks"] == 3 and session["offset"] == 0
+
+    client.put(f"/documents/uploads/{upload_id}/chunks/0", content=content[:1000])
+    client.put(f"/documents/uploads/{upload_id}/chunks/2", content=content[2000:])
+    status = client.get(f"/documents/uploads/{upload_id}").json()
+    assert status["receivedChunks"] == [0, 2] and status["offset"] == 1000
+
+    r = client.post(f"/documents/uploads/{upload_id}/complete")
+    assert r.status_code == 409
+    assert r.json()["detail"]["missingChunks"] == [1]
+
+    assert client.put(f"/documents/uploads/{upload_id}/chunks/1", content=b"short").status_code == 400
+    client.put(f"/documents/uploads/{upload_id}/chunks/1", content=content[1000:2000])
+    r = client.post(f"/documents/uploads/{upload_id}/complete")
+    assert r.status_code == 200
+    doc = r.json()
+    assert doc["originalName"] == "sozlesme.pdf" and doc["size"] == len(content)
+    assert (documents.DOCS_ROOT / doc["path"]).read_bytes() == content
+    assert client.get(f"/documents/uploads/{upload_id}").status_code == 404
+
+
+def test_chunk_writes_run_off_the_event_loop(client, monkeypatch):
+    monkeypatch.setattr(upload_sessions, "CHUNK_SIZE", 1000)
+    writes = []
+    real_to_thread = upload_sessions.asyncio.to_thread
+
+    async def recording_to_thread(func, *args):
+        writes.append(len(args[0]))
+        return await real_to_thread(func, *args)
+
+    monkeypatch.setattr(upload_sessions.asyncio, "to_thread", recording_to_thread)
+    content = bytes(range(256)) * 6  # 1536 bytes -> 2 chunks
+    upload_id = _open_session(client, content)["uploadId"]
+    client.put(f"/documents/uploads/{upload_id}/chunks/0", content=content[:1000])
+    client.put(f"/documents/uploads/{upload_id}/chunks/1", content=content[1000:])
+    assert sum(writes) == len(content)
+    r = client.post(f"/documents/uploads/{upload_id}/complete")
+    assert (documents.DOCS_ROOT / r.json()["path"]).read_bytes() == content
+
+
+def test_abandoned_upload_sessions_are_collected(client):
+    session = _open_session(client, b"abc")
+    assert upload_sessions.gc_sessions(now=time.time()) == 0
+    assert upload_sessions.gc_sessions(now=time.time() + 25 * 3600) >= 1
+    assert client.get(f"/documents/uploads/{session['uploadId']}").status_code == 404
+
+
+def test_duplicate_uploads_share_one_blob_until_last_reference(client):
+    content = b"%PDF-1.4 teknik cizim " + bytes(range(256)) * 40
+    first = _upload(client, content, name="teknik.pdf", content_type="application/pdf",
+                    doc_type="teknik", job_id="JOB-BLOB-1").json()
+    second = _upload(client, content, name="teknik-kopya.pdf", content_type="application/pdf",
+                     doc_type="teknik", job_id="JOB-BLOB-2").json()
+    assert first["id"] != second["id"]
+    assert first["path"] == second["path"] == blob_store.blob_relpath(hashlib.sha256(content).hexdigest())
+    blob = documents.DOCS_ROOT / first["path"]
+    assert blob_store.references(first["path"]) == 2
+
+    assert client.delete(f"/documents/{first['id']}").status_code == 200
+    assert blob.read_bytes() == content
+    assert client.get(f"/documents/{second['id']}/download").content == content
+
+    assert client.delete(f"/documents/{second['id']}").status_code == 200
+    assert not blob.exists()
+
+
+def test_migration_dedups_legacy_tree_and_reports_saved_bytes(client):
+    content = b"legacy contract scan " * 100
+    legacy_dir = documents.DOCS_DIR / "sozlesme"
+    legacy_dir.mkdir(parents=True, exist_ok=True)
+    legacy = []
+    for n in range(3):
+        name = f"DOC-MIG{n}_20240101000000.png"
+        (legacy_dir / name).write_bytes(content)
+        legacy.append({"id": f"DOC-MIG{n}", "jobId": "JOB-MIG", "type": "sozlesme", "filename": name,
+                       "originalName": f"sozlesme{n}.png", "path": f"documents/sozlesme/{name}",
+                       "mimeType": "image/png", "size": len(content)})
+    save_json("documents.json", legacy + load_json("documents.json"), [d["id"] for d in legacy])
+
+    assert blob_store.migrate(dry_run=True)["bytesSaved"] >= 2 * len(content)
+    assert (legacy_dir / legacy[0]["filename"]).exists()
+
+    report = blob_store.migrate()
+    assert report["bytesSaved"] >= 2 * len(content)
+    assert report["duplicates"] >= 2
+    migrated = [d for d in load_json("documents.json") if d["id"].startswith("DOC-MIG")]
+    assert {d["path"] for d in migrated} == {blob_store.blob_relpath(hashlib.sha256(content).hexdigest())}
+    assert not list(legacy_dir.glob("DOC-MIG*"))
+    assert client.get("/documents/DOC-MIG1/download").content == content
+    assert blob_store.migrate()["migrated"] == 0
+
+
+def test_thumbnail_rejects_unknown_size_and_non_previewable_documents(client):
+    doc = _upload(client, b"not an image", name="not.txt", content_type="text/plain", doc_type="diger").json()
+    assert client.get(f"/documents/{doc['id']}/thumbnail?size=xl").status_code == 400
+    assert client.get(f"/documents/{doc['id']}/thumbnail").status_code == 404
+    assert client.get("/documents/DOC-YOK/thumbnail").status_code == 404
+
+
+def test_image_thumbnail_is_generated_and_cached(client):
+    pil = pytest.importorskip("PIL.Image")
+    buf = io.BytesIO()
+    pil.new("RGB", (1200, 800), (200, 30, 30)).save(buf, "PNG")
+    doc = _upload(client, buf.getvalue(), name="montaj.png", doc_type="montaj_sonrasi").json()
+
+    r = client.get(f"/documents/{doc['id']}/thumbnail?size=sm")
+    assert r.status_code == 200 and r.headers["content-type"] == "image/jpeg"
+    thumb = pil.open(io.BytesIO(r.content))
+    assert max(thumb.size) == thumbnails.SIZES["sm"]
+    assert thumbnails.derivative_path(doc, thumbnails.SIZES["sm"]).exists()
+
+
+def test_download_supports_etag_and_byte_ranges(client):
+    content = bytes(range(256)) * 20
+    doc = _upload(client, content, name="cizim.pdf", content_type="application/pdf", doc_type="teknik").json()
+    url = f"/documents/{doc['id']}/download"
+
+    r = client.get(url)
+    etag = r.headers["etag"]
+    assert etag == f'"{doc["sha256"]}"' and r.headers["accept-ranges"] == "bytes"
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+    assert client.get(url, headers={"If-Modified-Since": r.headers["last-modified"]}).status_code == 304
+
+    r = client.get(url, headers={"Range": "bytes=100-199"})
+    assert r.status_code == 206 and r.content == content[100:200]
+    assert r.headers["content-range"] == f"bytes 100-199/{len(content)}"
+    assert client.get(url, headers={"Range": "bytes=-10"}).content == content[-10:]
+    assert client.get(url, headers={"Range": "bytes=100-", "If-Range": etag}).content == content[100:]
+
+    r = client.get(url, headers={"Range": "bytes=100-199", "If-Range": '"stale"'})
+    assert r.status_code == 200 and r.content == content
+    r = client.get(url, headers={"Range": f"bytes={len(content)}-"})
+    assert r.status_code == 416 and r.headers["content-range"] == f"bytes */{len(content)}"
+    # Syntactically invalid ranges are ignored: full 200 response
+    r = client.get(url, headers={"Range": "bytes=500-100"})
+    assert r.status_code == 200 and r.content == content
+
+
+def test_job_and_folder_archives_stream_zip_by_doc_type(client):
+    photo = b"\x89PNG" + bytes(range(256)) * 50
+    note = b"olcu notu " * 500
+    _upload(client, photo, name="salon.png", doc_type="olcu", job_id="JOB-ZIP")
+    _upload(client, photo, name="salon.png", doc_type="olcu", job_id="JOB-ZIP")
+    _upload(client, note, name="not.txt", content_type="text/plain", doc_type="teknik", job_id="JOB-ZIP")
+
+    r = client.get("/documents/job/JOB-ZIP/archive")
+    assert r.status_code == 200 and r.headers["content-type"] == "application/zip"
+    with zipfile.ZipFile(io.BytesIO(r.content)) as archive:
+        infos = {info.filename: info for info in archive.infolist()}
+        assert set(infos) == {"olcu/salon.png", "olcu/salon (2).png", "teknik/not.txt"}
+        assert infos["olcu/salon.png"].compress_type == zipfile.ZIP_STORED
+        assert infos["teknik/not.txt"].compress_type == zipfile.ZIP_DEFLATED
+        assert archive.read("teknik/not.txt") == note
+        assert archive.testzip() is None
+    assert client.get("/documents/job/JOB-YOK/archive").status_code == 404
+
+    client.post("/documents/upload", files={"file": ("ruhsat.pdf", b"%PDF-1.4 ruhsat", "application/pdf")},
+                data={"folderId": "FOLDER-ARACLAR", "docType": "arac"})
+    r = client.get("/folders/FOLDER-ARACLAR/archive")
+    assert r.status_code == 200
+    assert "arac/ruhsat.pdf" in zipfile.ZipFile(io.BytesIO(r.content)).namelist()
+
+
+def _photo_png(pil, width, height):
+    # noise compresses poorly, like camera sensor output
+    img = pil.frombytes("RGB", (width, height), random.Random(width).randbytes(width * height * 3))
+    buf = io.BytesIO()
+    exif = pil.Exif()
+    exif[0x010F] = "PhoneMaker"
+    img.save(buf, "PNG", exif=exif)
+    return buf.getvalue()
+
+
+def test_photo_optimization_downscales_and_updates_metadata(client, monkeypatch):
+    pil = pytest.importorskip("PIL.Image")
+    monkeypatch.setenv("IMAGE_MAX_DIMENSION", "400")
+    original = _photo_png(pil, 1200, 300)
+    doc = _upload(client, original, name="olcu.png", doc_type="olcu").json()
+    signature = _upload(client, original, name="imza.png", doc_type="musteri_imza").json()
+    assert image_optimizer.optimize(signature["id"]) is None
+
+    updated = image_optimizer.optimize(doc["id"])
+    assert updated["mimeType"] == "image/jpeg" and updated["originalName"] == "olcu.jpg"
+    assert (updated["width"], updated["height"]) == (400, 100)
+    assert updated["size"] < len(original) and updated["originalSize"] == len(original)
+    assert client.get(f"/documents/{doc['id']}").json()["size"] == updated["size"]
+
+    optimized = pil.open(io.BytesIO(client.get(f"/documents/{doc['id']}/download").content))
+    assert optimized.format == "JPEG" and optimized.size == (400, 100)
+    assert not optimized.getexif()
+    # the signature still references the original blob
+    assert (documents.DOCS_ROOT / doc["path"]).exists()
+    assert image_optimizer.optimize(doc["id"]) is None
+
+
+def test_photo_optimization_can_keep_original(client, monkeypatch):
+    pil = pytest.importorskip("PIL.Image")
+    monkeypatch.setenv("IMAGE_MAX_DIMENSION", "200")
+    monkeypatch.setenv("IMAGE_KEEP_ORIGINAL", "1")
+    doc = _upload(client, _photo_png(pil, 640, 200), name="montaj.png", doc_type="montaj_sonrasi").json()
+
+    updated = image_optimizer.optimize(doc["id"])
+    assert updated["originalPath"] == doc["path"]
+    original_blob = documents.DOCS_ROOT / doc["path"]
+    optimized_blob = documents.DOCS_ROOT / updated["path"]
+    assert original_blob.exists() and optimized_blob.exists()
+
+    assert client.delete(f"/documents/{doc['id']}").status_code == 200
+    assert not original_blob.exists() and not optimized_blob.exists()
+
+
+def test_storage_audit_reports_usage_and_quarantines_orphans(client, auth_headers, monkeypatch):
+    monkeypatch.setenv("ORPHAN_GRACE_HOURS", "1")
+    doc = _upload(client, b"audit me " * 100, name="audit.txt", content_type="text/plain",
+                  doc_type="teklif", job_id="JOB-AUDIT").json()
+    orphan = documents.DOCS_ROOT / blob_store.blob_relpath("f" * 64)
+    orphan.parent.mkdir(parents=True, exist_ok=True)
+    orphan.write_bytes(b"left behind")
+    old = time.time() - 2 * 3600
+    os.utime(orphan, (old, old))
+
+    assert client.get("/admin/storage").status_code == 403
+    report = client.get("/admin/storage", headers=auth_headers).json()
+    orphan_paths = {o["path"]: o for o in report["orphans"]}
+    assert orphan_paths[blob_store.blob_relpath("f" * 64)]["kind"] == "blob"
+    assert doc["path"] not in orphan_paths
+    assert report["usage"]["byJob"]["JOB-AUDIT"] == {"count": 1, "bytes": doc["size"]}
+    assert report["usage"]["byDocType"]["teklif"]["bytes"] >= doc["size"]
+
+    again = client.get("/admin/storage", headers=auth_headers).json()
+    assert again["directoriesReused"] > 0 and again["files"] == report["files"]
+
+    result = client.post("/admin/storage/gc", headers=auth_headers).json()
+    assert blob_store.blob_relpath("f" * 64) in result["quarantined"]
+    assert not orphan.exists()
+    assert list((documents.DOCS_ROOT / ".quarantine").rglob("f" * 64))
+    assert (documents.DOCS_ROOT / doc["path"]).exists()
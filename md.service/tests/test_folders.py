@@ -0,0 +1,71 @@
+"""
+Folder API tests: materialized folder tree with live document counts.
+"""
+
+
+def _upload(client, name, content=b"belge", **refs):
+    r = client.post("/documents/upload", files={"file": (name, content, "application/pdf")},
+                    data={"docType": "genel", **refs})
+    assert r.status_code == 200
+    return r.json()
+
+
+def test_folder_tree_has_parent_pointers_and_paths(client):
+    tree = client.get("/folders/tree").json()
+    assert "FOLDER-SIRKET" in tree["roots"]
+    node = tree["nodes"]["FOLDER-ARACLAR"]
+    assert node["parentId"] == "FOLDER-SIRKET"
+    assert node["path"] == ["FOLDER-SIRKET", "FOLDER-ARACLAR"] and node["depth"] == 1
+    assert "FOLDER-ARACLAR" in tree["nodes"]["FOLDER-SIRKET"]["childIds"]
+    assert client.get("/folders/FOLDER-ARACLAR").json()["parentId"] == "FOLDER-SIRKET"
+    assert client.get("/folders/FOLDER-YOK").status_code == 404
+
+
+def test_folder_counts_follow_uploads_and_deletes(client):
+    before = client.get("/folders/FOLDER-OFIS").json()
+    parent_before = client.get("/folders/tree").json()["nodes"]["FOLDER-SIRKET"]
+
+    first = _upload(client, "kira.pdf", b"x" * 300, folderId="FOLDER-OFIS")
+    second = _upload(client, "aidat.pdf", b"y" * 200, folderId="FOLDER-OFIS")
+    after = client.get("/folders/FOLDER-OFIS").json()
+    assert after["documentCount"] == before["documentCount"] + 2
+    assert after["totalSize"] == before["totalSize"] + 500
+    parent = client.get("/folders/tree").json()["nodes"]["FOLDER-SIRKET"]
+    assert parent["subtreeDocumentCount"] == parent_before["subtreeDocumentCount"] + 2
+
+    docs = client.get("/folders/FOLDER-OFIS/documents").json()
+    assert [d["id"] for d in docs[:2]] == [second["id"], first["id"]]
+
+    client.delete(f"/documents/{first['id']}")
+    listed = {f["id"]: f for f in client.get("/folders/").json()}
+    office = next(sub for sub in listed["FOLDER-SIRKET"]["subfolders"] if sub["id"] == "FOLDER-OFIS")
+    assert office["documentCount"] == before["documentCount"] + 1
+    assert office["totalSize"] == before["totalSize"] + 200
+    assert first["id"] not in {d["id"] for d in client.get("/folders/FOLDER-OFIS/documents").json()}
+
+
+def test_system_folders_group_job_and_supplier_documents(client):
+    job_doc = _upload(client, "is.pdf", jobId="JOB-TREE")
+    supplier_doc = _upload(client, "fiyat.pdf", supplierId="SUP-TREE")
+    assert client.get("/folders/FOLDER-ISLER/documents").json()[0]["id"] == job_doc["id"]
+    assert client.get("/folders/FOLDER-TEDARIKCILER/documents").json()[0]["id"] == supplier_doc["id"]
+    # A folderId pointing at a system folder does not put the document there
+    before = client.get("/folders/FOLDER-ISLER").json()["documentCount"]
+    stray = _upload(client, "yanlis.pdf", folderId="FOLDER-ISLER")
+    assert stray["id"] not in {d["id"] for d in client.get("/folders/FOLDER-ISLER/documents").json()}
+    stray_supplier = _upload(client, "yanlis2.pdf", folderId="FOLDER-TEDARIKCILER")
+    assert stray_supplier["id"] not in {d["id"] for d in client.get("/folders/FOLDER-TEDARIKCILER/documents").json()}
+    assert client.get("/folders/FOLDER-ISLER").json()["documentCount"] == before
+
+
+def test_default_folders_are_created_on_first_access(client):
+    from app.data_loader import load_json, save_json
+
+    original = load_json("folders.json")
+    save_json("folders.json", [])
+    try:
+        r = client.get("/folders/FOLDER-ISLER")
+        assert r.status_code == 200 and r.json()["isSystem"]
+        assert {f["id"] for f in load_json("folders.json")} >= {"FOLDER-ISLER", "FOLDER-SIRKET", "FOLDER-TEDARIKCILER"}
+    finally:
+        save_json("folders.json", original)
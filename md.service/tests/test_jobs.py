@@ -0,0 +1,192 @@
+"""
+Jobs API tests: list pagination/projection.
+"""
+
+
+def _create_job(client, title, start_type="OLCU", customer_id="CUST-JOBTEST"):
+    r = client.post("/jobs/", json={
+        "customerId": customer_id, "customerName": "Test Müşteri",
+        "title": title, "startType": start_type,
+    })
+    assert r.status_code == 201
+    return r.json()
+
+
+def test_list_jobs_without_params_returns_full_records(client):
+    r = client.get("/jobs/")
+    assert r.status_code == 200
+    jobs = r.json()
+    assert isinstance(jobs, list)
+    assert jobs and "logs" in jobs[0]
+
+
+def test_list_jobs_paginates_with_summary_projection(client):
+    for i in range(3):
+        _create_job(client, f"Sayfa testi {i}", customer_id="CUST-PAGE")
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2, "customerId": "CUST-PAGE", "sort": "title"}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get("/jobs/", params=params).json()
+        assert page["total"] == 3
+        for item in page["items"]:
+            assert "logs" not in item and "roles" not in item
+            assert set(item) <= {"id", "title", "customerId", "customerName", "status",
+                                 "startType", "createdAt", "isArchive", "offer",
+                                 "estimatedAssembly", "cancelReason"}
+        seen.extend(item["title"] for item in page["items"])
+        cursor = page["nextCursor"]
+        if not cursor:
+            break
+    assert seen == ["Sayfa testi 0", "Sayfa testi 1", "Sayfa testi 2"]
+
+
+def test_list_jobs_fields_and_filters(client):
+    job = _create_job(client, "Projeksiyon testi", start_type="SERVIS", customer_id="CUST-PROJ")
+    r = client.get("/jobs/", params={"customerId": "CUST-PROJ", "status": job["status"], "fields": "title,service.note"})
+    assert r.status_code == 200
+    items = r.json()
+    assert items == [{"id": job["id"], "title": "Projeksiyon testi", "service": {"note": None}}]
+
+
+def test_list_jobs_rejects_bad_sort_and_cursor(client):
+    assert client.get("/jobs/", params={"sort": "logs"}).status_code == 400
+    assert client.get("/jobs/", params={"limit": 5, "cursor": "!!!"}).status_code == 400
+
+
+def test_pipeline_counts_follow_status_updates(client):
+    job = _create_job(client, "Pipeline testi")
+    status = job["status"]
+    before = client.get("/jobs/pipeline").json()
+    assert before["total"] == sum(before["counts"].values())
+
+    page = client.get(f"/jobs/pipeline/{status}", params={"limit": 1}).json()
+    assert page["items"][0]["id"] == job["id"]
+    assert "logs" not in page["items"][0]
+
+    r = client.put(f"/jobs/{job['id']}/status", json={"status": "TEKNIK_CIZIM"})
+    assert r.status_code == 200
+    after = client.get("/jobs/pipeline").json()
+    assert after["counts"].get(status, 0) == before["counts"][status] - 1
+    assert after["counts"]["TEKNIK_CIZIM"] == before["counts"].get("TEKNIK_CIZIM", 0) + 1
+    assert after["total"] == before["total"]
+
+    ids = [j["id"] for j in client.get("/jobs/pipeline/TEKNIK_CIZIM", params={"limit": 500}).json()["items"]]
+    assert job["id"] in ids
+
+
+def test_dashboard_widgets_match_full_scan(client):
+    # Widgets count archived (cold) jobs as well
+    jobs = client.get("/jobs/", params={"tier": "all"}).json()
+    inquiries = [j for j in jobs if j.get("startType") == "MUSTERI_OLCUSU"]
+    stats = client.get("/dashboard/widgets/inquiry-stats").json()
+    assert stats["total"] == len(inquiries)
+    active = [j for j in jobs if j.get("status") not in ["TAMAMLANDI", "IPTAL", "FIYAT_SORGUSU_RED"]]
+    assert client.get("/dashboard/widgets/overview").json()["activeJobs"] == len(active)
+
+
+def test_patch_job_applies_operations_and_logs(client):
+    job = _create_job(client, "Patch testi")
+    ops = [
+        {"op": "add", "path": "/measure/note", "value": "Kapı ölçüsü"},
+        {"op": "test", "path": "/title", "value": "Patch testi"},
+        {"op": "replace", "path": "/title", "value": "Patch testi 2"},
+    ]
+    r = client.patch(f"/jobs/{job['id']}", json=ops)
+    assert r.status_code == 200
+    patched = r.json()
+    assert patched["title"] == "Patch testi 2"
+    assert patched["measure"]["note"] == "Kapı ölçüsü"
+    assert patched["logs"][-1]["action"] == "job.patched"
+    assert client.get(f"/jobs/{job['id']}").json()["title"] == "Patch testi 2"
+
+
+def test_patch_job_is_atomic_and_guards_fields(client):
+    job = _create_job(client, "Patch atomik")
+    ops = [
+        {"op": "replace", "path": "/title", "value": "Uygulanmamalı"},
+        {"op": "test", "path": "/title", "value": "Başka"},
+    ]
+    assert client.patch(f"/jobs/{job['id']}", json=ops).status_code == 409
+    assert client.get(f"/jobs/{job['id']}").json()["title"] == "Patch atomik"
+
+    bad = [{"op": "remove", "path": "/measure/missing"}]
+    assert client.patch(f"/jobs/{job['id']}", json=bad).status_code == 422
+    status = [{"op": "replace", "path": "/status", "value": "KAPALI"}]
+    assert client.patch(f"/jobs/{job['id']}", json=status).status_code == 400
+    version = [{"op": "replace", "path": "/version", "value": 99}]
+    assert client.patch(f"/jobs/{job['id']}", json=version).status_code == 400
+
+
+def test_patch_job_allows_reading_protected_fields(client):
+    job = _create_job(client, "Patch okuma")
+    ops = [
+        {"op": "test", "path": "/status", "value": job["status"]},
+        {"op": "copy", "from": "/createdAt", "path": "/measure/copiedAt"},
+    ]
+    r = client.patch(f"/jobs/{job['id']}", json=ops)
+    assert r.status_code == 200
+    assert r.json()["measure"]["copiedAt"] == job["createdAt"]
+    assert r.json()["logs"][-1]["note"] == "measure"
+
+
+def test_bulk_update_applies_all_operations_with_single_write(client):
+    a = _create_job(client, "Toplu A")
+    b = _create_job(client, "Toplu B")
+    client.put(f"/jobs/{b['id']}/estimated-assembly", json={"date": "2026-03-10"})
+
+    r = client.post("/jobs/bulk", json={"operations": [
+        {"jobId": a["id"], "status": {"status": "IPTAL", "cancelReason": "Müşteri vazgeçti"}},
+        {"jobId": b["id"], "shiftEstimatedAssemblyDays": 7},
+    ]})
+    assert r.status_code == 200
+    assert r.json()["updated"] == 2
+    assert client.get(f"/jobs/{a['id']}").json()["cancelReason"] == "Müşteri vazgeçti"
+    shifted = client.get(f"/jobs/{b['id']}").json()
+    assert shifted["estimatedAssembly"]["date"] == "2026-03-17"
+    assert shifted["estimatedAssemblyHistory"][-1]["date"] == "2026-03-10"
+
+    items = client.get(f"/activities/by-target/job/{a['id']}").json()["items"]
+    assert any(act["action"] == "job_cancel" for act in items)
+
+
+def test_bulk_update_is_all_or_nothing(client):
+    job = _create_job(client, "Toplu atomik")
+    r = client.post("/jobs/bulk", json={"operations": [
+        {"jobId": job["id"], "status": {"status": "TEKNIK_CIZIM"}},
+        {"jobId": job["id"], "status": {"status": "IPTAL"}},
+        {"jobId": "JOB-YOK", "status": {"status": "TEKNIK_CIZIM"}},
+    ]})
+    assert r.status_code == 400
+    errors = r.json()["detail"]["errors"]
+    assert [(e["index"], e["status"]) for e in errors] == [(1, 400), (2, 404)]
+    assert client.get(f"/jobs/{job['id']}").json()["status"] == job["status"]
+
+
+def test_job_bundle_returns_requested_sections(client):
+    job = _create_job(client, "Bundle testi")
+    r = client.get(f"/jobs/{job['id']}/bundle")
+    assert r.status_code == 200
+    bundle = r.json()
+    assert bundle["job"]["id"] == job["id"]
+    assert bundle["documents"] == client.get(f"/documents/job/{job['id']}").json()
+    assert bundle["production"] == client.get(f"/production/by-job/{job['id']}").json()
+    assert bundle["assembly"] == client.get(f"/assembly/tasks/by-job/{job['id']}").json()
+    assert bundle["activities"]["total"] >= 1
+
+    partial = client.get(f"/jobs/{job['id']}/bundle", params={"include": "job,activities"}).json()
+    assert set(partial) == {"id", "job", "activities"}
+    assert client.get(f"/jobs/{job['id']}/bundle", params={"include": "nope"}).status_code == 400
+    assert client.get("/jobs/JOB-YOK/bundle").status_code == 404
+
+
+def test_job_bundle_sees_new_records_after_writes(client):
+    job = _create_job(client, "Bundle güncel")
+    before = client.get(f"/jobs/{job['id']}/bundle", params={"include": "activities"}).json()
+    client.put(f"/jobs/{job['id']}/status", json={"status": "TEKNIK_CIZIM"})
+    after = client.get(f"/jobs/{job['id']}/bundle", params={"include": "job,activities"}).json()
+    assert after["job"]["status"] == "TEKNIK_CIZIM"
+    assert after["activities"]["total"] == before["activities"]["total"] + 1
@@ -0,0 +1,86 @@
+"""
+Operasyon endpoint testleri: metrics, profil kayıtları, yavaş istek logu.
+"""
+
+
+def test_metrics_exposes_route_and_collection_stats(client):
+    """GET /metrics returns Prometheus text with route and collection metrics."""
+    client.get("/tasks/")
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain")
+    body = r.text
+    assert 'md_http_requests_total{method="GET",route="/tasks/",status="200"}' in body
+    assert 'md_http_request_duration_seconds_bucket{method="GET",route="/tasks/",le="+Inf"}' in body
+    assert 'md_collection_ops_total{collection="tasks",op="read"}' in body
+    assert "md_activity_log_queue_depth 0" in body
+
+
+def test_metrics_counts_activity_writes(client):
+    """Login writes an activity log entry and is counted."""
+    client.post("/auth/login", json={"username": "admin", "password": "admin"})
+    body = client.get("/metrics").text
+    assert 'md_collection_ops_total{collection="activities",op="write"}' in body
+    assert "md_activity_log_written_total 0" not in body
+
+
+def test_profile_flag_requires_admin(client):
+    """X-Profile without an admin session is ignored; admin endpoints are 403."""
+    r = client.get("/tasks/", headers={"X-Profile": "1"})
+    assert r.status_code == 200
+    assert "X-Profile-Id" not in r.headers
+    assert client.get("/admin/profiles").status_code == 403
+
+
+def test_profile_flag_records_profile(auth_headers, client):
+    """Admin X-Profile request is stored and exportable as collapsed stacks."""
+    r = client.get("/tasks/", headers={**auth_headers, "X-Profile": "1"})
+    assert r.status_code == 200
+    profile_id = r.headers.get("X-Profile-Id")
+    assert profile_id
+
+    listed = client.get("/admin/profiles", headers=auth_headers).json()
+    assert any(p["id"] == profile_id and p["route"] == "/tasks/" for p in listed)
+
+    detail = client.get(f"/admin/profiles/{profile_id}", headers=auth_headers).json()
+    assert detail["trigger"] == "flag"
+    assert detail["scope"] == "handler"
+    assert "stacks" in detail
+
+    collapsed = client.get(f"/admin/profiles/{profile_id}/collapsed", headers=auth_headers)
+    assert collapsed.status_code == 200
+    assert collapsed.headers["content-type"].startswith("text/plain")
+
+
+def test_async_handler_profile_is_marked_loop_wide(auth_headers, client):
+    """Async handlers run on the event loop thread, so their profiles are loop-wide."""
+    r = client.get("/auth/me", headers={**auth_headers, "X-Profile": "1"})
+    profile_id = r.headers.get("X-Profile-Id")
+    assert profile_id
+
+    listed = client.get("/admin/profiles", headers=auth_headers).json()
+    assert any(p["id"] == profile_id and p["scope"] == "loop" for p in listed)
+
+
+def test_slow_request_log_attributes_io(client, monkeypatch):
+    """Requests over SLOW_REQUEST_MS are written with per-collection I/O and activity time."""
+    import json
+    from app import slow_log
+
+    monkeypatch.setenv("SLOW_REQUEST_MS", "0")
+    path = slow_log.get_log_path()
+    before = path.read_text(encoding="utf-8").count("\n") if path.exists() else 0
+
+    r = client.post("/auth/login", json={"username": "admin", "password": "admin"})
+    assert r.status_code == 200
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert len(lines) > before
+    entry = json.loads(lines[-1])
+    assert entry["route"] == "/auth/login"
+    assert entry["status"] == 200
+    assert entry["activityLogMs"] > 0
+    collections = {(io["collection"], io["op"]) for io in entry["io"]}
+    assert ("users", "read") in collections
+    assert ("activities", "write") in collections
+    assert all(io["bytes"] > 0 for io in entry["io"])
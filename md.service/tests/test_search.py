@@ -0,0 +1,65 @@
+"""
+Search API tests: Turkish folding, prefix matching, incremental updates.
+"""
+from app import search_index
+
+
+def test_fold_handles_turkish_case_and_diacritics():
+    assert search_index.fold("IŞIK") == search_index.fold("ışık") == "isik"
+    assert search_index.fold("İSTANBUL") == "istanbul"
+    assert search_index.tokenize("Çağrı Öztürk-Ünal") == ["cagri", "ozturk", "unal"]
+
+
+def test_search_matches_prefixes_across_collections(client):
+    r = client.post("/customers/", json={"name": "Işıl Güçlü Yapı", "phone": "0532 111 22 33"})
+    assert r.status_code == 201
+    customer = r.json()
+
+    for query in ["isil guc", "IŞIL", "güçl yap", "05321112233"]:
+        body = client.get("/search", params={"q": query}).json()
+        ids = [(i["collection"], i["id"]) for i in body["items"]]
+        assert ("customers", customer["id"]) in ids, query
+
+    only_jobs = client.get("/search", params={"q": "isil", "collections": "jobs"}).json()
+    assert all(i["collection"] == "jobs" for i in only_jobs["items"])
+    assert client.get("/search", params={"q": "x", "collections": "nope"}).status_code == 400
+
+
+def test_search_follows_updates_and_deletes(client):
+    customer = client.post("/customers/", json={"name": "Zeynep Kılıç"}).json()
+    client.put(f"/customers/{customer['id']}", json={"name": "Zeynep Aydın"})
+
+    def found(q):
+        items = client.get("/search", params={"q": q, "collections": "customers"}).json()["items"]
+        return customer["id"] in [i["id"] for i in items]
+
+    assert not found("kilic")
+    assert found("zeynep aydin")
+    client.delete(f"/customers/{customer['id']}")
+    assert not found("zeynep aydin")
+
+
+def test_exact_term_ranks_above_prefix(client):
+    a = client.post("/customers/", json={"name": "Rankx Demirtaş"}).json()
+    b = client.post("/customers/", json={"name": "Rankx Demir"}).json()
+    items = client.get("/search", params={"q": "rankx demir", "collections": "customers"}).json()["items"]
+    assert [i["id"] for i in items[:2]] == [b["id"], a["id"]]
+
+
+def test_stock_item_search_uses_turkish_folding(client):
+    items = client.get("/stock/items").json()
+    named = next(i for i in items if "İ" in i.get("name", ""))
+    word = next(w for w in named["name"].split() if "İ" in w)
+    r = client.get("/stock/items/search", params={"q": word.replace("İ", "i").lower()})
+    assert named["id"] in [i["id"] for i in r.json()]
+
+
+def test_rebuild_sorts_terms_once(client, monkeypatch):
+    """A full rebuild does not insort term by term; the term list ends up sorted and complete."""
+    def no_insort(*args, **kwargs):
+        raise AssertionError("insort used during rebuild")
+
+    search_index._signatures.clear()
+    monkeypatch.setattr(search_index.bisect, "insort", no_insort)
+    search_index.rebuild()
+    assert search_index._terms == sorted(search_index._postings)
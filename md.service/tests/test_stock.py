@@ -0,0 +1,57 @@
+"""
+Stock tests: composite (productCode, colorCode) index kept current by commits.
+"""
+
+
+def _create_item(client, product_code, color_code, on_hand=0):
+    r = client.post("/stock/items", json={
+        "productCode": product_code, "colorCode": color_code, "name": f"Profil {product_code}",
+        "unit": "boy", "supplierId": "SUP-IDX", "onHand": on_hand,
+    })
+    assert r.status_code == 201
+    return r.json()
+
+
+def test_lookup_by_code_follows_movements_and_inserts(client):
+    item = _create_item(client, "IDX-100", "7", on_hand=10)
+    assert client.get("/stock/items/by-code/IDX-100/7").json()["id"] == item["id"]
+    assert client.post("/stock/items", json={
+        "productCode": "IDX-100", "colorCode": "7", "name": "Kopya", "unit": "boy", "supplierId": "SUP-IDX",
+    }).status_code == 400
+
+    r = client.post("/stock/movements", json={"itemId": item["id"], "qty": 4, "type": "stockOut"})
+    assert r.status_code == 201
+    found = client.get("/stock/items/by-code/IDX-100/7").json()
+    assert found["onHand"] == 6 and found["available"] == 6
+    assert client.get("/stock/items/by-code/IDX-100/8").status_code == 404
+
+    check = client.get("/stock/availability-check", params={"items": "IDX-100/7:5"}).json()
+    assert check["allAvailable"] and check["items"][0]["itemId"] == item["id"]
+    products = client.get("/suppliers/SUP-IDX/products").json()
+    assert item["id"] in [p["id"] for p in products]
+
+
+def test_receive_delivery_updates_stock_through_index(client):
+    a = _create_item(client, "IDX-200", "1", on_hand=2)
+    b = _create_item(client, "IDX-201", "1")
+    r = client.post("/purchase/orders", json={
+        "supplierId": "SUP-IDX", "supplierName": "İndeks Tedarik",
+        "items": [
+            {"productCode": "IDX-200", "colorCode": "1", "productName": "A", "quantity": 5, "unit": "boy"},
+            {"productCode": "IDX-201", "colorCode": "1", "productName": "B", "quantity": 3, "unit": "boy"},
+        ],
+    })
+    assert r.status_code == 201
+    order_id = r.json()["id"]
+    assert client.put(f"/purchase/orders/{order_id}/send").status_code == 200
+
+    r = client.post(f"/purchase/orders/{order_id}/receive", json={"items": [
+        {"productCode": "IDX-200", "colorCode": "1", "quantity": 2},
+        {"productCode": "IDX-200", "colorCode": "1", "quantity": 3},
+        {"productCode": "IDX-201", "colorCode": "1", "quantity": 1},
+    ]})
+    assert r.status_code == 200
+    assert r.json()["status"] == "partial"
+    assert client.get("/stock/items/by-code/IDX-200/1").json()["onHand"] == 7
+    assert client.get(f"/stock/items/{b['id']}").json()["onHand"] == 1
+    assert client.get(f"/stock/items/{a['id']}").json()["version"] == a["version"] + 1